@@ -0,0 +1,136 @@
+import random
+import time
+
+import hypercontagion as hc
+from hypercontagion.utils import SamplingDict
+
+from .generators import random_hypergraph, rates
+
+functions = {
+    "threshold": hc.threshold,
+    "collective": hc.collective_contagion,
+    "individual": hc.individual_contagion,
+}
+
+structures = {
+    "homogeneous": ("fixed", "homogeneous"),
+    "heterogeneous": ("heavy", "heterogeneous"),
+}
+
+
+class _EpidemicBenchmark:
+    """Shared setup for the epidemic engines."""
+
+    params = (["homogeneous", "heterogeneous"], list(functions))
+    param_names = ["structure", "function"]
+    timeout = 300
+
+    n = 1000
+    m = 1000
+    tau = 0.5
+    gamma = 0.5
+    tmax = 10
+
+    def setup(self, structure, function):
+        edge_sizes, degrees = structures[structure]
+        self.H = random_hypergraph(self.n, self.m, edge_sizes, degrees)
+        self.tau_dict = rates(self.H, self.tau)
+        self.function = functions[function]
+        self.initial_infecteds = list(range(self.n // 10))
+
+    def run(self, return_event_data=False):
+        return self.engine(
+            self.H,
+            self.tau_dict,
+            self.gamma,
+            transmission_function=self.function,
+            initial_infecteds=self.initial_infecteds,
+            tmax=self.tmax,
+            return_event_data=return_event_data,
+            seed=0,
+        )
+
+    def time_simulation(self, structure, function):
+        self.run()
+
+    def peakmem_simulation(self, structure, function):
+        self.run()
+
+    def track_events_per_second(self, structure, function):
+        start = time.perf_counter()
+        events = self.run(return_event_data=True)
+        return len(events) / (time.perf_counter() - start)
+
+    track_events_per_second.unit = "events/s"
+
+
+class DiscreteSIR(_EpidemicBenchmark):
+    engine = staticmethod(hc.discrete_SIR)
+
+
+class DiscreteSIS(_EpidemicBenchmark):
+    engine = staticmethod(hc.discrete_SIS)
+
+
+class GillespieSIR(_EpidemicBenchmark):
+    engine = staticmethod(hc.Gillespie_SIR)
+
+
+class GillespieSIS(_EpidemicBenchmark):
+    engine = staticmethod(hc.Gillespie_SIS)
+
+
+class EventDrivenSIR(_EpidemicBenchmark):
+    engine = staticmethod(hc.event_driven_SIR)
+
+
+class EventDrivenSIS(_EpidemicBenchmark):
+    engine = staticmethod(hc.event_driven_SIS)
+
+
+class Scaling:
+    """How the Gillespie engine scales with the size of the hypergraph."""
+
+    params = [1000, 4000, 16000]
+    param_names = ["n"]
+    timeout = 300
+
+    def setup(self, n):
+        self.H = random_hypergraph(n, n, "mixed", "heterogeneous")
+        self.tau = rates(self.H, 0.5)
+
+    def time_Gillespie_SIS(self, n):
+        hc.Gillespie_SIS(self.H, self.tau, 1, rho=0.1, tmax=5, seed=0)
+
+    def peakmem_Gillespie_SIS(self, n):
+        hc.Gillespie_SIS(self.H, self.tau, 1, rho=0.1, tmax=5, seed=0)
+
+
+class SamplingDictOperations:
+    """The hot operations on the IS-link samplers."""
+
+    params = [False, True]
+    param_names = ["weighted"]
+
+    def setup(self, weighted):
+        random.seed(0)
+        self.items = [(i, i + 1) for i in range(10000)]
+        self.weights = [random.random() + 1 if weighted else None for _ in self.items]
+        self.weighted = weighted
+        self.sampler = SamplingDict(weighted=weighted)
+        for item, weight in zip(self.items, self.weights):
+            self.sampler.update(item, weight_increment=weight)
+
+    def time_update(self, weighted):
+        sampler = SamplingDict(weighted=self.weighted)
+        for item, weight in zip(self.items, self.weights):
+            sampler.update(item, weight_increment=weight)
+
+    def time_choose_random(self, weighted):
+        for _ in range(10000):
+            self.sampler.choose_random()
+
+    def time_insert_remove(self, weighted):
+        for item, weight in zip(self.items[:1000], self.weights[:1000]):
+            self.sampler.remove(item)
+            self.sampler.insert(item, weight=weight)
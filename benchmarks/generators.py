@@ -0,0 +1,65 @@
+"""
+Random hypergraphs of controlled size, edge-size distribution,
+and degree heterogeneity for the benchmarks.
+"""
+
+import numpy as np
+import xgi
+
+
+def random_hypergraph(n, m, edge_sizes="fixed", degrees="homogeneous", seed=0):
+    """A random hypergraph where nodes are chosen proportionally to a weight.
+
+    Parameters
+    ----------
+    n : int
+        number of nodes
+    m : int
+        number of hyperedges
+    edge_sizes : str, default: "fixed"
+        The edge-size distribution. "fixed" gives edges of size 3,
+        "mixed" gives edges of size 2 to 5 with equal probability,
+        and "heavy" gives a truncated power law of exponent 2.5
+        between 2 and 20.
+    degrees : str, default: "homogeneous"
+        "homogeneous" chooses members uniformly at random and
+        "heterogeneous" chooses them with weights that result in a
+        power-law degree distribution of exponent 2.5.
+    seed : int, default: 0
+        the random seed.
+
+    Returns
+    -------
+    xgi.Hypergraph
+        the random hypergraph.
+    """
+    rng = np.random.default_rng(seed)
+
+    if edge_sizes == "fixed":
+        sizes = np.full(m, 3)
+    elif edge_sizes == "mixed":
+        sizes = rng.integers(2, 6, size=m)
+    elif edge_sizes == "heavy":
+        k = np.arange(2, 21)
+        p = k**-2.5
+        sizes = rng.choice(k, size=m, p=p / p.sum())
+    else:
+        raise ValueError(f"Unknown edge-size distribution {edge_sizes}")
+
+    if degrees == "homogeneous":
+        weights = np.ones(n)
+    elif degrees == "heterogeneous":
+        weights = (np.arange(n) + 1.0) ** (-1 / 1.5)
+    else:
+        raise ValueError(f"Unknown degree distribution {degrees}")
+    weights /= weights.sum()
+
+    edges = [rng.choice(n, size=s, replace=False, p=weights).tolist() for s in sizes]
+    H = xgi.Hypergraph(edges)
+    H.add_nodes_from(range(n))
+    return H
+
+
+def rates(H, rate):
+    """A tau dict with the same rate for every edge size."""
+    return {s: rate for s in xgi.unique_edge_sizes(H)}
@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+
+import hypercontagion as hc
+
+from .generators import random_hypergraph
+
+
+class _OpinionBenchmark:
+    """Shared setup for the opinion drivers."""
+
+    params = (["homogeneous", "heterogeneous"],)
+    param_names = ["degrees"]
+    timeout = 300
+
+    n = 1000
+    m = 1000
+
+    def setup(self, degrees):
+        self.H = random_hypergraph(self.n, self.m, "mixed", degrees)
+        random.seed(0)
+        self.rng = np.random.default_rng(0)
+
+
+class RandomGroupContinuous(_OpinionBenchmark):
+    def time_deffuant_weisbuch(self, degrees):
+        hc.simulate_random_group_continuous_state_1D(
+            self.H, self.rng.random(self.n), tmax=10000, epsilon=0.1
+        )
+
+    def time_deffuant_weisbuch_convergence(self, degrees):
+        hc.simulate_random_group_continuous_state_1D(
+            self.H, self.rng.random(self.n), tmax=10000, epsilon=0.1, tol=1e-6
+        )
+
+    def peakmem_deffuant_weisbuch(self, degrees):
+        hc.simulate_random_group_continuous_state_1D(
+            self.H, self.rng.random(self.n), tmax=10000, epsilon=0.1
+        )
+
+
+class SynchronousContinuous(_OpinionBenchmark):
+    def time_hegselmann_krause(self, degrees):
+        hc.synchronous_update_continuous_state_1D(
+            self.H, self.rng.random(self.n), tmax=10, epsilon=0.1
+        )
+
+    def time_sparse_hegselmann_krause(self, degrees):
+        hc.synchronous_hegselmann_krause(
+            self.H, self.rng.random(self.n), tmax=10, epsilon=0.1
+        )
+
+    def time_sparse_hegselmann_krause_batch(self, degrees):
+        hc.synchronous_hegselmann_krause(
+            self.H, self.rng.random((self.n, 100)), tmax=10, epsilon=0.1
+        )
+
+
+class RandomNodeDiscrete(_OpinionBenchmark):
+    def time_voter_model(self, degrees):
+        hc.simulate_random_node_and_group_discrete_state(
+            self.H, self.rng.integers(3, size=self.n), tmax=10000
+        )
+
+    def peakmem_voter_model(self, degrees):
+        hc.simulate_random_node_and_group_discrete_state(
+            self.H, self.rng.integers(3, size=self.n), tmax=10000
+        )
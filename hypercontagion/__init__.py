@@ -1,8 +1,38 @@
-import pkg_resources
+from importlib import import_module
 
-from . import sim, utils, visualization
+from . import sim, utils
 from .sim import *
 from .utils import *
-from .visualization import *
 
-__version__ = pkg_resources.require("hypercontagion")[0].version
+# The visualization module pulls in matplotlib, so it is only imported on
+# first access. Simulation-only code never pays for it.
+_lazy_submodules = {"visualization"}
+_lazy_attributes = {
+    "contagion_animation": "visualization",
+    "stream_contagion_animation": "visualization",
+    "get_event_columns": "visualization",
+    "get_events_in_equal_time_intervals": "visualization",
+    "get_states_in_equal_time_intervals": "visualization",
+    "render_frames": "visualization",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return import_module(f".{name}", __name__)
+    if name in _lazy_attributes:
+        module = import_module(f".{_lazy_attributes[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    if name == "__version__":
+        from importlib.metadata import version
+
+        value = version("hypercontagion")
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _lazy_submodules | set(_lazy_attributes))
@@ -1,4 +1,18 @@
-from . import epidemics, functions, opinions
+from . import (
+    adaptive,
+    approximations,
+    batch,
+    epidemics,
+    functions,
+    opinions,
+    temporal,
+    thresholds,
+)
+from .adaptive import *
+from .approximations import *
+from .batch import *
 from .epidemics import *
 from .functions import *
 from .opinions import *
+from .temporal import *
+from .thresholds import *
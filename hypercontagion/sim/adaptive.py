@@ -0,0 +1,222 @@
+"""
+Contagion processes on adaptive hypergraphs, whose structure coevolves
+with the states of the nodes.
+"""
+
+import random
+from collections import defaultdict
+
+import numpy as np
+
+from ..exception import HyperContagionError
+from ..utils import SamplingDict
+from .functions import threshold
+
+__all__ = ["adaptive_Gillespie_SIS"]
+
+
+def adaptive_Gillespie_SIS(
+    H,
+    tau,
+    gamma,
+    w,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    rho=None,
+    tmin=0,
+    tmax=100,
+    return_edges=False,
+    seed=None,
+    **args
+):
+    """Simulates the SIS model on an adaptive hypergraph with the Gillespie algorithm.
+
+    Every susceptible member of a hyperedge with at least one infected
+    member leaves it at rate `w` and joins a random hyperedge without
+    infected members that it is not already in, if one is found by
+    rejection sampling. The sizes of the hyperedges therefore change
+    during the simulation.
+
+    The memberships, the number of infected members of every hyperedge,
+    and the samplers of the possible events are updated incrementally, so
+    the cost of an event is proportional to the size of the hyperedges
+    that it affects and `H` is never modified.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The initial hypergraph
+    tau : dict
+        Keys are edge sizes and values are transmission rates. Missing
+        sizes, which hyperedges can reach by rewiring, have rate 0.
+    gamma : float
+        Healing rate
+    w : float
+        Rewiring rate of a susceptible member of a hyperedge
+        with infected members.
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: 100
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    return_edges : bool, default: False
+        Whether to also return the final members of every hyperedge.
+    seed : integer, random_state, or None (default)
+        Indicator of random number generation state.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, and W, the cumulative number of rewirings. If
+        `return_edges` is True, a dict with edge IDs as keys and the
+        final sets of members as values is appended.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    if rho is not None and initial_infecteds is not None:
+        raise HyperContagionError("cannot define both initial_infecteds and rho")
+
+    if initial_infecteds is None:
+        if rho is None:
+            initial_number = 1
+        else:
+            initial_number = int(round(H.num_nodes * rho))
+        initial_infecteds = random.sample(list(H.nodes), initial_number)
+
+    # mutable copies of the structure
+    members = {e: set(edge) for e, edge in H.edges.members(dtype=dict).items()}
+    memberships = {n: set(edge_ids) for n, edge_ids in H.nodes.memberships().items()}
+
+    status = defaultdict(lambda: "S")
+    infecteds = SamplingDict()
+    for node in initial_infecteds:
+        status[node] = "I"
+        infecteds.update(node)
+
+    num_infected = {
+        e: sum(status[n] == "I" for n in edge) for e, edge in members.items()
+    }
+    # the edges that rewired nodes can join
+    safe_edges = SamplingDict()
+    for e, count in num_infected.items():
+        if count == 0:
+            safe_edges.update(e)
+
+    IS_links = defaultdict(SamplingDict)
+    # the memberships that can be rewired
+    SI_memberships = SamplingDict()
+
+    def clear_edge(e):
+        """Remove the links of an edge before its members change."""
+        links = IS_links[len(members[e])]
+        for n in members[e]:
+            if (e, n) in links:
+                links.remove((e, n))
+
+    def refresh_edge(e):
+        """Set the links and rewirable memberships of the members of an edge."""
+        edge = members[e]
+        links = IS_links[len(edge)]
+        for n in edge:
+            susceptible = status[n] == "S"
+            if susceptible and transmission_function(n, status, edge, **args) != 0:
+                links.update((e, n))
+            elif (e, n) in links:
+                links.remove((e, n))
+
+            if susceptible and num_infected[e] > 0:
+                SI_memberships.update((e, n))
+            elif (e, n) in SI_memberships:
+                SI_memberships.remove((e, n))
+
+    def change_status(node, increment):
+        for e in memberships[node]:
+            num_infected[e] += increment
+            if num_infected[e] == 0:
+                safe_edges.update(e)
+            elif num_infected[e] == 1 and increment == 1:
+                safe_edges.remove(e)
+            refresh_edge(e)
+
+    for e in members:
+        refresh_edge(e)
+
+    I = [len(infecteds)]
+    S = [H.num_nodes - I[0]]
+    W = [0]
+    times = [tmin]
+    t = tmin
+
+    while infecteds and t < tmax:
+        rates = [gamma * len(infecteds), w * len(SI_memberships)]
+        sizes = [size for size, links in IS_links.items() if links]
+        rates.extend(tau.get(size, 0) * len(IS_links[size]) for size in sizes)
+        total_rate = sum(rates)
+        if total_rate <= 0:
+            break
+        t += random.expovariate(total_rate)
+        if t >= tmax:
+            break
+
+        choice = random.random() * total_rate
+        if choice < rates[0]:
+            node = infecteds.random_removal()
+            status[node] = "S"
+            change_status(node, -1)
+            S.append(S[-1] + 1)
+            I.append(I[-1] - 1)
+            W.append(W[-1])
+        elif choice < rates[0] + rates[1]:
+            e, node = SI_memberships.choose_random()
+            clear_edge(e)
+            members[e].remove(node)
+            memberships[node].remove(e)
+            refresh_edge(e)
+            SI_memberships.remove((e, node))
+
+            # join a random edge without infected members
+            for _ in range(10):
+                if not safe_edges:
+                    break
+                f = safe_edges.choose_random()
+                if node not in members[f]:
+                    clear_edge(f)
+                    members[f].add(node)
+                    memberships[node].add(f)
+                    refresh_edge(f)
+                    break
+            S.append(S[-1])
+            I.append(I[-1])
+            W.append(W[-1] + 1)
+        else:
+            choice -= rates[0] + rates[1]
+            for size, rate in zip(sizes, rates[2:]):
+                if choice < rate:
+                    break
+                choice -= rate
+            _, node = IS_links[size].choose_random()
+            status[node] = "I"
+            infecteds.update(node)
+            change_status(node, 1)
+            S.append(S[-1] - 1)
+            I.append(I[-1] + 1)
+            W.append(W[-1])
+        times.append(t)
+
+    output = (np.array(times), np.array(S), np.array(I), np.array(W))
+    if return_edges:
+        output += (members,)
+    return output
@@ -0,0 +1,883 @@
+"""
+Deterministic approximations of contagion processes on hypergraphs.
+
+These solvers integrate the expected dynamics instead of sampling them,
+which makes them much faster than averaging many stochastic simulations.
+The contagion function is tabulated by edge size and number of infected
+neighbors, so it must only depend on the number of infected neighbors,
+which is the case for all the built-in functions.
+"""
+
+import numpy as np
+
+from ..exception import HyperContagionError
+from ..utils.utilities import _weights
+from .functions import _probe_counts, threshold
+
+__all__ = [
+    "mean_field_SIS",
+    "mean_field_SIR",
+    "pair_approximation_SIS",
+    "pair_approximation_SIR",
+    "microscopic_markov_SIS",
+    "microscopic_markov_SIR",
+]
+
+
+def mean_field_SIS(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    rho=None,
+    tmin=0,
+    tmax=100,
+    dt=0.1,
+    rtol=1e-6,
+    **args
+):
+    """Integrates the heterogeneous mean-field SIS model for hypergraphs.
+
+    Nodes are grouped by their number of memberships in edges of each size
+    and the members of each edge are assumed to be infected independently
+    with the probability that a random membership of an edge of that size
+    is infected.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined. If neither is specified,
+        one node is initially infected on average.
+    tmin : float, default: 0
+        Time at which the integration starts.
+    tmax : float, default: 100
+        Time at which the integration stops.
+    dt : float, default: 0.1
+        The time between the returned points.
+    rtol : float, default: 1e-6
+        The relative tolerance of the adaptive solver.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, the expected number of nodes in each state.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    M, P, infected, _ = _node_classes(H, initial_infecteds, None, rho)
+    sizes, rates = _size_rates(H, tau, transmission_function, **args)
+    binomials = _binomials(sizes)
+
+    def rhs(t, i):
+        return -gamma * i + (1 - i) * (M @ _mean_field_rates(M, P, i, rates, binomials))
+
+    t, (i,) = _integrate(rhs, [infected], tmin, tmax, dt, rtol)
+    I = H.num_nodes * P @ i
+    return t, H.num_nodes - I, I
+
+
+def mean_field_SIR(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    initial_recovereds=None,
+    rho=None,
+    tmin=0,
+    tmax=100,
+    dt=0.1,
+    rtol=1e-6,
+    **args
+):
+    """Integrates the heterogeneous mean-field SIR model for hypergraphs.
+
+    Nodes are grouped by their number of memberships in edges of each size
+    and the members of each edge are assumed to be infected independently
+    with the probability that a random membership of an edge of that size
+    is infected.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIR contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    initial_recovereds : iterable, default: None
+        Initially recovered node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined. If neither is specified,
+        one node is initially infected on average.
+    tmin : float, default: 0
+        Time at which the integration starts.
+    tmax : float, default: 100
+        Time at which the integration stops.
+    dt : float, default: 0.1
+        The time between the returned points.
+    rtol : float, default: 1e-6
+        The relative tolerance of the adaptive solver.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, R, the expected number of nodes in each state.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    M, P, infected, recovered = _node_classes(
+        H, initial_infecteds, initial_recovereds, rho
+    )
+    sizes, rates = _size_rates(H, tau, transmission_function, **args)
+    binomials = _binomials(sizes)
+    n = len(P)
+
+    def rhs(t, y):
+        s, i = y[:n], y[n:]
+        infection = s * (M @ _mean_field_rates(M, P, i, rates, binomials))
+        return np.concatenate([-infection, infection - gamma * i])
+
+    t, (s, i) = _integrate(
+        rhs, [1 - infected - recovered, infected], tmin, tmax, dt, rtol
+    )
+    S = H.num_nodes * P @ s
+    I = H.num_nodes * P @ i
+    return t, S, I, H.num_nodes - S - I
+
+
+def pair_approximation_SIS(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    rho=None,
+    tmin=0,
+    tmax=100,
+    dt=0.1,
+    rtol=1e-6,
+    **args
+):
+    """Integrates the pair approximation of the SIS model for hypergraphs.
+
+    The number of infected members of each edge is tracked with a master
+    equation for each edge size, which captures the correlations within
+    edges. Nodes are grouped by their number of memberships in edges of
+    each size and the infection pressure from their other edges is closed
+    at the mean-field level, as in St-Onge et al. (2021).
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined. If neither is specified,
+        one node is initially infected on average.
+    tmin : float, default: 0
+        Time at which the integration starts.
+    tmax : float, default: 100
+        Time at which the integration stops.
+    dt : float, default: 0.1
+        The time between the returned points.
+    rtol : float, default: 1e-6
+        The relative tolerance of the adaptive solver.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, the expected number of nodes in each state.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    return _pair_approximation(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        None,
+        rho,
+        tmin,
+        tmax,
+        dt,
+        rtol,
+        "SIS",
+        **args
+    )
+
+
+def pair_approximation_SIR(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    initial_recovereds=None,
+    rho=None,
+    tmin=0,
+    tmax=100,
+    dt=0.1,
+    rtol=1e-6,
+    **args
+):
+    """Integrates the pair approximation of the SIR model for hypergraphs.
+
+    The number of susceptible and infected members of each edge is tracked
+    with a master equation for each edge size, which captures the
+    correlations within edges. Nodes are grouped by their number of
+    memberships in edges of each size and the infection pressure from
+    their other edges is closed at the mean-field level.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIR contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    initial_recovereds : iterable, default: None
+        Initially recovered node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined. If neither is specified,
+        one node is initially infected on average.
+    tmin : float, default: 0
+        Time at which the integration starts.
+    tmax : float, default: 100
+        Time at which the integration stops.
+    dt : float, default: 0.1
+        The time between the returned points.
+    rtol : float, default: 1e-6
+        The relative tolerance of the adaptive solver.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, R, the expected number of nodes in each state.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    return _pair_approximation(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        tmin,
+        tmax,
+        dt,
+        rtol,
+        "SIR",
+        **args
+    )
+
+
+def microscopic_markov_SIS(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    rho=None,
+    recovery_weight=None,
+    transmission_weight=None,
+    tmin=0,
+    tmax=100,
+    dt=1.0,
+    return_node_probabilities=False,
+    **args
+):
+    """Iterates the microscopic Markov chain of the discrete SIS model.
+
+    This is the deterministic counterpart of `discrete_SIS`: the probability
+    that each node is infected is evolved on the hypergraph itself. The
+    number of infected neighbors in each edge follows a Poisson binomial
+    distribution of the probabilities of the other members, and the edges
+    of a node are assumed to transmit independently.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined. If neither is specified,
+        one node is initially infected on average.
+    recovery_weight : hashable, default: None
+        Hypergraph node attribute that weights the healing rate.
+    transmission_weight : hashable, default: None
+        Hypergraph edge attribute that weights the transmission rate.
+    tmin : float, default: 0
+        Time at which the iteration starts.
+    tmax : float, default: 100
+        Time at which the iteration stops.
+    dt : float, default: 1.0
+        The time step.
+    return_node_probabilities : bool, default: False
+        Whether to also return the probability of each state for every node.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, the expected number of nodes in each state. If
+        `return_node_probabilities` is True, a dict is appended with keys
+        "S" and "I" and arrays of shape (len(t), number of nodes) as values,
+        with the nodes in the order of `H.nodes`.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    i, _, recovery, groups = _markov_setup(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        None,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        dt,
+        **args
+    )
+    t = np.arange(tmin, tmax + dt / 2, dt)
+    infected = np.empty((len(t), H.num_nodes))
+    infected[0] = i
+    for step in range(1, len(t)):
+        escape = _escape_probability(i, groups, H.num_nodes)
+        i = i * (1 - recovery) + (1 - i) * (1 - escape)
+        infected[step] = i
+
+    I = infected.sum(axis=1)
+    output = (t, H.num_nodes - I, I)
+    if return_node_probabilities:
+        output += ({"S": 1 - infected, "I": infected},)
+    return output
+
+
+def microscopic_markov_SIR(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    initial_recovereds=None,
+    rho=None,
+    recovery_weight=None,
+    transmission_weight=None,
+    tmin=0,
+    tmax=100,
+    dt=1.0,
+    return_node_probabilities=False,
+    **args
+):
+    """Iterates the microscopic Markov chain of the discrete SIR model.
+
+    This is the deterministic counterpart of `discrete_SIR`: the probability
+    that each node is in each state is evolved on the hypergraph itself. The
+    number of infected neighbors in each edge follows a Poisson binomial
+    distribution of the probabilities of the other members, and the edges
+    of a node are assumed to transmit independently.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIR contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    initial_recovereds : iterable, default: None
+        Initially recovered node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined. If neither is specified,
+        one node is initially infected on average.
+    recovery_weight : hashable, default: None
+        Hypergraph node attribute that weights the healing rate.
+    transmission_weight : hashable, default: None
+        Hypergraph edge attribute that weights the transmission rate.
+    tmin : float, default: 0
+        Time at which the iteration starts.
+    tmax : float, default: 100
+        Time at which the iteration stops.
+    dt : float, default: 1.0
+        The time step.
+    return_node_probabilities : bool, default: False
+        Whether to also return the probability of each state for every node.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, R, the expected number of nodes in each state. If
+        `return_node_probabilities` is True, a dict is appended with keys
+        "S", "I", and "R" and arrays of shape (len(t), number of nodes) as
+        values, with the nodes in the order of `H.nodes`.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    i, r, recovery, groups = _markov_setup(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        dt,
+        **args
+    )
+    s = 1 - i - r
+    t = np.arange(tmin, tmax + dt / 2, dt)
+    susceptible = np.empty((len(t), H.num_nodes))
+    infected = np.empty((len(t), H.num_nodes))
+    susceptible[0] = s
+    infected[0] = i
+    for step in range(1, len(t)):
+        new_infections = s * (1 - _escape_probability(i, groups, H.num_nodes))
+        s, i = s - new_infections, i * (1 - recovery) + new_infections
+        susceptible[step] = s
+        infected[step] = i
+
+    recovered = 1 - susceptible - infected
+    S = susceptible.sum(axis=1)
+    I = infected.sum(axis=1)
+    output = (t, S, I, H.num_nodes - S - I)
+    if return_node_probabilities:
+        output += ({"S": susceptible, "I": infected, "R": recovered},)
+    return output
+
+
+def _pair_approximation(
+    H,
+    tau,
+    gamma,
+    transmission_function,
+    initial_infecteds,
+    initial_recovereds,
+    rho,
+    tmin,
+    tmax,
+    dt,
+    rtol,
+    model,
+    **args
+):
+    """Integrates the pair approximation of the SIS or SIR model."""
+    M, P, infected, recovered = _node_classes(
+        H, initial_infecteds, initial_recovereds, rho
+    )
+    sizes, rates = _size_rates(H, tau, transmission_function, **args)
+    n = len(P)
+
+    # the states of the edges are (size, susceptible members, infected members)
+    states = [
+        (k, size, s, i)
+        for k, size in enumerate(sizes)
+        for s in range(size + 1)
+        for i in range(size + 1 - s)
+        if model == "SIR" or s + i == size
+    ]
+    index = {state[1:]: j for j, state in enumerate(states)}
+    size_index, size, s, i = (np.array(column) for column in zip(*states))
+    # the infection rate of a susceptible member from within its edge
+    beta = rates[size_index, i]
+    infection_target = np.array(
+        [index.get((n_, s_ - 1, i_ + 1), j) for j, (_, n_, s_, i_) in enumerate(states)]
+    )
+    r = 1 if model == "SIS" else 0
+    recovery_target = np.array(
+        [index.get((n_, s_ + r, i_ - 1), j) for j, (_, n_, s_, i_) in enumerate(states)]
+    )
+
+    c0 = _initial_edge_states(
+        H, states, index, initial_infecteds, initial_recovereds, rho
+    )
+
+    def rhs(t, y):
+        x, i_node, c = y[:n], y[n : 2 * n], y[2 * n :]
+        # the rate at which a susceptible member is infected within its edge
+        pressure = np.bincount(size_index, weights=c * s * beta, minlength=len(sizes))
+        exposure = np.bincount(size_index, weights=c * s, minlength=len(sizes))
+        within = np.divide(
+            pressure, exposure, out=np.zeros(len(sizes)), where=exposure > 0
+        )
+        # the rate from the other edges of a susceptible member
+        weight = (P * x) @ M
+        outside = np.divide(
+            (P * x * (M @ within)) @ M - within * weight,
+            weight,
+            out=np.zeros(len(sizes)),
+            where=weight > 0,
+        )
+        infection = s * (beta + outside[size_index]) * c
+        recovery = gamma * i * c
+        dc = (
+            np.bincount(infection_target, weights=infection, minlength=len(c))
+            - infection
+            + np.bincount(recovery_target, weights=recovery, minlength=len(c))
+            - recovery
+        )
+        new_infections = x * (M @ within)
+        if model == "SIS":
+            dx = gamma * i_node - new_infections
+        else:
+            dx = -new_infections
+        di = new_infections - gamma * i_node
+        return np.concatenate([dx, di, dc])
+
+    t, (x, i_node, _) = _integrate(
+        rhs, [1 - infected - recovered, infected, c0], tmin, tmax, dt, rtol
+    )
+    S = H.num_nodes * P @ x
+    I = H.num_nodes * P @ i_node
+    if model == "SIS":
+        return t, S, I
+    return t, S, I, H.num_nodes - S - I
+
+
+def _node_classes(H, initial_infecteds, initial_recovereds, rho):
+    """Group the nodes by their number of memberships in edges of each size.
+
+    Returns
+    -------
+    M : np.ndarray
+        C x K matrix of the number of memberships of each class in the edges
+        of each of the K unique edge sizes.
+    P : np.ndarray
+        the fraction of nodes in each class.
+    infected, recovered : np.ndarray
+        the initial fraction of infected and recovered nodes in each class.
+    """
+    if rho is not None and initial_infecteds is not None:
+        raise HyperContagionError("cannot define both initial_infecteds and rho")
+
+    members = H.edges.members(dtype=dict)
+    sizes = sorted({len(e) for e in members.values()})
+    size_index = {size: k for k, size in enumerate(sizes)}
+
+    degrees = np.zeros((H.num_nodes, len(sizes)), dtype=int)
+    node_index = {n: j for j, n in enumerate(H.nodes)}
+    for n, edge_ids in H.nodes.memberships().items():
+        for e in edge_ids:
+            degrees[node_index[n], size_index[len(members[e])]] += 1
+    M, classes, counts = np.unique(
+        degrees, axis=0, return_inverse=True, return_counts=True
+    )
+    classes = classes.ravel()
+    P = counts / H.num_nodes
+
+    if initial_infecteds is None:
+        if rho is None:
+            rho = 1 / H.num_nodes
+        infected = np.full(len(P), rho)
+    else:
+        infected = _class_fractions(initial_infecteds, node_index, classes, counts)
+    if initial_recovereds is None:
+        recovered = np.zeros(len(P))
+    else:
+        recovered = _class_fractions(initial_recovereds, node_index, classes, counts)
+    return M.astype(float), P, infected, recovered
+
+
+def _class_fractions(nodes, node_index, classes, counts):
+    """The fraction of the nodes of each class that are in a set."""
+    indices = [node_index[n] for n in nodes]
+    return np.bincount(classes[indices], minlength=len(counts)) / counts
+
+
+def _size_rates(H, tau, transmission_function, **args):
+    """The infection rate of a susceptible member of an edge.
+
+    Returns
+    -------
+    sizes : list of int
+        the unique edge sizes.
+    rates : np.ndarray
+        K x (max size + 1) matrix where entry (k, i) is the rate at which a
+        susceptible member of an edge of the kth size with i infected
+        members is infected through that edge.
+    """
+    sizes = sorted({len(e) for e in H.edges.members()})
+    table = _probe_counts(transmission_function, sizes, **args)
+    rates = np.zeros((len(sizes), max(sizes) + 1))
+    for k, size in enumerate(sizes):
+        rates[k, : size + 1] = tau[size] * table[size]
+    return sizes, rates
+
+
+def _binomials(sizes):
+    """The binomial coefficients and exponents for each edge size.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        K x (max size) matrices of the coefficients C(size - 1, k), the
+        exponents k, and the exponents size - 1 - k, zero when k > size - 1.
+    """
+    from scipy.special import comb
+
+    sizes = np.array(sizes)[:, None]
+    k = np.arange(sizes.max())[None, :]
+    valid = k <= sizes - 1
+    coefficients = np.where(valid, comb(sizes - 1, k), 0)
+    return (
+        coefficients,
+        np.broadcast_to(k, valid.shape),
+        np.where(valid, sizes - 1 - k, 0),
+    )
+
+
+def _mean_field_rates(M, P, i, rates, binomials):
+    """The expected infection rate of a susceptible member of each edge size."""
+    coefficients, k, l = binomials
+    memberships = P @ M
+    theta = np.divide(
+        (P * i) @ M, memberships, out=np.zeros(len(memberships)), where=memberships > 0
+    )
+    theta = np.clip(theta, 0, 1)[:, None]
+    pmf = coefficients * theta**k * (1 - theta) ** l
+    return np.sum(pmf * rates[:, : k.shape[1]], axis=1)
+
+
+def _initial_edge_states(H, states, index, initial_infecteds, initial_recovereds, rho):
+    """The initial fraction of edges of each size in each state."""
+    from scipy.special import comb
+
+    c = np.zeros(len(states))
+    members = H.edges.members(dtype=dict)
+    if initial_infecteds is None:
+        if rho is None:
+            rho = 1 / H.num_nodes
+        for j, (_, size, s, i) in enumerate(states):
+            if s + i == size:
+                c[j] = comb(size, i) * rho**i * (1 - rho) ** s
+        return c
+
+    infected = set(initial_infecteds)
+    recovered = set(initial_recovereds) if initial_recovereds is not None else set()
+    counts = dict()
+    for edge in members.values():
+        i = len(infected.intersection(edge))
+        r = len(recovered.intersection(edge))
+        s = len(edge) - i - r
+        c[index[len(edge), s, i]] += 1
+        counts[len(edge)] = counts.get(len(edge), 0) + 1
+    for j, (_, size, _, _) in enumerate(states):
+        c[j] /= counts[size]
+    return c
+
+
+def _integrate(rhs, y0, tmin, tmax, dt, rtol):
+    """Integrate the ODEs and split the solution like the initial condition."""
+    from scipy.integrate import solve_ivp
+
+    lengths = [len(y) for y in y0]
+    t = np.arange(tmin, tmax + dt / 2, dt)
+    solution = solve_ivp(
+        rhs, (tmin, t[-1]), np.concatenate(y0), t_eval=t, rtol=rtol, atol=rtol * 1e-3
+    )
+    if not solution.success:
+        raise HyperContagionError(solution.message)
+    return solution.t, np.split(solution.y, np.cumsum(lengths)[:-1])
+
+
+def _markov_setup(
+    H,
+    tau,
+    gamma,
+    transmission_function,
+    initial_infecteds,
+    initial_recovereds,
+    rho,
+    recovery_weight,
+    transmission_weight,
+    dt,
+    **args
+):
+    """The initial probabilities and the edges grouped by size.
+
+    Returns
+    -------
+    infected, recovered : np.ndarray
+        the initial probability that each node is infected or recovered.
+    recovery : np.ndarray
+        the probability that each infected node recovers in a time step.
+    groups : list of tuples
+        for each edge size, the edge IDs, the E x size array of member
+        indices, the probability of transmission of each edge per unit of
+        contagion, and the contagion function by number of infected
+        neighbors.
+    """
+    if rho is not None and initial_infecteds is not None:
+        raise HyperContagionError("cannot define both initial_infecteds and rho")
+
+    node_index = {n: j for j, n in enumerate(H.nodes)}
+    infected = np.zeros(H.num_nodes)
+    if initial_infecteds is None:
+        infected[:] = 1 / H.num_nodes if rho is None else rho
+    else:
+        infected[[node_index[n] for n in initial_infecteds]] = 1
+    recovered = np.zeros(H.num_nodes)
+    if initial_recovereds is not None:
+        recovered[[node_index[n] for n in initial_recovereds]] = 1
+
+    recovery = np.clip(gamma * dt * _weights(H.nodes, recovery_weight), 0, 1)
+    transmission_weights = dict(zip(H.edges, _weights(H.edges, transmission_weight)))
+
+    members = H.edges.members(dtype=dict)
+    edges_by_size = dict()
+    for edge_id, edge in members.items():
+        edges_by_size.setdefault(len(edge), []).append(edge_id)
+    table = _probe_counts(transmission_function, edges_by_size, **args)
+
+    groups = []
+    for size, edge_ids in sorted(edges_by_size.items()):
+        indices = np.array(
+            [[node_index[n] for n in members[e]] for e in edge_ids], dtype=int
+        ).reshape(len(edge_ids), size)
+        transmission = (
+            tau[size] * dt * np.array([transmission_weights[e] for e in edge_ids])
+        )
+        groups.append((np.array(edge_ids), indices, transmission, table[size]))
+    return infected, recovered, recovery, groups
+
+
+def _escape_probability(infected, groups, n):
+    """The probability that each node is not infected through any of its edges.
+
+    Parameters
+    ----------
+    infected : np.ndarray
+        the probability that each node is infected.
+    groups : list of tuples
+        the output of `_markov_setup`.
+    n : int
+        the number of nodes.
+
+    Returns
+    -------
+    np.ndarray
+        the product over the edges of each node of the probability
+        that the edge does not transmit to it.
+    """
+    log_escape = np.zeros(n)
+    for _, indices, transmission, table in groups:
+        contagion = _expected_contagion(infected[indices], table)
+        probability = np.clip(transmission[:, None] * contagion, 0, 1)
+        with np.errstate(divide="ignore"):
+            log_escape += np.bincount(
+                indices.ravel(), weights=np.log1p(-probability).ravel(), minlength=n
+            )
+    return np.exp(log_escape)
+
+
+def _expected_contagion(p, table, chunk_size=2**20):
+    """The expected contagion function of each member of each edge.
+
+    The number of infected neighbors of a member is Poisson binomial with
+    the probabilities of the other members. Its distribution is the
+    convolution of the distributions of the members before and after it,
+    which are computed for all edges of a size at once.
+
+    Parameters
+    ----------
+    p : np.ndarray
+        E x size array of the probability that each member is infected.
+    table : np.ndarray
+        the contagion function by number of infected neighbors.
+    chunk_size : int, default: 2**20
+        the approximate number of floats per chunk of edges.
+
+    Returns
+    -------
+    np.ndarray
+        E x size array of the expected contagion function of each member.
+    """
+    num_edges, size = p.shape
+    # F[a, b] is the contagion function with a + b infected neighbors
+    F = table[np.minimum(np.add.outer(np.arange(size), np.arange(size)), size)]
+    step = max(1, chunk_size // (size * size))
+    out = np.empty(p.shape)
+    for start in range(0, num_edges, step):
+        q = p[start : start + step, :, None]
+        # suffix[m] is the distribution of the number infected after the mth member
+        suffix = np.zeros((size + 1, len(q), size))
+        suffix[size, :, 0] = 1
+        for j in range(size - 1, 0, -1):
+            suffix[j] = suffix[j + 1] * (1 - q[:, j])
+            suffix[j, :, 1:] += suffix[j + 1, :, :-1] * q[:, j]
+        # prefix is the distribution of the number infected before the mth member
+        prefix = np.zeros((len(q), size))
+        prefix[:, 0] = 1
+        for m in range(size):
+            out[start : start + step, m] = np.sum((prefix @ F) * suffix[m + 1], axis=1)
+            shifted = prefix * q[:, m]
+            prefix *= 1 - q[:, m]
+            prefix[:, 1:] += shifted[:, :-1]
+    return out
@@ -0,0 +1,676 @@
+"""
+Many realizations of the discrete-time epidemic models advanced together.
+"""
+
+import numpy as np
+
+from .approximations import _markov_setup
+from .functions import threshold, vectorize
+
+__all__ = [
+    "batch_discrete_SIS",
+    "batch_discrete_SIR",
+    "packed_discrete_SIS",
+    "packed_discrete_SIR",
+]
+
+
+def batch_discrete_SIS(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    realizations=100,
+    initial_infecteds=None,
+    rho=None,
+    recovery_weight=None,
+    transmission_weight=None,
+    tmin=0,
+    tmax=100,
+    dt=1.0,
+    seed=None,
+    **args
+):
+    """Simulates many realizations of the discrete SIS model at once.
+
+    The states of all the realizations are stored in an N x R matrix and
+    each time step is a few sparse products with the incidence matrix of
+    every edge size followed by vectorized random draws, so the hypergraph
+    is traversed once per step for all the realizations. Each realization
+    follows the same process as `discrete_SIS`, assuming that the contagion
+    function only depends on the hyperedge and its number of infected
+    neighbors, and stops when it has no infected nodes.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+        It is evaluated for all the hyperedges at once with its vectorized
+        version, see `vectorize`.
+    realizations : int, default: 100
+        The number of realizations.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs, the same in every realization.
+    rho : float, default: None
+        Fraction initially infected, drawn independently in every
+        realization. Cannot be specified if `initial_infecteds` is defined.
+    recovery_weight : hashable, default: None
+        Hypergraph node attribute that weights the healing rate.
+    transmission_weight : hashable, default: None
+        Hypergraph edge attribute that weights the transmission rate.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: 100
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    dt : float, default: 1.0
+        The time step of the simulation.
+    seed : int, default: None
+        The seed of the NumPy random generator.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, where S and I have shape (len(t), realizations).
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    t, S, I, _ = _batch_discrete(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        realizations,
+        initial_infecteds,
+        None,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        tmin,
+        tmax,
+        dt,
+        seed,
+        False,
+        **args
+    )
+    return t, S, I
+
+
+def batch_discrete_SIR(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    realizations=100,
+    initial_infecteds=None,
+    initial_recovereds=None,
+    rho=None,
+    recovery_weight=None,
+    transmission_weight=None,
+    tmin=0,
+    tmax=float("Inf"),
+    dt=1.0,
+    seed=None,
+    **args
+):
+    """Simulates many realizations of the discrete SIR model at once.
+
+    The states of all the realizations are stored in N x R matrices and
+    each time step is a few sparse products with the incidence matrix of
+    every edge size followed by vectorized random draws, so the hypergraph
+    is traversed once per step for all the realizations. Each realization
+    follows the same process as `discrete_SIR`, assuming that the contagion
+    function only depends on the hyperedge and its number of infected
+    neighbors, and stops when it has no infected nodes.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIR contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+        It is evaluated for all the hyperedges at once with its vectorized
+        version, see `vectorize`.
+    realizations : int, default: 100
+        The number of realizations.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs, the same in every realization.
+    initial_recovereds : iterable, default: None
+        Initially recovered node IDs, the same in every realization.
+    rho : float, default: None
+        Fraction initially infected, drawn independently in every
+        realization. Cannot be specified if `initial_infecteds` is defined.
+    recovery_weight : hashable, default: None
+        Hypergraph node attribute that weights the healing rate.
+    transmission_weight : hashable, default: None
+        Hypergraph edge attribute that weights the transmission rate.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: float("Inf")
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    dt : float, default: 1.0
+        The time step of the simulation.
+    seed : int, default: None
+        The seed of the NumPy random generator.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, R, where S, I, and R have shape (len(t), realizations).
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    return _batch_discrete(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        realizations,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        tmin,
+        tmax,
+        dt,
+        seed,
+        True,
+        **args
+    )
+
+
+def _batch_discrete(
+    H,
+    tau,
+    gamma,
+    transmission_function,
+    realizations,
+    initial_infecteds,
+    initial_recovereds,
+    rho,
+    recovery_weight,
+    transmission_weight,
+    tmin,
+    tmax,
+    dt,
+    seed,
+    immunity,
+    **args
+):
+    """The batched discrete engine, where recovered nodes are immune if
+    `immunity` is True and susceptible otherwise."""
+    from scipy.sparse import csr_matrix
+
+    _, _, recovery, groups = _markov_setup(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        dt,
+        **args
+    )
+    rng = np.random.default_rng(seed)
+    n = H.num_nodes
+    infected, recovered = _initial_states(
+        H, realizations, initial_infecteds, initial_recovereds, rho, rng
+    )
+
+    contagion = vectorize(transmission_function, H)
+    # the N x E incidence matrix and transmission probabilities of each
+    # edge size
+    incidences = []
+    for edge_ids, indices, transmission, _ in groups:
+        num_edges, size = indices.shape
+        incidence = csr_matrix(
+            (
+                np.ones(indices.size),
+                (indices.ravel(), np.repeat(np.arange(num_edges), size)),
+            ),
+            shape=(n, num_edges),
+        )
+        incidences.append(
+            (edge_ids[:, None], size, incidence, incidence.T.tocsr(), transmission)
+        )
+
+    t = tmin
+    times = [t]
+    I = [infected.sum(axis=0)]
+    R = [recovered.sum(axis=0)]
+    while t <= tmax and I[-1].any():
+        # the realizations without infected nodes are over
+        alive = I[-1] > 0
+        log_escape = np.zeros((n, realizations))
+        X = infected.astype(float)
+        for edge_ids, size, incidence, transpose, transmission in incidences:
+            # a susceptible member has as many infected neighbors as the edge
+            counts = np.rint(transpose @ X).astype(int)
+            factors = contagion(edge_ids, size, counts, "S", **args)
+            probability = np.clip(transmission[:, None] * factors, 0, 1)
+            with np.errstate(divide="ignore"):
+                log_escape += incidence @ np.log1p(-probability)
+
+        susceptible = ~infected & ~recovered & alive
+        newly_infected = susceptible & (
+            rng.random((n, realizations)) < -np.expm1(log_escape)
+        )
+        recovering = infected & (rng.random((n, realizations)) < recovery[:, None])
+        infected = (infected & ~recovering) | newly_infected
+        if immunity:
+            recovered |= recovering
+
+        t += dt
+        times.append(t)
+        I.append(infected.sum(axis=0))
+        R.append(recovered.sum(axis=0))
+
+    I = np.array(I)
+    R = np.array(R)
+    return np.array(times), n - I - R, I, R
+
+
+def packed_discrete_SIS(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    realizations=64,
+    initial_infecteds=None,
+    rho=None,
+    recovery_weight=None,
+    transmission_weight=None,
+    tmin=0,
+    tmax=100,
+    dt=1.0,
+    seed=None,
+    **args
+):
+    """Simulates many realizations of the discrete SIS model with bitwise operations.
+
+    The state of each node in 64 realizations is packed into the bits of
+    a 64-bit word. The number of infected members of every edge is counted
+    with bit-sliced additions, and the transitions are drawn as random
+    words whose bits are 1 with the required probability, so each
+    operation advances 64 realizations and the states use one bit per
+    node and realization. This suits large ensembles, e.g., to estimate
+    survival probabilities. Each realization follows the same process as
+    `discrete_SIS`, assuming that the contagion function only depends on
+    the hyperedge and its number of infected neighbors, and stops when it
+    has no infected nodes.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+        It is evaluated for all the hyperedges at once with its vectorized
+        version, see `vectorize`.
+    realizations : int, default: 64
+        The number of realizations, preferably a multiple of 64.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs, the same in every realization.
+    rho : float, default: None
+        Fraction initially infected, drawn independently in every
+        realization. Cannot be specified if `initial_infecteds` is defined.
+    recovery_weight : hashable, default: None
+        Hypergraph node attribute that weights the healing rate.
+    transmission_weight : hashable, default: None
+        Hypergraph edge attribute that weights the transmission rate.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: 100
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    dt : float, default: 1.0
+        The time step of the simulation.
+    seed : int, default: None
+        The seed of the NumPy random generator.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, where S and I have shape (len(t), realizations).
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    t, S, I, _ = _packed_discrete(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        realizations,
+        initial_infecteds,
+        None,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        tmin,
+        tmax,
+        dt,
+        seed,
+        False,
+        **args
+    )
+    return t, S, I
+
+
+def packed_discrete_SIR(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    realizations=64,
+    initial_infecteds=None,
+    initial_recovereds=None,
+    rho=None,
+    recovery_weight=None,
+    transmission_weight=None,
+    tmin=0,
+    tmax=float("Inf"),
+    dt=1.0,
+    seed=None,
+    **args
+):
+    """Simulates many realizations of the discrete SIR model with bitwise operations.
+
+    The state of each node in 64 realizations is packed into the bits of
+    64-bit words. The number of infected members of every edge is counted
+    with bit-sliced additions, and the transitions are drawn as random
+    words whose bits are 1 with the required probability, so each
+    operation advances 64 realizations and the states use two bits per
+    node and realization. This suits large ensembles, e.g., to estimate
+    outbreak-size distributions. Each realization follows the same process
+    as `discrete_SIR`, assuming that the contagion function only depends
+    on the hyperedge and its number of infected neighbors, and stops when
+    it has no infected nodes.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIR contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+        It is evaluated for all the hyperedges at once with its vectorized
+        version, see `vectorize`.
+    realizations : int, default: 64
+        The number of realizations, preferably a multiple of 64.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs, the same in every realization.
+    initial_recovereds : iterable, default: None
+        Initially recovered node IDs, the same in every realization.
+    rho : float, default: None
+        Fraction initially infected, drawn independently in every
+        realization. Cannot be specified if `initial_infecteds` is defined.
+    recovery_weight : hashable, default: None
+        Hypergraph node attribute that weights the healing rate.
+    transmission_weight : hashable, default: None
+        Hypergraph edge attribute that weights the transmission rate.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: float("Inf")
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    dt : float, default: 1.0
+        The time step of the simulation.
+    seed : int, default: None
+        The seed of the NumPy random generator.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, R, where S, I, and R have shape (len(t), realizations).
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    return _packed_discrete(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        realizations,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        tmin,
+        tmax,
+        dt,
+        seed,
+        True,
+        **args
+    )
+
+
+def _packed_discrete(
+    H,
+    tau,
+    gamma,
+    transmission_function,
+    realizations,
+    initial_infecteds,
+    initial_recovereds,
+    rho,
+    recovery_weight,
+    transmission_weight,
+    tmin,
+    tmax,
+    dt,
+    seed,
+    immunity,
+    **args
+):
+    """The bit-packed discrete engine, where recovered nodes are immune if
+    `immunity` is True and susceptible otherwise."""
+    _, _, recovery, groups = _markov_setup(
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        recovery_weight,
+        transmission_weight,
+        dt,
+        **args
+    )
+    rng = np.random.default_rng(seed)
+    n = H.num_nodes
+    words = -(-realizations // 64)
+    infected, recovered = _initial_states(
+        H, realizations, initial_infecteds, initial_recovereds, rho, rng
+    )
+    infected = _pack(infected, words)
+    recovered = _pack(recovered, words)
+
+    # the memberships of each edge size sorted by node, so that the
+    # transmissions to a node can be combined with a single reduction
+    contagion = vectorize(transmission_function, H)
+    memberships = []
+    for edge_ids, indices, transmission, _ in groups:
+        flat = indices.ravel()
+        order = np.argsort(flat, kind="stable")
+        nodes, starts = np.unique(flat[order], return_index=True)
+        memberships.append((edge_ids, indices, transmission, order, nodes, starts))
+
+    t = tmin
+    times = [t]
+    I = [_unpack_counts(infected, realizations)]
+    R = [_unpack_counts(recovered, realizations)]
+    # the bits of the realizations that still have infected nodes
+    alive = np.bitwise_or.reduce(infected, axis=0)
+    while t <= tmax and alive.any():
+        hit = np.zeros((n, words), dtype=np.uint64)
+        for edge_ids, indices, transmission, order, nodes, starts in memberships:
+            num_edges, size = indices.shape
+            planes = _bit_sliced_counts(infected[indices])
+            transmitted = np.zeros((num_edges, size, words), dtype=np.uint64)
+            # a susceptible member has as many infected neighbors as the edge
+            for k in range(size):
+                factors = contagion(edge_ids, size, np.full(num_edges, k), "S", **args)
+                if not factors.any():
+                    continue
+                equal = np.full((num_edges, words), ~np.uint64(0))
+                for j, plane in enumerate(planes):
+                    equal &= plane if (k >> j) & 1 else ~plane
+                rows = np.flatnonzero(equal.any(axis=1) & (factors != 0))
+                if len(rows) == 0:
+                    continue
+                p = np.repeat(
+                    transmission[rows, None] * factors[rows, None], size, axis=1
+                )
+                draws = _random_bits(rng, p, (len(rows), size, words))
+                transmitted[rows] |= equal[rows, None, :] & draws
+            transmitted = transmitted.reshape(num_edges * size, words)[order]
+            hit[nodes] |= np.bitwise_or.reduceat(transmitted, starts, axis=0)
+
+        recovering = infected & _random_bits(rng, recovery, (n, words))
+        susceptible = ~infected & ~recovered & alive
+        infected = (infected & ~recovering) | (susceptible & hit)
+        if immunity:
+            recovered |= recovering
+        alive = np.bitwise_or.reduce(infected, axis=0)
+
+        t += dt
+        times.append(t)
+        I.append(_unpack_counts(infected, realizations))
+        R.append(_unpack_counts(recovered, realizations))
+
+    I = np.array(I)
+    R = np.array(R)
+    return np.array(times), n - I - R, I, R
+
+
+def _initial_states(H, realizations, initial_infecteds, initial_recovereds, rho, rng):
+    """The N x R boolean matrices of the initially infected and recovered nodes."""
+    n = H.num_nodes
+    node_index = {node: i for i, node in enumerate(H.nodes)}
+
+    infected = np.zeros((n, realizations), dtype=bool)
+    if initial_infecteds is None:
+        initial_number = 1 if rho is None else int(round(n * rho))
+        for r in range(realizations):
+            infected[rng.choice(n, initial_number, replace=False), r] = True
+    else:
+        infected[[node_index[node] for node in initial_infecteds]] = True
+    recovered = np.zeros((n, realizations), dtype=bool)
+    if initial_recovereds is not None:
+        recovered[[node_index[node] for node in initial_recovereds]] = True
+        infected &= ~recovered
+    return infected, recovered
+
+
+def _pack(states, words):
+    """Pack an N x R boolean matrix into N x `words` 64-bit words, where
+    realization r is bit r % 64 of word r // 64."""
+    padded = np.zeros((len(states), 64 * words), dtype=bool)
+    padded[:, : states.shape[1]] = states
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8")
+
+
+def _unpack_counts(packed, realizations):
+    """The number of set bits of each realization over all the nodes."""
+    bits = np.unpackbits(packed.view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :realizations].sum(axis=0)
+
+
+def _bit_sliced_counts(bits):
+    """Count the set bits of the members of each edge, bit position by bit position.
+
+    Parameters
+    ----------
+    bits : np.ndarray
+        E x size x words array of the packed states of the members.
+
+    Returns
+    -------
+    list of np.ndarray
+        the E x words bit planes of the counts, the jth plane holding
+        bit j of the count of every bit position.
+    """
+    _, size, _ = bits.shape
+    planes = [np.zeros_like(bits[:, 0]) for _ in range(size.bit_length())]
+    for m in range(size):
+        carry = bits[:, m]
+        for j, plane in enumerate(planes):
+            planes[j], carry = plane ^ carry, plane & carry
+    return planes
+
+
+def _random_bits(rng, p, shape, precision=32):
+    """Random words whose bits are independently 1 with probability `p`.
+
+    The probabilities are truncated to `precision` binary digits. Starting
+    from the least significant digit, the words are ORed with random words
+    for each 1 and ANDed with random words for each 0.
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+        the random generator.
+    p : np.ndarray
+        the probabilities, of shape `shape[:-1]`.
+    shape : tuple
+        the shape of the words.
+    precision : int, default: 32
+        the number of binary digits of the probabilities.
+
+    Returns
+    -------
+    np.ndarray
+        the random 64-bit words.
+    """
+    scale = 2**precision
+    digits = np.rint(np.clip(p, 0, 1) * scale).astype(np.int64)
+    certain = digits == scale
+    digits[certain] = 0
+    words = np.zeros(shape, dtype=np.uint64)
+    if digits.any():
+        # the words stay zero until the lowest nonzero digit
+        lowest = int(np.log2(np.min(digits & -digits, where=digits > 0, initial=scale)))
+        digits = digits[..., None]
+        for j in range(lowest, precision):
+            random_words = rng.bit_generator.random_raw(shape)
+            words = np.where(
+                (digits >> j) & 1, words | random_words, words & random_words
+            )
+    words[certain] = ~np.uint64(0)
+    return words
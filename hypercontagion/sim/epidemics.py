@@ -6,11 +6,32 @@ import random
 from collections import defaultdict
 
 import numpy as np
-import xgi
 
 from ..exception import HyperContagionError
-from ..utils import EventQueue, SamplingDict, _process_trans_SIR_, _process_trans_SIS_
-from .functions import majority_vote, threshold
+from ..utils import (
+    EventQueue,
+    SamplingDict,
+    SimulationStats,
+    _process_trans_SIR_,
+    _process_trans_SIS_,
+)
+from ..utils.observers import (
+    _initialize_observers,
+    _observer_output,
+    _record_observers,
+    _update_observers,
+)
+from ..utils.utilities import (
+    _IS_link_groups,
+    _load_checkpoint,
+    _queue_from_data_SIS_,
+    _queue_to_data_SIS_,
+    _recovery_rates,
+    _save_checkpoint,
+    _transmission_rates,
+    _weights,
+)
+from .functions import _count_table, majority_vote, threshold
 
 
 def discrete_SIR(
@@ -27,11 +48,21 @@ def discrete_SIR(
     tmax=float("Inf"),
     dt=1.0,
     return_event_data=False,
+    return_stats=False,
+    observers=None,
     seed=None,
     **args
 ):
     """Simulates the discrete SIR model for hypergraphs.
 
+    At each step, only the infected nodes and the susceptible nodes that
+    can be infected are visited, i.e., the susceptible nodes that share a
+    hyperedge with an infected node or belong to a hyperedge whose
+    contagion function is nonzero without infected members, so that the
+    cost of a step does not grow with the size of the uninfected region.
+    The nodes are updated synchronously from the states at the start of
+    the step.
+
     Parameters
     ----------
     H : xgi.Hypergraph
@@ -42,6 +73,8 @@ def discrete_SIR(
         Healing rate
     transmission_function : lambda function, default: threshold
         The contagion function that determines whether transmission is possible.
+        If it is declared with `count_based`, it is tabulated by edge size and
+        number of infected neighbors before the simulation.
     initial_infecteds : iterable, default: None
         Initially infected node IDs.
     initial_recovereds : iterable, default: None
@@ -62,13 +95,22 @@ def discrete_SIR(
         The time step of the simulation.
     return_event_data : bool, default: False
         Whether to track each individual transition event that occurs.
+    return_stats : bool, default: False
+        Whether to also return a `SimulationStats` object with counters
+        describing the work done by the simulation.
+    observers : list of Observer, default: None
+        Observables that are updated at every transition and recorded
+        at every time in `t`.
     seed : integer, random_state, or None (default)
         Indicator of random number generation state.
 
     Returns
     -------
     tuple of np.arrays
-        t, S, I, R
+        t, S, I, R, or the list of events if `return_event_data` is True.
+        If `observers` is not None, a dict of the recorded values keyed
+        by observer name is appended, followed by the `SimulationStats`
+        if `return_stats` is True.
 
     Raises
     ------
@@ -77,6 +119,10 @@ def discrete_SIR(
     """
     if seed is not None:
         random.seed(seed)
+
+    stats = SimulationStats() if return_stats else None
+    if stats is not None:
+        transmission_function = stats.timed(transmission_function)
     members = H.edges.members(dtype=dict)
     memberships = H.nodes.memberships()
 
@@ -96,25 +142,8 @@ def discrete_SIR(
     if initial_recovereds is None:
         initial_recovereds = []
 
-    if transmission_weight is not None:
-
-        def edgeweight(item):
-            return item[transmission_weight]
-
-    else:
-
-        def edgeweight(item):
-            return 1
-
-    if recovery_weight is not None:
-
-        def nodeweight(u):
-            return H.nodes[u][recovery_weight]
-
-    else:
-
-        def nodeweight(u):
-            return 1
+    recovery_rates = _recovery_rates(H, gamma, recovery_weight)
+    transmission_rates = _transmission_rates(H, tau, transmission_weight)
 
     status = defaultdict(lambda: "S")
     for node in initial_infecteds:
@@ -164,20 +193,39 @@ def discrete_SIR(
     S = [H.num_nodes - I[0] - R[0]]
     times = [tmin]
     t = tmin
-
-    new_status = status
+    observers = _initialize_observers(observers, H, status)
+
+    index = {node: i for i, node in enumerate(H.nodes)}
+    infected = {node for node in initial_infecteds if status[node] == "I"}
+    spontaneous = _spontaneous_nodes(
+        members, memberships, transmission_rates, transmission_function, args
+    )
+    contagion_of, count = _contagion_lookup(
+        transmission_function, members, memberships, status, args
+    )
+    # the states are read from `status` and written to `new_status`, and the
+    # buffers are swapped at the end of each step
+    new_status = status.copy()
+    changes = []
 
     while t <= tmax and I[-1] != 0:
         S.append(S[-1])
         I.append(I[-1])
         R.append(R[-1])
 
-        for node in H.nodes:
+        for node in _discrete_frontier(
+            infected, status, members, memberships, spontaneous, index
+        ):
             if status[node] == "I":
                 # heal
-                if random.random() <= gamma * dt * nodeweight(node):
+                if random.random() <= recovery_rates[node] * dt:
                     new_status[node] = "R"
+                    changes.append((node, "R"))
+                    infected.remove(node)
+                    _update_observers(observers, node, "I", "R", None, record=False)
                     R[-1] += 1
+                    if stats is not None:
+                        stats.events["recovery", None] += 1
                     I[-1] += -1
 
                     if return_event_data:
@@ -190,19 +238,26 @@ def discrete_SIR(
                                 "new_state": "R",
                             }
                         )
-                else:
-                    new_status[node] = "I"
             elif status[node] == "S":
                 # infect by neighbors of all sizes
                 for edge_id in memberships[node]:
                     edge = members[edge_id]
-                    if tau[len(edge)] > 0:
-                        if random.random() <= tau[len(edge)] * transmission_function(
-                            node, status, edge, **args
-                        ) * dt * edgeweight(edge_id):
+                    rate = transmission_rates[edge_id]
+                    if rate > 0:
+                        if (
+                            random.random()
+                            <= rate * contagion_of(node, status, edge_id) * dt
+                        ):
                             new_status[node] = "I"
+                            changes.append((node, "I"))
+                            infected.add(node)
+                            _update_observers(
+                                observers, node, "S", "I", edge_id, record=False
+                            )
                             S[-1] += -1
                             I[-1] += 1
+                            if stats is not None:
+                                stats.events["infection", len(edge)] += 1
 
                             if return_event_data:
                                 events.append(
@@ -215,15 +270,19 @@ def discrete_SIR(
                                     }
                                 )
                             break
-                else:
-                    new_status[node] == "S"
-        status = new_status.copy()
+        status, new_status = new_status, status
+        for node, state in changes:
+            new_status[node] = state
+            count(node, 1 if state == "I" else -1)
+        changes.clear()
         t += dt
         times.append(t)
+        _record_observers(observers)
     if return_event_data:
-        return events
+        output = (events,)
     else:
-        return np.array(times), np.array(S), np.array(I), np.array(R)
+        output = (np.array(times), np.array(S), np.array(I), np.array(R))
+    return _format_output(output, _observer_output(observers), stats)
 
 
 def discrete_SIS(
@@ -239,11 +298,21 @@ def discrete_SIS(
     tmax=float("Inf"),
     dt=1.0,
     return_event_data=False,
+    return_stats=False,
+    observers=None,
     seed=None,
     **args
 ):
     """Simulates the discrete SIS model for hypergraphs.
 
+    At each step, only the infected nodes and the susceptible nodes that
+    can be infected are visited, i.e., the susceptible nodes that share a
+    hyperedge with an infected node or belong to a hyperedge whose
+    contagion function is nonzero without infected members, so that the
+    cost of a step does not grow with the size of the uninfected region.
+    The nodes are updated synchronously from the states at the start of
+    the step.
+
     Parameters
     ----------
     H : xgi.Hypergraph
@@ -254,6 +323,8 @@ def discrete_SIS(
         Healing rate
     transmission_function : lambda function, default: threshold
         The contagion function that determines whether transmission is possible.
+        If it is declared with `count_based`, it is tabulated by edge size and
+        number of infected neighbors before the simulation.
     initial_infecteds : iterable, default: None
         Initially infected node IDs.
     initial_recovereds : iterable, default: None
@@ -274,13 +345,22 @@ def discrete_SIS(
         The time step of the simulation.
     return_event_data : bool, default: False
         Whether to track each individual transition event that occurs.
+    return_stats : bool, default: False
+        Whether to also return a `SimulationStats` object with counters
+        describing the work done by the simulation.
+    observers : list of Observer, default: None
+        Observables that are updated at every transition and recorded
+        at every time in `t`.
     seed : integer, random_state, or None (default)
         Indicator of random number generation state.
 
     Returns
     -------
     tuple of np.arrays
-        t, S, I
+        t, S, I, or the list of events if `return_event_data` is True.
+        If `observers` is not None, a dict of the recorded values keyed
+        by observer name is appended, followed by the `SimulationStats`
+        if `return_stats` is True.
 
     Raises
     ------
@@ -291,6 +371,10 @@ def discrete_SIS(
     if seed is not None:
         random.seed(seed)
 
+    stats = SimulationStats() if return_stats else None
+    if stats is not None:
+        transmission_function = stats.timed(transmission_function)
+
     members = H.edges.members(dtype=dict)
     memberships = H.nodes.memberships()
 
@@ -307,25 +391,8 @@ def discrete_SIS(
             initial_number = int(round(H.num_nodes * rho))
         initial_infecteds = random.sample(list(H.nodes), initial_number)
 
-    if transmission_weight is not None:
-
-        def edgeweight(item):
-            return item[transmission_weight]
-
-    else:
-
-        def edgeweight(item):
-            return 1
-
-    if recovery_weight is not None:
-
-        def nodeweight(u):
-            return H.nodes[u][recovery_weight]
-
-    else:
-
-        def nodeweight(u):
-            return 1
+    recovery_rates = _recovery_rates(H, gamma, recovery_weight)
+    transmission_rates = _transmission_rates(H, tau, transmission_weight)
 
     status = defaultdict(lambda: "S")
     for node in initial_infecteds:
@@ -358,18 +425,38 @@ def discrete_SIS(
     S = [H.num_nodes - I[0]]
     times = [tmin]
     t = tmin
-    new_status = status
+    observers = _initialize_observers(observers, H, status)
+
+    index = {node: i for i, node in enumerate(H.nodes)}
+    infected = set(initial_infecteds)
+    spontaneous = _spontaneous_nodes(
+        members, memberships, transmission_rates, transmission_function, args
+    )
+    contagion_of, count = _contagion_lookup(
+        transmission_function, members, memberships, status, args
+    )
+    # the states are read from `status` and written to `new_status`, and the
+    # buffers are swapped at the end of each step
+    new_status = status.copy()
+    changes = []
 
     while t <= tmax and I[-1] != 0:
         S.append(S[-1])
         I.append(I[-1])
 
-        for node in H.nodes:
+        for node in _discrete_frontier(
+            infected, status, members, memberships, spontaneous, index
+        ):
             if status[node] == "I":
                 # heal
-                if random.random() <= gamma * dt * nodeweight(node):
+                if random.random() <= recovery_rates[node] * dt:
                     new_status[node] = "S"
+                    changes.append((node, "S"))
+                    infected.remove(node)
+                    _update_observers(observers, node, "I", "S", None, record=False)
                     S[-1] += 1
+                    if stats is not None:
+                        stats.events["recovery", None] += 1
                     I[-1] += -1
 
                     if return_event_data:
@@ -382,19 +469,26 @@ def discrete_SIS(
                                 "new_state": "S",
                             }
                         )
-                else:
-                    new_status[node] = "I"
             else:
                 # infect by neighbors of all sizes
                 for edge_id in memberships[node]:
                     edge = members[edge_id]
-                    if tau[len(edge)] > 0:
-                        if random.random() <= tau[len(edge)] * transmission_function(
-                            node, status, edge, **args
-                        ) * dt * edgeweight(edge_id):
+                    rate = transmission_rates[edge_id]
+                    if rate > 0:
+                        if (
+                            random.random()
+                            <= rate * contagion_of(node, status, edge_id) * dt
+                        ):
                             new_status[node] = "I"
+                            changes.append((node, "I"))
+                            infected.add(node)
+                            _update_observers(
+                                observers, node, "S", "I", edge_id, record=False
+                            )
                             S[-1] += -1
                             I[-1] += 1
+                            if stats is not None:
+                                stats.events["infection", len(edge)] += 1
 
                             if return_event_data:
                                 events.append(
@@ -407,15 +501,19 @@ def discrete_SIS(
                                     }
                                 )
                             break
-                else:
-                    new_status[node] == "S"
-        status = new_status.copy()
+        status, new_status = new_status, status
+        for node, state in changes:
+            new_status[node] = state
+            count(node, 1 if state == "I" else -1)
+        changes.clear()
         t += dt
         times.append(t)
+        _record_observers(observers)
     if return_event_data:
-        return events
+        output = (events,)
     else:
-        return np.array(times), np.array(S), np.array(I)
+        output = (np.array(times), np.array(S), np.array(I))
+    return _format_output(output, _observer_output(observers), stats)
 
 
 def Gillespie_SIR(
@@ -431,6 +529,8 @@ def Gillespie_SIR(
     recovery_weight=None,
     transmission_weight=None,
     return_event_data=False,
+    return_stats=False,
+    observers=None,
     seed=None,
     **args
 ):
@@ -446,6 +546,8 @@ def Gillespie_SIR(
         Healing rate
     transmission_function : lambda function, default: threshold
         The contagion function that determines whether transmission is possible.
+        If it is declared with `count_based`, it is tabulated by edge size and
+        number of infected neighbors before the simulation.
     initial_infecteds : iterable, default: None
         Initially infected node IDs.
     initial_recovereds : iterable, default: None
@@ -464,13 +566,22 @@ def Gillespie_SIR(
         infected nodes.
     return_event_data : bool, default: False
         Whether to track each individual transition event that occurs.
+    return_stats : bool, default: False
+        Whether to also return a `SimulationStats` object with counters
+        describing the work done by the simulation.
+    observers : list of Observer, default: None
+        Observables that are updated at every transition and recorded
+        at every time in `t`.
     seed : integer, random_state, or None (default)
         Indicator of random number generation state.
 
     Returns
     -------
     tuple of np.arrays
-        t, S, I, R
+        t, S, I, R, or the list of events if `return_event_data` is True.
+        If `observers` is not None, a dict of the recorded values keyed
+        by observer name is appended, followed by the `SimulationStats`
+        if `return_stats` is True.
 
     Raises
     ------
@@ -480,6 +591,10 @@ def Gillespie_SIR(
     if seed is not None:
         random.seed(seed)
 
+    stats = SimulationStats() if return_stats else None
+    if stats is not None:
+        transmission_function = stats.timed(transmission_function)
+
     members = H.edges.members(dtype=dict)
     memberships = H.nodes.memberships()
 
@@ -489,25 +604,21 @@ def Gillespie_SIR(
     if return_event_data:
         events = list()
 
-    if transmission_weight is not None:
-
-        def edgeweight(item):
-            return item[transmission_weight]
-
-    else:
-
-        def edgeweight(item):
-            return None
-
+    # the weight increments of the infected nodes, None if they are unweighted
     if recovery_weight is not None:
-
-        def nodeweight(u):
-            return H.nodes[u][recovery_weight]
-
+        recovery_weights = dict(
+            zip(H.nodes, _weights(H.nodes, recovery_weight).tolist())
+        )
     else:
-
-        def nodeweight(u):
-            return None
+        recovery_weights = dict.fromkeys(H.nodes)
+    transmission_rates = _transmission_rates(H, tau, transmission_weight)
+    weighted = transmission_weight is not None
+    groups, IS_links, scales = _IS_link_groups(transmission_rates, weighted, stats)
+    # the weight increments of the IS links, None if they are unweighted
+    if weighted:
+        link_weights = transmission_rates
+    else:
+        link_weights = dict.fromkeys(transmission_rates)
 
     if initial_infecteds is None:
         if rho is None:
@@ -569,39 +680,39 @@ def Gillespie_SIR(
                 }
             )
 
+    contagion_of, count = _contagion_lookup(
+        transmission_function, members, memberships, status, args
+    )
+
     if recovery_weight is None:
         infecteds = SamplingDict()
     else:
         infecteds = SamplingDict(weighted=True)
 
-    unique_edge_sizes = xgi.unique_edge_sizes(H)
-    IS_links = dict()
-    for size in unique_edge_sizes:
-        if transmission_weight is None:
-            IS_links[size] = SamplingDict()
-        else:
-            IS_links[size] = SamplingDict(weighted=True)
-
     for node in initial_infecteds:
-        infecteds.update(node, weight_increment=nodeweight(node))
+        infecteds.update(node, weight_increment=recovery_weights[node])
         for edge_id in memberships[node]:
+            if edge_id not in groups:
+                continue
+            links = IS_links[groups[edge_id]]
             edge = members[edge_id]
             for nbr in edge:
                 if status[nbr] == "S":
-                    contagion = transmission_function(nbr, status, edge, **args)
-                    if contagion != 0:
-                        IS_links[len(edge)].update(
-                            (edge_id, nbr),
-                            weight_increment=edgeweight(edge_id),
-                        )  # need to be able to multiply by the contagion?
+                    contagion = contagion_of(nbr, status, edge_id)
+                    if contagion != 0 and (edge_id, nbr) not in links:
+                        links.update(
+                            (edge_id, nbr), weight_increment=link_weights[edge_id]
+                        )
 
     total_rates = dict()
-    total_rates[0] = gamma * infecteds.total_weight()  # I_weight_sum
-    for size in unique_edge_sizes:
-        total_rates[size] = tau[size] * IS_links[size].total_weight()  # IS_weight_sum
+    total_rates["recovery"] = gamma * infecteds.total_weight()
+    for key, links in IS_links.items():
+        total_rates[key] = scales[key] * links.total_weight() if links else 0
 
     total_rate = sum(total_rates.values())
 
+    observers = _initialize_observers(observers, H, status)
+
     if total_rate > 0:
         delay = random.expovariate(total_rate)
     else:
@@ -612,15 +723,21 @@ def Gillespie_SIR(
 
     while infecteds and t < tmax:
         while True:
+            if stats is not None:
+                stats.channel_attempts += 1
             choice = random.choice(
                 list(total_rates.keys())
             )  # Is there a faster way to do this?
             if random.random() < total_rates[choice] / total_rate:
                 break
-        if choice == 0:  # recover
+        if choice == "recovery":  # recover
+            if stats is not None:
+                stats.events["recovery", None] += 1
             # does weighted choice and removes it
             recovering_node = infecteds.random_removal()
             status[recovering_node] = "R"
+            count(recovering_node, -1)
+            _update_observers(observers, recovering_node, "I", "R", None)
 
             if return_event_data:
                 events.append(
@@ -634,15 +751,15 @@ def Gillespie_SIR(
                 )
 
             for edge_id in memberships[recovering_node]:
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
                 edge = members[edge_id]
                 for nbr in edge:
-                    if status[nbr] == "S" and (edge_id, nbr) in IS_links[len(edge)]:
-                        contagion = transmission_function(nbr, status, edge, **args)
+                    if status[nbr] == "S" and (edge_id, nbr) in links:
+                        contagion = contagion_of(nbr, status, edge_id)
                         if contagion == 0:
-                            try:
-                                IS_links[len(edge)].remove((edge_id, nbr))
-                            except:
-                                pass
+                            links.remove((edge_id, nbr))
 
             times.append(t)
             S.append(S[-1])
@@ -652,9 +769,13 @@ def Gillespie_SIR(
             source, recipient = IS_links[
                 choice
             ].choose_random()  # we don't use remove since that complicates the later removal of edges.
+            if stats is not None:
+                stats.events["infection", len(members[source])] += 1
             status[recipient] = "I"
+            count(recipient, 1)
+            _update_observers(observers, recipient, "S", "I", source)
 
-            infecteds.update(recipient, weight_increment=nodeweight(recipient))
+            infecteds.update(recipient, weight_increment=recovery_weights[recipient])
 
             if return_event_data:
                 events.append(
@@ -668,20 +789,23 @@ def Gillespie_SIR(
                 )
 
             for edge_id in memberships[recipient]:
-                try:
-                    IS_links[len(members[edge_id])].remove((edge_id, recipient))
-                except:
-                    pass
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
+                if (edge_id, recipient) in links:
+                    links.remove((edge_id, recipient))
 
             for edge_id in memberships[recipient]:
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
                 edge = members[edge_id]
                 for nbr in edge:
                     if status[nbr] == "S":
-                        contagion = transmission_function(nbr, status, edge, **args)
-                        if contagion != 0:
-                            IS_links[len(edge)].update(
-                                (edge_id, nbr),
-                                weight_increment=edgeweight(edge_id),
+                        contagion = contagion_of(nbr, status, edge_id)
+                        if contagion != 0 and (edge_id, nbr) not in links:
+                            links.update(
+                                (edge_id, nbr), weight_increment=link_weights[edge_id]
                             )
 
             times.append(t)
@@ -689,11 +813,9 @@ def Gillespie_SIR(
             I.append(I[-1] + 1)
             R.append(R[-1])
 
-        total_rates[0] = gamma * infecteds.total_weight()  # I_weight_sum
-        for size in unique_edge_sizes:
-            total_rates[size] = (
-                tau[size] * IS_links[size].total_weight()
-            )  # IS_weight_sum
+        total_rates["recovery"] = gamma * infecteds.total_weight()
+        for key, links in IS_links.items():
+            total_rates[key] = scales[key] * links.total_weight() if links else 0
 
         total_rate = sum(total_rates.values())
         if total_rate > 0:
@@ -703,9 +825,10 @@ def Gillespie_SIR(
         t += delay
 
     if return_event_data:
-        return events
+        output = (events,)
     else:
-        return np.array(times), np.array(S), np.array(I), np.array(R)
+        output = (np.array(times), np.array(S), np.array(I), np.array(R))
+    return _format_output(output, _observer_output(observers), stats)
 
 
 def Gillespie_SIS(
@@ -720,6 +843,11 @@ def Gillespie_SIS(
     recovery_weight=None,
     transmission_weight=None,
     return_event_data=False,
+    return_stats=False,
+    observers=None,
+    checkpoint=None,
+    checkpoint_interval=None,
+    resume=None,
     seed=None,
     **args
 ):
@@ -735,6 +863,8 @@ def Gillespie_SIS(
         Healing rate
     transmission_function : lambda function, default: threshold
         The contagion function that determines whether transmission is possible.
+        If it is declared with `count_based`, it is tabulated by edge size and
+        number of infected neighbors before the simulation.
     initial_infecteds : iterable, default: None
         Initially infected node IDs.
     initial_recovereds : iterable, default: None
@@ -753,147 +883,225 @@ def Gillespie_SIS(
         infected nodes.
     return_event_data : bool, default: False
         Whether to track each individual transition event that occurs.
+    return_stats : bool, default: False
+        Whether to also return a `SimulationStats` object with counters
+        describing the work done by the simulation.
+    observers : list of Observer, default: None
+        Observables that are updated at every transition and recorded
+        at every time in `t`.
+    checkpoint : str, default: None
+        Path of a file to which the state of the simulation is written
+        when it stops, so that it can be resumed later.
+    checkpoint_interval : float, default: None
+        If not None, the state is also written to `checkpoint` every
+        `checkpoint_interval` units of simulation time.
+    resume : str, default: None
+        Path of a checkpoint from which to resume the simulation until
+        `tmax`. The statuses, the random state, and the output so far are
+        read from the checkpoint so that the result is identical to that
+        of an uninterrupted simulation, and `initial_infecteds`, `rho`,
+        `tmin`, and `seed` are ignored. `H` and the other parameters must
+        be the same as in the simulation that wrote the checkpoint.
     seed : integer, random_state, or None (default)
         Indicator of random number generation state.
 
     Returns
     -------
     tuple of np.arrays
-        t, S, I
+        t, S, I, or the list of events if `return_event_data` is True.
+        If `observers` is not None, a dict of the recorded values keyed
+        by observer name is appended, followed by the `SimulationStats`
+        if `return_stats` is True.
 
     Raises
     ------
     HyperContagionError
-        If the user specifies both rho and initial_infecteds.
+        If the user specifies both rho and initial_infecteds,
+        or observers with a checkpoint.
     """
     if seed is not None:
         random.seed(seed)
 
+    stats = SimulationStats() if return_stats else None
+    if stats is not None:
+        transmission_function = stats.timed(transmission_function)
+
     members = H.edges.members(dtype=dict)
     memberships = H.nodes.memberships()
 
     if rho is not None and initial_infecteds is not None:
         raise HyperContagionError("cannot define both initial_infecteds and rho")
 
-    if return_event_data:
-        events = list()
+    if observers is not None and (checkpoint is not None or resume is not None):
+        raise HyperContagionError("observers cannot be used with checkpoints")
 
-    if transmission_weight is not None:
-
-        def edgeweight(item):
-            return item[transmission_weight]
-
-    else:
+    if checkpoint_interval is not None and checkpoint is None:
+        raise HyperContagionError("checkpoint_interval requires a checkpoint path")
 
-        def edgeweight(item):
-            return None
+    if return_event_data:
+        events = list()
 
+    # the weight increments of the infected nodes, None if they are unweighted
     if recovery_weight is not None:
-
-        def nodeweight(u):
-            return H.nodes[u][recovery_weight]
-
+        recovery_weights = dict(
+            zip(H.nodes, _weights(H.nodes, recovery_weight).tolist())
+        )
+    else:
+        recovery_weights = dict.fromkeys(H.nodes)
+    transmission_rates = _transmission_rates(H, tau, transmission_weight)
+    weighted = transmission_weight is not None
+    groups, IS_links, scales = _IS_link_groups(transmission_rates, weighted, stats)
+    # the weight increments of the IS links, None if they are unweighted
+    if weighted:
+        link_weights = transmission_rates
     else:
+        link_weights = dict.fromkeys(transmission_rates)
 
-        def nodeweight(u):
-            return None
+    if resume is None:
+        if initial_infecteds is None:
+            if rho is None:
+                initial_number = 1
+            else:
+                initial_number = int(round(H.num_nodes * rho))
+            initial_infecteds = random.sample(list(H.nodes), initial_number)
 
-    if initial_infecteds is None:
-        if rho is None:
-            initial_number = 1
-        else:
-            initial_number = int(round(H.num_nodes * rho))
-        initial_infecteds = random.sample(list(H.nodes), initial_number)
+        I = [len(initial_infecteds)]
+        S = [H.num_nodes - I[0]]
+        times = [tmin]
 
-    I = [len(initial_infecteds)]
-    S = [H.num_nodes - I[0]]
-    times = [tmin]
+        t = tmin
 
-    t = tmin
+        status = defaultdict(lambda: "S")
+        for node in initial_infecteds:
+            status[node] = "I"
 
-    status = defaultdict(lambda: "S")
-    for node in initial_infecteds:
-        status[node] = "I"
+            if return_event_data:
+                events.append(
+                    {
+                        "time": tmin,
+                        "source": None,
+                        "target": node,
+                        "old_state": "S",
+                        "new_state": "I",
+                    }
+                )
 
         if return_event_data:
-            events.append(
-                {
-                    "time": tmin,
-                    "source": None,
-                    "target": node,
-                    "old_state": "S",
-                    "new_state": "I",
-                }
-            )
-
-    if return_event_data:
-        for node in set(H.nodes).difference(initial_infecteds):
-            events.append(
-                {
-                    "time": tmin,
-                    "source": None,
-                    "target": node,
-                    "old_state": "I",
-                    "new_state": "S",
-                }
-            )
-
-    if recovery_weight is None:
-        infecteds = SamplingDict()
-    else:
-        infecteds = SamplingDict(weighted=True)
+            for node in set(H.nodes).difference(initial_infecteds):
+                events.append(
+                    {
+                        "time": tmin,
+                        "source": None,
+                        "target": node,
+                        "old_state": "I",
+                        "new_state": "S",
+                    }
+                )
 
-    unique_edge_sizes = xgi.unique_edge_sizes(H)
+        contagion_of, count = _contagion_lookup(
+            transmission_function, members, memberships, status, args
+        )
 
-    IS_links = dict()
-    for size in unique_edge_sizes:
-        if transmission_weight is None:
-            IS_links[size] = SamplingDict()
+        if recovery_weight is None:
+            infecteds = SamplingDict()
         else:
-            IS_links[size] = SamplingDict(weighted=True)
+            infecteds = SamplingDict(weighted=True)
+
+        for node in initial_infecteds:
+            infecteds.update(node, weight_increment=recovery_weights[node])
+            for edge_id in memberships[
+                node
+            ]:  # must have this in a separate loop after assigning status of node
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
+                edge = members[edge_id]
+                for nbr in edge:  # there may be self-loops so account for this later
+                    if status[nbr] == "S":
+                        contagion = contagion_of(nbr, status, edge_id)
+                        if contagion != 0 and (edge_id, nbr) not in links:
+                            links.update(
+                                (edge_id, nbr), weight_increment=link_weights[edge_id]
+                            )
 
-    for node in initial_infecteds:
-        infecteds.update(node, weight_increment=nodeweight(node))
-        for edge_id in memberships[
-            node
-        ]:  # must have this in a separate loop after assigning status of node
-            # handle weighted vs. unweighted?
-            edge = members[edge_id]
-            for nbr in edge:  # there may be self-loops so account for this later
-                if status[nbr] == "S":
-                    contagion = transmission_function(nbr, status, edge, **args)
-                    if contagion != 0:
-                        IS_links[len(edge)].update(
-                            (edge_id, nbr),
-                            weight_increment=edgeweight(edge_id),
-                        )  # need to be able to multiply by the contagion?
+        total_rates = dict()
+        total_rates["recovery"] = gamma * infecteds.total_weight()
+        for key, links in IS_links.items():
+            total_rates[key] = scales[key] * links.total_weight() if links else 0
 
-    total_rates = dict()
-    total_rates[0] = gamma * infecteds.total_weight()  # I_weight_sum
-    for size in unique_edge_sizes:
-        total_rates[size] = tau[size] * IS_links[size].total_weight()  # IS_weight_sum
+        total_rate = sum(total_rates.values())
+        observers = _initialize_observers(observers, H, status)
 
-    total_rate = sum(total_rates.values())
-    if total_rate > 0:
-        delay = random.expovariate(total_rate)
+        if total_rate > 0:
+            delay = random.expovariate(total_rate)
+        else:
+            print("Total rate is zero and no events will happen!")
+            delay = float("Inf")
+
+        t += delay
     else:
-        print("Total rate is zero and no events will happen!")
-        delay = float("Inf")
+        state = _load_checkpoint(resume, "Gillespie_SIS")
+        random.setstate(state["random_state"])
+        status = defaultdict(lambda: "S", state["status"])
+        contagion_of, count = _contagion_lookup(
+            transmission_function, members, memberships, status, args
+        )
+        infecteds = SamplingDict.from_data(state["infecteds"])
+        IS_links = {
+            key: SamplingDict.from_data(data, stats=stats)
+            for key, data in state["IS_links"].items()
+        }
+        times, S, I = state["times"], state["S"], state["I"]
+        if return_event_data:
+            if state["events"] is None:
+                raise HyperContagionError("the checkpoint has no event data")
+            events = state["events"]
+        t = state["t"]
+
+        total_rates = dict()
+        total_rates["recovery"] = gamma * infecteds.total_weight()
+        for key, links in IS_links.items():
+            total_rates[key] = scales[key] * links.total_weight() if links else 0
+        total_rate = sum(total_rates.values())
 
-    t += delay
+    def get_state():
+        return {
+            "status": dict(status),
+            "infecteds": infecteds.to_data(),
+            "IS_links": {key: d.to_data() for key, d in IS_links.items()},
+            "times": times,
+            "S": S,
+            "I": I,
+            "events": events if return_event_data else None,
+            "t": t,
+            "random_state": random.getstate(),
+        }
+
+    if checkpoint_interval is not None:
+        next_checkpoint = t + checkpoint_interval
 
     while infecteds and t < tmax:
+        if checkpoint_interval is not None and t >= next_checkpoint:
+            _save_checkpoint(checkpoint, "Gillespie_SIS", get_state())
+            next_checkpoint = t + checkpoint_interval
+
         # rejection sampling
         while True:
+            if stats is not None:
+                stats.channel_attempts += 1
             choice = random.choice(list(total_rates.keys()))
             if random.random() < total_rates[choice] / total_rate:
                 break
 
-        if choice == 0:  # recover
+        if choice == "recovery":  # recover
+            if stats is not None:
+                stats.events["recovery", None] += 1
             recovering_node = (
                 infecteds.random_removal()
             )  # chooses a node at random and removes it
             status[recovering_node] = "S"
+            count(recovering_node, -1)
+            _update_observers(observers, recovering_node, "I", "S", None)
 
             if return_event_data:
                 events.append(
@@ -908,35 +1116,42 @@ def Gillespie_SIS(
 
             # Find the SI links for the recovered node to get reinfected
             for edge_id in memberships[recovering_node]:
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
                 edge = members[edge_id]
-                contagion = transmission_function(recovering_node, status, edge, **args)
+                contagion = contagion_of(recovering_node, status, edge_id)
                 if contagion != 0:
-                    IS_links[len(edge)].update(
+                    links.update(
                         (edge_id, recovering_node),
-                        weight_increment=edgeweight(edge_id),
+                        weight_increment=link_weights[edge_id],
                     )
 
             # reduce the number of infected links because of the healing
             for edge_id in memberships[recovering_node]:
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
                 edge = members[edge_id]
                 for nbr in edge:
                     # if the key doesn't exist, don't attempt to remove it
-                    if status[nbr] == "S" and (edge_id, nbr) in IS_links[len(edge)]:
-                        contagion = transmission_function(nbr, status, edge, **args)
+                    if status[nbr] == "S" and (edge_id, nbr) in links:
+                        contagion = contagion_of(nbr, status, edge_id)
                         if contagion == 0:
-                            try:
-                                IS_links[len(edge)].remove((edge_id, nbr))
-                            except:
-                                pass
+                            links.remove((edge_id, nbr))
 
             times.append(t)
             S.append(S[-1] + 1)
             I.append(I[-1] - 1)
         else:
             source, recipient = IS_links[choice].choose_random()
+            if stats is not None:
+                stats.events["infection", len(members[source])] += 1
             status[recipient] = "I"
+            count(recipient, 1)
+            _update_observers(observers, recipient, "S", "I", source)
 
-            infecteds.update(recipient, weight_increment=nodeweight(recipient))
+            infecteds.update(recipient, weight_increment=recovery_weights[recipient])
 
             if return_event_data:
                 events.append(
@@ -950,28 +1165,31 @@ def Gillespie_SIS(
                 )
 
             for edge_id in memberships[recipient]:
-                try:
-                    IS_links[len(members[edge_id])].remove((edge_id, recipient))
-                except:
-                    pass
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
+                if (edge_id, recipient) in links:
+                    links.remove((edge_id, recipient))
 
             for edge_id in memberships[recipient]:
+                if edge_id not in groups:
+                    continue
+                links = IS_links[groups[edge_id]]
                 edge = members[edge_id]
                 for nbr in edge:
                     if status[nbr] == "S":
-                        contagion = transmission_function(nbr, status, edge, **args)
-                        if contagion != 0:
-                            IS_links[len(edge)].update(
-                                (edge_id, nbr),
-                                weight_increment=edgeweight(edge_id),
+                        contagion = contagion_of(nbr, status, edge_id)
+                        if contagion != 0 and (edge_id, nbr) not in links:
+                            links.update(
+                                (edge_id, nbr), weight_increment=link_weights[edge_id]
                             )
             times.append(t)
             S.append(S[-1] - 1)
             I.append(I[-1] + 1)
 
-        total_rates[0] = gamma * infecteds.total_weight()
-        for size in unique_edge_sizes:
-            total_rates[size] = tau[size] * IS_links[size].total_weight()
+        total_rates["recovery"] = gamma * infecteds.total_weight()
+        for key, links in IS_links.items():
+            total_rates[key] = scales[key] * links.total_weight() if links else 0
         total_rate = sum(total_rates.values())
         if total_rate > 0:
             delay = random.expovariate(total_rate)
@@ -979,10 +1197,14 @@ def Gillespie_SIS(
             delay = float("Inf")
         t += delay
 
+    if checkpoint is not None:
+        _save_checkpoint(checkpoint, "Gillespie_SIS", get_state())
+
     if return_event_data:
-        return events
+        output = (events,)
     else:
-        return np.array(times), np.array(S), np.array(I)
+        output = (np.array(times), np.array(S), np.array(I))
+    return _format_output(output, _observer_output(observers), stats)
 
 
 def event_driven_SIR(
@@ -992,10 +1214,14 @@ def event_driven_SIR(
     transmission_function=majority_vote,
     initial_infecteds=None,
     initial_recovereds=None,
+    recovery_weight=None,
+    transmission_weight=None,
     rho=None,
     tmin=0,
     tmax=float("Inf"),
     return_event_data=False,
+    return_stats=False,
+    observers=None,
     seed=None,
     **args
 ):
@@ -1029,11 +1255,20 @@ def event_driven_SIR(
         infected nodes.
     return_event_data : bool, default: False
         Whether to track each individual transition event that occurs.
+    return_stats : bool, default: False
+        Whether to also return a `SimulationStats` object with counters
+        describing the work done by the simulation.
+    observers : list of Observer, default: None
+        Observables that are updated at every transition and recorded
+        at every time in `t`.
 
     Returns
     -------
     tuple of np.arrays
-        t, S, I, R
+        t, S, I, R, or the list of events if `return_event_data` is True.
+        If `observers` is not None, a dict of the recorded values keyed
+        by observer name is appended, followed by the `SimulationStats`
+        if `return_stats` is True.
 
     Raises
     ------
@@ -1043,9 +1278,16 @@ def event_driven_SIR(
     if seed is not None:
         random.seed(seed)
 
+    stats = SimulationStats() if return_stats else None
+    if stats is not None:
+        transmission_function = stats.timed(transmission_function)
+
     if rho is not None and initial_infecteds is not None:
         raise HyperContagionError("cannot define both initial_infecteds and rho")
 
+    recovery_rates = _recovery_rates(H, gamma, recovery_weight)
+    transmission_rates = _transmission_rates(H, tau, transmission_weight)
+
     events = list()
 
     # now we define the initial setup.
@@ -1078,6 +1320,7 @@ def event_driven_SIR(
     R = [0]
     S = [H.num_nodes]
     times = [tmin]
+    observers = _initialize_observers(observers, H, status)
 
     for u in initial_infecteds:
         pred_inf_time[u] = tmin
@@ -1100,20 +1343,35 @@ def event_driven_SIR(
                 rec_time,
                 pred_inf_time,
                 events,
+                observers,
+                recovery_rates,
+                transmission_rates,
             ),
         )
 
     while Q:  # all the work is done in this while loop.
-        Q.pop_and_run()
+        if stats is None:
+            Q.pop_and_run()
+        else:
+            stats.max_queue_length = max(stats.max_queue_length, len(Q))
+            num_events = len(times)
+            Q.pop_and_run()
+            stats.queue_pops += 1
+            stats.dead_events += len(times) == num_events
+
+    if stats is not None:
+        _count_events(stats, events, H)
 
     if return_event_data:
-        return events
+        output = (events,)
     else:
         times = times[len(initial_infecteds) :]
         S = S[len(initial_infecteds) :]
         I = I[len(initial_infecteds) :]
         R = R[len(initial_infecteds) :]
-        return np.array(times), np.array(S), np.array(I), np.array(R)
+        output = (np.array(times), np.array(S), np.array(I), np.array(R))
+    observed = _observer_output(observers, len(initial_infecteds))
+    return _format_output(output, observed, stats)
 
 
 def event_driven_SIS(
@@ -1122,10 +1380,17 @@ def event_driven_SIS(
     gamma,
     transmission_function=majority_vote,
     initial_infecteds=None,
+    recovery_weight=None,
+    transmission_weight=None,
     rho=None,
     tmin=0,
     tmax=float("Inf"),
     return_event_data=False,
+    return_stats=False,
+    observers=None,
+    checkpoint=None,
+    checkpoint_interval=None,
+    resume=None,
     seed=None,
     **args
 ):
@@ -1159,76 +1424,297 @@ def event_driven_SIS(
         infected nodes.
     return_event_data : bool, default: False
         Whether to track each individual transition event that occurs.
+    return_stats : bool, default: False
+        Whether to also return a `SimulationStats` object with counters
+        describing the work done by the simulation.
+    observers : list of Observer, default: None
+        Observables that are updated at every transition and recorded
+        at every time in `t`.
+    checkpoint : str, default: None
+        Path of a file to which the state of the simulation, including
+        the pending events, is written when it stops, so that it can be
+        resumed later.
+    checkpoint_interval : float, default: None
+        If not None, the state is also written to `checkpoint` every
+        `checkpoint_interval` units of simulation time.
+    resume : str, default: None
+        Path of a checkpoint from which to resume the simulation until
+        `tmax`. The statuses, the event queue, the random state, and the
+        output so far are read from the checkpoint so that the result is
+        identical to that of an uninterrupted simulation, and
+        `initial_infecteds`, `rho`, `tmin`, and `seed` are ignored. `H` and
+        the other parameters must be the same as in the simulation that
+        wrote the checkpoint.
 
     Returns
     -------
     tuple of np.arrays
-        t, S, I
+        t, S, I, or the list of events if `return_event_data` is True.
+        If `observers` is not None, a dict of the recorded values keyed
+        by observer name is appended, followed by the `SimulationStats`
+        if `return_stats` is True.
 
     Raises
     ------
     HyperContagionError
-        If the user specifies both rho and initial_infecteds.
+        If the user specifies both rho and initial_infecteds,
+        or observers with a checkpoint.
     """
     if seed is not None:
         random.seed(seed)
 
+    stats = SimulationStats() if return_stats else None
+    if stats is not None:
+        transmission_function = stats.timed(transmission_function)
+
     if rho is not None and initial_infecteds is not None:
         raise HyperContagionError("cannot define both initial_infecteds and rho")
 
-    events = list()
+    if observers is not None and (checkpoint is not None or resume is not None):
+        raise HyperContagionError("observers cannot be used with checkpoints")
 
-    # now we define the initial setup.
-    status = defaultdict(lambda: "S")  # node status defaults to 'S'
-    rec_time = defaultdict(lambda: tmin - 1)  # node recovery time defaults to -1
+    if checkpoint_interval is not None and checkpoint is None:
+        raise HyperContagionError("checkpoint_interval requires a checkpoint path")
 
-    pred_inf_time = defaultdict(lambda: float("Inf"))
-    # infection time defaults to \infty  --- this could be set to tmax,
-    # probably with a slight improvement to performance.
+    recovery_rates = _recovery_rates(H, gamma, recovery_weight)
+    transmission_rates = _transmission_rates(H, tau, transmission_weight)
 
-    Q = EventQueue(tmax)
+    if resume is None:
+        events = list()
 
-    if initial_infecteds is None:
-        if rho is None:
-            initial_number = 1
-        else:
-            initial_number = int(round(H.num_nodes * rho))
-        initial_infecteds = random.sample(list(H.nodes), initial_number)
+        # now we define the initial setup.
+        status = defaultdict(lambda: "S")  # node status defaults to 'S'
+        rec_time = defaultdict(lambda: tmin - 1)  # node recovery time defaults to -1
 
-    I = [0]
-    S = [H.num_nodes]
-    times = [tmin]
+        pred_inf_time = defaultdict(lambda: float("Inf"))
+        # infection time defaults to \infty  --- this could be set to tmax,
+        # probably with a slight improvement to performance.
 
-    for u in initial_infecteds:
-        pred_inf_time[u] = tmin
-        Q.add(
-            tmin,
-            _process_trans_SIS_,
-            args=(
-                times,
-                S,
-                I,
-                Q,
-                H,
-                status,
-                transmission_function,
-                gamma,
-                tau,
-                None,
-                u,
-                rec_time,
-                pred_inf_time,
-                events,
-            ),
+        # with a checkpoint, the events after tmax are kept for the resumed run
+        Q = EventQueue(tmax if checkpoint is None else float("Inf"))
+
+        if initial_infecteds is None:
+            if rho is None:
+                initial_number = 1
+            else:
+                initial_number = int(round(H.num_nodes * rho))
+            initial_infecteds = random.sample(list(H.nodes), initial_number)
+
+        I = [0]
+        S = [H.num_nodes]
+        times = [tmin]
+        observers = _initialize_observers(observers, H, status)
+        start = len(initial_infecteds)
+
+        for u in initial_infecteds:
+            pred_inf_time[u] = tmin
+            Q.add(
+                tmin,
+                _process_trans_SIS_,
+                args=(
+                    times,
+                    S,
+                    I,
+                    Q,
+                    H,
+                    status,
+                    transmission_function,
+                    gamma,
+                    tau,
+                    None,
+                    u,
+                    rec_time,
+                    pred_inf_time,
+                    events,
+                    observers,
+                    recovery_rates,
+                    transmission_rates,
+                ),
+            )
+    else:
+        state = _load_checkpoint(resume, "event_driven_SIS")
+        random.setstate(state["random_state"])
+        tmin = state["tmin"]
+        events = state["events"]
+        status = defaultdict(lambda: "S", state["status"])
+        rec_time = defaultdict(lambda: tmin - 1, state["rec_time"])
+        pred_inf_time = defaultdict(lambda: float("Inf"), state["pred_inf_time"])
+        times, S, I = state["times"], state["S"], state["I"]
+        start = state["start"]
+
+        Q = EventQueue(tmax if checkpoint is None else float("Inf"))
+        _queue_from_data_SIS_(
+            state["queue"],
+            Q,
+            times,
+            S,
+            I,
+            H,
+            status,
+            transmission_function,
+            gamma,
+            tau,
+            rec_time,
+            pred_inf_time,
+            events,
+            None,
+            recovery_rates,
+            transmission_rates,
         )
 
-    while Q:  # all the work is done in this while loop.
-        Q.pop_and_run()
+    def get_state():
+        return {
+            "tmin": tmin,
+            "status": dict(status),
+            "rec_time": dict(rec_time),
+            "pred_inf_time": dict(pred_inf_time),
+            "queue": _queue_to_data_SIS_(Q),
+            "times": times,
+            "S": S,
+            "I": I,
+            "events": events,
+            "start": start,
+            "random_state": random.getstate(),
+        }
+
+    if checkpoint_interval is not None:
+        next_checkpoint = times[-1] + checkpoint_interval
+
+    # all the work is done in this while loop.
+    while Q and Q.next_time() < tmax:
+        if checkpoint_interval is not None and Q.next_time() >= next_checkpoint:
+            _save_checkpoint(checkpoint, "event_driven_SIS", get_state())
+            next_checkpoint = Q.next_time() + checkpoint_interval
+
+        if stats is None:
+            Q.pop_and_run()
+        else:
+            stats.max_queue_length = max(stats.max_queue_length, len(Q))
+            num_events = len(times)
+            Q.pop_and_run()
+            stats.queue_pops += 1
+            stats.dead_events += len(times) == num_events
+
+    if checkpoint is not None:
+        _save_checkpoint(checkpoint, "event_driven_SIS", get_state())
+
+    if stats is not None:
+        _count_events(stats, events, H)
 
     if return_event_data:
-        return events
+        output = (events,)
     else:
-        times = times[len(initial_infecteds) :]
-        S = S[len(initial_infecteds) :]
-        I = I[len(initial_infecteds) :]
-        return np.array(times), np.array(S), np.array(I)
+        times = times[start:]
+        S = S[start:]
+        I = I[start:]
+        output = (np.array(times), np.array(S), np.array(I))
+    observed = _observer_output(observers, start)
+    return _format_output(output, observed, stats)
+
+
+def _contagion_lookup(transmission_function, members, memberships, status, args):
+    """The evaluation of a contagion function by the Gillespie and discrete
+    engines.
+
+    If the function is declared with `count_based`, it is tabulated by edge
+    size and number of infected neighbors, and the number of infected members
+    of every hyperedge is maintained instead of calling it.
+
+    Returns
+    -------
+    tuple of callables
+        `contagion(node, status, edge_id)`, the contagion function for a
+        susceptible node, and `count(node, increment)`, which must be called
+        whenever `node` becomes infected (increment 1) or stops being
+        infected (increment -1).
+    """
+    table = _count_table(transmission_function, members, args)
+    if table is None:
+
+        def contagion(node, status, edge_id):
+            return transmission_function(node, status, members[edge_id], **args)
+
+        def count(node, increment):
+            pass
+
+        return contagion, count
+
+    num_infected = {
+        edge_id: sum(status[n] == "I" for n in edge)
+        for edge_id, edge in members.items()
+    }
+
+    def contagion(node, status, edge_id):
+        return table[len(members[edge_id])][num_infected[edge_id]]
+
+    def count(node, increment):
+        for edge_id in memberships[node]:
+            num_infected[edge_id] += increment
+
+    return contagion, count
+
+
+def _spontaneous_nodes(
+    members, memberships, transmission_rates, transmission_function, args
+):
+    """The nodes that can be infected through a hyperedge without infected
+    members, e.g., through a singleton edge with `collective_contagion`."""
+    susceptible = defaultdict(lambda: "S")
+    return {
+        node
+        for node, edge_ids in memberships.items()
+        if any(
+            transmission_rates[edge_id] > 0
+            and transmission_function(node, susceptible, members[edge_id], **args) != 0
+            for edge_id in edge_ids
+        )
+    }
+
+
+def _discrete_frontier(infected, status, members, memberships, spontaneous, index):
+    """The nodes whose state can change during a step of the discrete engines.
+
+    These are the infected nodes, the susceptible nodes that share a hyperedge
+    with an infected node, and the susceptible nodes of `spontaneous`. They
+    are sorted by `index` so that the nodes are visited in the order of
+    `H.nodes`.
+    """
+    frontier = set(infected)
+    frontier.update(node for node in spontaneous if status[node] == "S")
+    for node in infected:
+        for edge_id in memberships[node]:
+            frontier.update(nbr for nbr in members[edge_id] if status[nbr] == "S")
+    return sorted(frontier, key=index.__getitem__)
+
+
+def _format_output(output, *extras):
+    """Append the optional outputs to the output of a simulation.
+
+    Parameters
+    ----------
+    output : tuple
+        the standard output of the simulation.
+    *extras :
+        optional outputs, which are only appended if not None.
+
+    Returns
+    -------
+    tuple or object
+        the output, unpacked if there is a single element.
+    """
+    output = output + tuple(e for e in extras if e is not None)
+    return output[0] if len(output) == 1 else output
+
+
+def _count_events(stats, events, H):
+    """Count the events by type and edge size from an event list."""
+    members = H.edges.members(dtype=dict)
+    for event in events:
+        if not isinstance(event, dict) or event["old_state"] is None:
+            continue
+        if event["new_state"] == "I":
+            # initial infections are not events
+            if event["source"] is not None:
+                stats.events["infection", len(members[event["source"]])] += 1
+        else:
+            stats.events["recovery", None] += 1
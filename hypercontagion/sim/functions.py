@@ -4,8 +4,39 @@ Provides predefined contagion functions for use in the hypercontagion library.
 
 import random
 
+import numpy as np
+
+from ..exception import HyperContagionError
+
+
+def count_based(function):
+    """Declare that a contagion function only depends on the edge size and
+    the number of infected neighbors.
+
+    The simulation engines then tabulate the function once per edge size
+    and replace its calls by lookups in the table. The declaration is
+    checked on a few hyperedges of the hypergraph before the simulation.
+
+    Parameters
+    ----------
+    function : callable
+        the contagion function.
+
+    Returns
+    -------
+    callable
+        the same function, with a `count_based` attribute set to True.
+
+    See Also
+    --------
+    is_count_based
+    """
+    function.count_based = True
+    return function
+
 
 # built-in functions
+@count_based
 def collective_contagion(node, status, edge):
     """Collective contagion function.
 
@@ -29,6 +60,7 @@ def collective_contagion(node, status, edge):
     return 1
 
 
+@count_based
 def individual_contagion(node, status, edge):
     """Individual contagion function.
 
@@ -52,6 +84,7 @@ def individual_contagion(node, status, edge):
     return 0
 
 
+@count_based
 def threshold(node, status, edge, threshold=0.5):
     """Threshold contagion process.
 
@@ -121,6 +154,401 @@ def majority_vote(node, status, edge):
         return random.choice([0, 1])
 
 
+@count_based
 def size_dependent(node, status, edge):
 
     return sum([status[i] == "I" for i in set(edge).difference({node})])
+
+
+def _vectorized_version(function):
+    """Register the decorated function as the vectorized version of `function`."""
+
+    def decorator(vectorized):
+        function.vectorized = vectorized
+        return vectorized
+
+    return decorator
+
+
+# built-in vectorized functions
+@_vectorized_version(collective_contagion)
+def vectorized_collective_contagion(edge_ids, sizes, num_infected, states):
+    """Vectorized collective contagion function.
+
+    Parameters
+    ----------
+    edge_ids : array-like
+        edge IDs
+    sizes : array-like of int
+        sizes of the hyperedges
+    num_infected : array-like of int
+        numbers of infected hyperedge neighbors of the nodes
+    states : array-like of str
+        states of the nodes
+
+    Returns
+    -------
+    numpy array
+        0 where no transmission can occur, 1 where it can.
+
+    See Also
+    --------
+    collective_contagion
+    """
+    return (np.asarray(num_infected) == np.asarray(sizes) - 1).astype(float)
+
+
+@_vectorized_version(individual_contagion)
+def vectorized_individual_contagion(edge_ids, sizes, num_infected, states):
+    """Vectorized individual contagion function.
+
+    Parameters
+    ----------
+    edge_ids : array-like
+        edge IDs
+    sizes : array-like of int
+        sizes of the hyperedges
+    num_infected : array-like of int
+        numbers of infected hyperedge neighbors of the nodes
+    states : array-like of str
+        states of the nodes
+
+    Returns
+    -------
+    numpy array
+        0 where no transmission can occur, 1 where it can.
+
+    See Also
+    --------
+    individual_contagion
+    """
+    return (np.asarray(num_infected) > 0).astype(float)
+
+
+@_vectorized_version(threshold)
+def vectorized_threshold(edge_ids, sizes, num_infected, states, threshold=0.5):
+    """Vectorized threshold contagion process.
+
+    Parameters
+    ----------
+    edge_ids : array-like
+        edge IDs
+    sizes : array-like of int
+        sizes of the hyperedges
+    num_infected : array-like of int
+        numbers of infected hyperedge neighbors of the nodes
+    states : array-like of str
+        states of the nodes
+    threshold : float, default: 0.5
+        the critical fraction of hyperedge neighbors above
+        which contagion spreads.
+
+    Returns
+    -------
+    numpy array
+        0 where no transmission can occur, 1 where it can.
+
+    See Also
+    --------
+    threshold
+    """
+    return (_infected_fraction(sizes, num_infected) >= threshold).astype(float)
+
+
+@_vectorized_version(majority_vote)
+def vectorized_majority_vote(edge_ids, sizes, num_infected, states):
+    """Vectorized majority vote contagion process.
+
+    The ties, which are random in `majority_vote`, are replaced by their
+    expectation, 1/2.
+
+    Parameters
+    ----------
+    edge_ids : array-like
+        edge IDs
+    sizes : array-like of int
+        sizes of the hyperedges
+    num_infected : array-like of int
+        numbers of infected hyperedge neighbors of the nodes
+    states : array-like of str
+        states of the nodes
+
+    Returns
+    -------
+    numpy array
+        0 where no transmission can occur, 1 where it can, and 1/2 for ties.
+
+    See Also
+    --------
+    majority_vote
+    """
+    c = _infected_fraction(sizes, num_infected)
+    return np.where(c == 0.5, 0.5, (c > 0.5).astype(float))
+
+
+@_vectorized_version(size_dependent)
+def vectorized_size_dependent(edge_ids, sizes, num_infected, states):
+    """Vectorized size-dependent contagion function.
+
+    Parameters
+    ----------
+    edge_ids : array-like
+        edge IDs
+    sizes : array-like of int
+        sizes of the hyperedges
+    num_infected : array-like of int
+        numbers of infected hyperedge neighbors of the nodes
+    states : array-like of str
+        states of the nodes
+
+    Returns
+    -------
+    numpy array
+        the numbers of infected hyperedge neighbors.
+
+    See Also
+    --------
+    size_dependent
+    """
+    return np.asarray(num_infected, dtype=float)
+
+
+def vectorize(transmission_function, H=None, trials=10):
+    """The vectorized version of a contagion function.
+
+    A vectorized contagion function is called as
+    ``function(edge_ids, sizes, num_infected, states, **args)`` with
+    arrays, or arrays and scalars that broadcast together, of edge IDs,
+    edge sizes, numbers of infected hyperedge neighbors, and states of
+    the nodes to which the contagion function applies, and returns an
+    array of the values of the contagion function.
+
+    A contagion function can provide its own vectorized version as its
+    `vectorized` attribute, as the built-in functions do. Otherwise, the
+    function is evaluated for a node in a hyperedge of each size whose
+    first k neighbors are infected and the others susceptible, which is
+    only valid if it depends on the number of infected neighbors alone.
+    This is checked for each size on random states of the hyperedges of
+    `H`, or of a hyperedge of that size if `H` is None, the first time
+    that the size is evaluated.
+
+    Parameters
+    ----------
+    transmission_function : lambda function
+        The contagion function.
+    H : xgi.Hypergraph, default: None
+        The hypergraph on which the function is checked.
+    trials : int, default: 10
+        the number of random states per hyperedge size on which the
+        function is checked.
+
+    Returns
+    -------
+    callable
+        the vectorized contagion function, which raises a
+        HyperContagionError if `transmission_function` has no vectorized
+        version and does not only depend on the number of infected
+        neighbors.
+
+    See Also
+    --------
+    is_count_based
+    """
+    vectorized = getattr(transmission_function, "vectorized", None)
+    if vectorized is not None:
+        return vectorized
+
+    edges = _edges_by_size(H.edges.members(dtype=dict)) if H is not None else {}
+    checked = set()
+
+    def adapter(edge_ids, sizes, num_infected, states, **args):
+        _, sizes, num_infected, states = np.broadcast_arrays(
+            edge_ids, sizes, num_infected, states
+        )
+        factors = np.zeros(sizes.shape)
+        for size in np.unique(sizes).tolist():
+            edge = list(range(size))
+            if size not in checked:
+                members = dict(enumerate(edges.get(size, [edge])))
+                table = _probe_counts(transmission_function, [size], **args)
+                if _count_mismatch(
+                    transmission_function,
+                    members,
+                    table,
+                    trials,
+                    random.Random(0),
+                    args,
+                ):
+                    raise HyperContagionError(
+                        "the transmission function has no vectorized version and "
+                        "depends on more than the number of infected neighbors"
+                    )
+                checked.add(size)
+            in_size = sizes == size
+            for state in np.unique(states[in_size]):
+                values = np.zeros(size + 1)
+                for k in range(size):
+                    status = {n: "I" if 1 <= n <= k else "S" for n in edge}
+                    status[0] = state
+                    values[k] = transmission_function(0, status, edge, **args)
+                mask = in_size & (states == state)
+                factors[mask] = values[num_infected[mask]]
+        return factors
+
+    return adapter
+
+
+def _infected_fraction(sizes, num_infected):
+    """The fraction of infected hyperedge neighbors, 0 without neighbors."""
+    neighbors = np.asarray(sizes) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(neighbors > 0, np.asarray(num_infected) / neighbors, 0.0)
+
+
+def _probe_counts(transmission_function, sizes, **args):
+    """Tabulate a contagion function by edge size and number of infected neighbors.
+
+    The function is evaluated for a susceptible node in an edge of each size
+    with k = 0, ..., size - 1 infected neighbors, which assumes that it only
+    depends on the number of infected neighbors. The ties of `majority_vote`
+    are replaced by their expectation, 1/2.
+
+    Parameters
+    ----------
+    transmission_function : lambda function
+        The contagion function.
+    sizes : iterable of int
+        the edge sizes.
+    **args :
+        the keyword arguments of the contagion function.
+
+    Returns
+    -------
+    dict
+        keys are edge sizes and values are arrays of length size + 1 where
+        entry k is the contagion function with k infected neighbors. The
+        last entry, which no susceptible node can reach, is zero.
+    """
+    table = dict()
+    for size in sizes:
+        values = np.zeros(size + 1)
+        edge = list(range(size))
+        for k in range(size):
+            if transmission_function is majority_vote and 2 * k == size - 1 > 0:
+                values[k] = 0.5
+                continue
+            status = {n: "I" if 1 <= n <= k else "S" for n in edge}
+            values[k] = transmission_function(0, status, edge, **args)
+        table[size] = values
+    return table
+
+
+def is_count_based(transmission_function, H, trials=10, seed=None, **args):
+    """Check whether a contagion function only depends on the edge size and
+    the number of infected neighbors.
+
+    The function is evaluated on hyperedges of `H` with random infected
+    neighbors, the other neighbors being susceptible or recovered at random,
+    and compared with its values on a hyperedge of the same size whose
+    infected neighbors are the first ones. This can only disprove that the
+    function is count-based, and a function with random outputs such as
+    `majority_vote` may or may not be detected.
+
+    Parameters
+    ----------
+    transmission_function : lambda function
+        The contagion function.
+    H : xgi.Hypergraph
+        The hypergraph on which the function is evaluated.
+    trials : int, default: 10
+        the number of random states per hyperedge size.
+    seed : integer or None (default)
+        Seed of the random states, which do not affect the global random
+        number generator.
+    **args :
+        the keyword arguments of the contagion function.
+
+    Returns
+    -------
+    bool
+        False if the function has different values for two states with the
+        same counts or raises an exception, True otherwise.
+
+    See Also
+    --------
+    count_based
+    """
+    members = H.edges.members(dtype=dict)
+    try:
+        table = _probe_counts(transmission_function, _edges_by_size(members), **args)
+        return not _count_mismatch(
+            transmission_function, members, table, trials, random.Random(seed), args
+        )
+    except Exception:
+        return False
+
+
+def _count_table(transmission_function, members, args, trials=10):
+    """Tabulate a contagion function declared with `count_based`.
+
+    Parameters
+    ----------
+    transmission_function : lambda function
+        The contagion function.
+    members : dict
+        keys are edge IDs and values are the members of the hyperedges.
+    args : dict
+        the keyword arguments of the contagion function.
+    trials : int, default: 10
+        the number of random states per hyperedge size on which the
+        declaration is checked.
+
+    Returns
+    -------
+    dict or None
+        keys are edge sizes and values are lists where entry k is the
+        contagion function with k infected neighbors, or None if the
+        function is not declared count-based.
+
+    Raises
+    ------
+    HyperContagionError
+        If the function is declared count-based but is not.
+    """
+    if not getattr(transmission_function, "count_based", False):
+        return None
+    table = _probe_counts(transmission_function, _edges_by_size(members), **args)
+    if _count_mismatch(
+        transmission_function, members, table, trials, random.Random(0), args
+    ):
+        raise HyperContagionError(
+            "the transmission function is declared count-based but depends "
+            "on more than the number of infected neighbors"
+        )
+    return {size: values.tolist() for size, values in table.items()}
+
+
+def _edges_by_size(members):
+    """The non-empty hyperedges as lists, grouped by size."""
+    edges = dict()
+    for edge in members.values():
+        if len(edge) > 0:
+            edges.setdefault(len(edge), []).append(list(edge))
+    return edges
+
+
+def _count_mismatch(transmission_function, members, table, trials, rng, args):
+    """Whether a contagion function differs from its table for random states
+    of the hyperedges."""
+    for size, edge_list in _edges_by_size(members).items():
+        for _ in range(trials):
+            edge = rng.choice(edge_list)
+            node = rng.choice(edge)
+            neighbors = [n for n in edge if n != node]
+            k = rng.randint(0, len(neighbors))
+            infected = set(rng.sample(neighbors, k))
+            status = {n: "I" if n in infected else rng.choice("SR") for n in edge}
+            status[node] = "S"
+            if transmission_function(node, status, edge, **args) != table[size][k]:
+                return True
+    return False
@@ -2,10 +2,17 @@
 Opinion formation models on hypergraphs.
 """
 
+import inspect
+import itertools
+import os
 import random
 
 import numpy as np
 
+from ..exception import HyperContagionError
+from ..utils import node_edge_incidence
+from ..utils.utilities import _map, _seed_python_random, _spawn_seeds
+
 
 # built-in functions
 def voter_model(node, edge, status, p_adoption=1):
@@ -17,21 +24,23 @@ def voter_model(node, edge, status, p_adoption=1):
         node whose opinion may change
     edge : iterable
         a list of the members of a hyperedge. must include the node.
-    status : dict
-        keys are node IDs, statuses are values
+    status : numpy array
+        node statuses, indexed by node
     p_adoption : float, default: 1
         probability that the node will adopt the consensus.
 
     Returns
     -------
-    str
-        new node status
+    numpy array
+        the node statuses, updated in place.
     """
-    neighbors = [n for n in edge if n != node]
-    opinions = set(status[neighbors])  # get unique opinions
+    if not isinstance(edge, np.ndarray):
+        edge = np.array(list(edge))
+    neighbors = edge[edge != node]
+    opinions = np.unique(status[neighbors])  # get unique opinions
     if len(opinions) == 1:
         if random.random() <= p_adoption:
-            status[node] = opinions.pop()
+            status[node] = opinions[0]
     return status
 
 
@@ -134,7 +143,15 @@ def hegselmann_krause(H, status, epsilon=0.1):
 
 
 def simulate_random_group_continuous_state_1D(
-    H, initial_states, function=deffuant_weisbuch, tmin=0, tmax=100, dt=1, **args
+    H,
+    initial_states,
+    function=deffuant_weisbuch,
+    tmin=0,
+    tmax=100,
+    dt=1,
+    tol=None,
+    return_convergence_time=False,
+    **args
 ):
     """Simulate an opinion formation process where states are continuous and
     random groups are chosen.
@@ -153,13 +170,29 @@ def simulate_random_group_continuous_state_1D(
         the time at which the simulation terminates
     dt : float > 0, default: 1
         the time step to take.
+    tol : float, default: None
+        If not None, the simulation stops as soon as no hyperedge is
+        still discordant, i.e., every hyperedge has a discordance either
+        at most `tol` (consensus) or at least the confidence bound
+        `epsilon` of the update function (frozen). The discordances are
+        maintained incrementally for the hyperedges incident to the
+        updated nodes, and only recomputed once the updates since the
+        last computation could have changed as many hyperedges as are
+        still discordant.
+    return_convergence_time : bool, default: False
+        Whether to also return the time at which the stopping criterion
+        was first satisfied (float("Inf") if it never was).
 
     Returns
     -------
     numpy array, numpy array
         a 1D array of the times and a 2D array of the states.
+        If the simulation stops early, both are truncated at the
+        time of convergence. If `return_convergence_time` is True,
+        the convergence time is returned as a third value.
     """
     members = H.edges.members(dtype=dict)
+    edge_ids = list(members)
 
     time = tmin
     timesteps = int((tmax - tmin) / dt) + 2
@@ -168,68 +201,194 @@ def simulate_random_group_continuous_state_1D(
     step = 0
     times[step] = time
     states[:, step] = initial_states.copy()
-    while time <= tmax:
+
+    convergence_time = float("Inf")
+    if tol is not None:
+        epsilon = _get_argument(function, "epsilon", args, float("Inf"))
+        edge_index = {edge_id: j for j, edge_id in enumerate(edge_ids)}
+        incidence = node_edge_incidence(H, nodes=range(H.num_nodes), edges=edge_ids)
+        node_ptr, node_edges = incidence.indptr, incidence.indices
+        incidence = incidence.T.tocsr()
+        edge_ptr, edge_nodes = incidence.indptr, incidence.indices
+
+        disc = _edge_discordances(
+            states[:, step], np.arange(len(edge_ids)), edge_ptr, edge_nodes
+        )
+        num_discordant = np.count_nonzero((tol < disc) & (disc < epsilon))
+        if num_discordant == 0:
+            convergence_time = time
+
+        # an upper bound on the number of hyperedges whose discordance
+        # changes when each hyperedge is updated
+        reach = np.bincount(
+            np.repeat(np.arange(len(edge_ids)), np.diff(edge_ptr)),
+            weights=np.diff(node_ptr)[edge_nodes],
+            minlength=len(edge_ids),
+        ).tolist()
+        # the updates since the discordances were last computed, which is
+        # postponed while they cannot have made every hyperedge converge
+        selected = []
+        budget = num_discordant
+        last_check = step
+
+    while time <= tmax and convergence_time == float("Inf"):
         time += dt
         step += 1
         # randomly select hyperedge
-        edge = members[random.choice(list(members))]
+        edge_id = random.choice(edge_ids)
+        edge = members[edge_id]
 
         states[:, step] = function(edge, states[:, step - 1], **args)
         times[step] = time
 
-    return times, states
+        if tol is not None:
+            j = edge_index[edge_id]
+            selected.append(j)
+            budget -= reach[j]
+        if tol is not None and budget <= 0:
+            e = np.unique(
+                np.concatenate(
+                    [edge_nodes[edge_ptr[j] : edge_ptr[j + 1]] for j in set(selected)]
+                )
+            )
+            changed = e[states[e, step] != states[e, last_check]]
+            if len(changed) > 0:
+                affected = np.unique(
+                    np.concatenate(
+                        [node_edges[node_ptr[n] : node_ptr[n + 1]] for n in changed]
+                    )
+                )
+                old = disc[affected]
+                new = _edge_discordances(
+                    states[:, step], affected, edge_ptr, edge_nodes
+                )
+                num_discordant += np.count_nonzero(
+                    (tol < new) & (new < epsilon)
+                ) - np.count_nonzero((tol < old) & (old < epsilon))
+                disc[affected] = new
+            if num_discordant == 0:
+                convergence_time = time
+            selected.clear()
+            budget = num_discordant
+            last_check = step
+
+    times = times[: step + 1]
+    states = states[:, : step + 1]
+    if return_convergence_time:
+        return times, states, convergence_time
+    else:
+        return times, states
 
 
 def simulate_random_node_and_group_discrete_state(
-    H, initial_states, function=voter_model, tmin=0, tmax=100, dt=1, **args
+    H,
+    initial_states,
+    function=voter_model,
+    tmin=0,
+    tmax=100,
+    dt=1,
+    stop_at_consensus=False,
+    return_convergence_time=False,
+    **args
 ):
     """Simulate an opinion formation process where states are discrete and
-    states are updated synchronously.
+    a random node and a random hyperedge containing it are chosen.
 
     Parameters
     ----------
     H : xgi.Hypergraph
         the hypergraph of interest
     initial_states : numpy array
-        initial node states
-    function : update function, default: deffuant_weisbuch
-        node update function
+        initial node states. Any number of distinct opinions is allowed.
+    function : update function, default: voter_model
+        node update function. It is called as ``function(node, edge, status)``
+        where `edge` is an array of the members of the chosen hyperedge and
+        `status` is an array of integer-coded opinions.
     tmin : int, default: 0
         the time at which the simulation starts
     tmax : int, default: 100
         the time at which the simulation terminates
     dt : float > 0, default: 1
         the time step to take.
+    stop_at_consensus : bool, default: False
+        Whether to stop the simulation as soon as all nodes share
+        the same opinion. The number of nodes holding each opinion
+        is maintained incrementally.
+    return_convergence_time : bool, default: False
+        Whether to also return the time at which consensus was
+        first reached (float("Inf") if it never was).
 
     Returns
     -------
     numpy array, numpy array
         a 1D array of the times and a 2D array of the states.
+        If the simulation stops early, both are truncated at the
+        time of consensus. If `return_convergence_time` is True,
+        the consensus time is returned as a third value.
     """
-    members = H.edges.members(dtype=dict)
+    n = H.num_nodes
+    # node-to-edge and edge-to-node adjacency in CSR format
+    incidence = node_edge_incidence(H, nodes=range(n))
+    node_ptr, node_edges = incidence.indptr, incidence.indices
+    incidence = incidence.T.tocsr()
+    edge_ptr, edge_nodes = incidence.indptr, incidence.indices
+
+    # opinions are stored as integer codes
+    opinions, status = np.unique(initial_states, return_inverse=True)
+    status = status.astype(np.min_scalar_type(len(opinions)))
+    counts = np.bincount(status, minlength=len(opinions))
+
     time = tmin
     timesteps = int((tmax - tmin) / dt) + 2
-    states = np.empty((H.num_nodes, timesteps), dtype=object)
+    states = np.empty((n, timesteps), dtype=status.dtype)
     times = np.empty(timesteps)
     step = 0
     times[step] = time
-    states[:, step] = initial_states.copy()
-    while time <= tmax:
+    states[:, step] = status
+
+    convergence_time = time if np.max(counts) == n else float("Inf")
+
+    while time <= tmax and not (stop_at_consensus and convergence_time != float("Inf")):
         time += dt
         step += 1
         # randomly select node
-        node = random.choice(list(H.nodes))
-        # randomly select neighbors of the node
-        edge = members[random.choice(list(members))]
-
-        states[:, step] = function(node, edge, states[:, step - 1], **args)
+        node = random.randrange(n)
+        # randomly select a hyperedge containing the node
+        degree = node_ptr[node + 1] - node_ptr[node]
+        if degree > 0:
+            edge_id = node_edges[node_ptr[node] + random.randrange(degree)]
+            edge = edge_nodes[edge_ptr[edge_id] : edge_ptr[edge_id + 1]]
+
+            old_state = status[node]
+            status = function(node, edge, status, **args)
+            new_state = status[node]
+            if new_state != old_state:
+                counts[old_state] -= 1
+                counts[new_state] += 1
+                if counts[new_state] == n and convergence_time == float("Inf"):
+                    convergence_time = time
+
+        states[:, step] = status
         times[step] = time
 
-    return times, states
+    times = times[: step + 1]
+    states = opinions[states[:, : step + 1]]
+    if return_convergence_time:
+        return times, states, convergence_time
+    else:
+        return times, states
 
 
 def synchronous_update_continuous_state_1D(
-    H, initial_states, function=hegselmann_krause, tmin=0, tmax=100, dt=1, **args
+    H,
+    initial_states,
+    function=hegselmann_krause,
+    tmin=0,
+    tmax=100,
+    dt=1,
+    tol=None,
+    return_convergence_time=False,
+    **args
 ):
     """Simulate an opinion formation process where states are continuous and
     states are updated synchronously.
@@ -248,11 +407,20 @@ def synchronous_update_continuous_state_1D(
         the time at which the simulation terminates
     dt : float > 0, default: 1
         the time step to take.
+    tol : float, default: None
+        If not None, the simulation stops as soon as the largest change
+        of a node state during a single update is at most `tol`.
+    return_convergence_time : bool, default: False
+        Whether to also return the time at which the stopping criterion
+        was first satisfied (float("Inf") if it never was).
 
     Returns
     -------
     numpy array, numpy array
         a 1D array of the times and a 2D array of the states.
+        If the simulation stops early, both are truncated at the
+        time of convergence. If `return_convergence_time` is True,
+        the convergence time is returned as a third value.
     """
     time = tmin
     timesteps = int((tmax - tmin) / dt) + 2
@@ -261,10 +429,401 @@ def synchronous_update_continuous_state_1D(
     step = 0
     times[step] = time
     states[:, step] = initial_states.copy()
-    while time <= tmax:
+
+    convergence_time = float("Inf")
+    while time <= tmax and convergence_time == float("Inf"):
         time += dt
         step += 1
         states[:, step] = function(H, states[:, step - 1], **args)
         times[step] = time
 
-    return times, states
+        if tol is not None:
+            if np.max(np.abs(states[:, step] - states[:, step - 1])) <= tol:
+                convergence_time = time
+
+    times = times[: step + 1]
+    states = states[:, : step + 1]
+    if return_convergence_time:
+        return times, states, convergence_time
+    else:
+        return times, states
+
+
+def synchronous_hegselmann_krause(
+    H,
+    initial_states,
+    epsilon=0.1,
+    tmin=0,
+    tmax=100,
+    dt=1,
+    tol=None,
+    return_convergence_time=False,
+):
+    """Simulate the Hegselmann-Krause model with sparse linear algebra.
+
+    This is equivalent to `synchronous_update_continuous_state_1D` with
+    `hegselmann_krause` as the update function, but the node-edge
+    incidence matrix is built once and every update is a handful of
+    sparse matrix products. Several realizations can be advanced at once
+    by passing a 2D array of initial states.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        the hypergraph of interest
+    initial_states : numpy array
+        initial node states, either a 1D array of size N or
+        a 2D array of size N x B for B realizations.
+    epsilon : float, default: 0.1
+        confidence bound
+    tmin : int, default: 0
+        the time at which the simulation starts
+    tmax : int, default: 100
+        the time at which the simulation terminates
+    dt : float > 0, default: 1
+        the time step to take.
+    tol : float, default: None
+        If not None, the simulation stops as soon as the largest change
+        of a node state (over all realizations) during a single update
+        is at most `tol`.
+    return_convergence_time : bool, default: False
+        Whether to also return the time at which the stopping criterion
+        was first satisfied (float("Inf") if it never was).
+
+    Returns
+    -------
+    numpy array, numpy array
+        a 1D array of the times and an array of the states of size
+        N x T (or N x B x T for a 2D array of initial states).
+        If the simulation stops early, both are truncated at the
+        time of convergence. If `return_convergence_time` is True,
+        the convergence time is returned as a third value.
+    """
+    incidence = node_edge_incidence(H, nodes=range(H.num_nodes))
+    incidence_T = incidence.T.tocsr()
+    sizes = np.asarray(incidence.sum(axis=0)).ravel()
+    singletons = sizes < 2
+    # avoid dividing by zero; singleton edges are never like-minded.
+    norm = 1 / np.maximum(sizes - 1, 1)
+
+    initial_states = np.asarray(initial_states, dtype=float)
+    time = tmin
+    timesteps = int((tmax - tmin) / dt) + 2
+    states = np.empty(initial_states.shape + (timesteps,))
+    times = np.empty(timesteps)
+    step = 0
+    times[step] = time
+    states[..., step] = initial_states
+    x = initial_states.reshape(H.num_nodes, -1)
+
+    convergence_time = float("Inf")
+    while time <= tmax and convergence_time == float("Inf"):
+        time += dt
+        step += 1
+
+        # the mean and discordance of every edge
+        total = incidence_T @ x
+        mean = total / np.maximum(sizes, 1)[:, np.newaxis]
+        disc = (incidence_T @ x**2 - total * mean) * norm[:, np.newaxis]
+        like_minded = (disc < epsilon) & ~singletons[:, np.newaxis]
+
+        count = incidence @ like_minded
+        new_x = np.divide(
+            incidence @ (like_minded * mean),
+            count,
+            out=x.copy(),
+            where=count > 0,
+        )
+
+        states[..., step] = new_x.reshape(initial_states.shape)
+        times[step] = time
+
+        if tol is not None and np.max(np.abs(new_x - x)) <= tol:
+            convergence_time = time
+        x = new_x
+
+    times = times[: step + 1]
+    states = states[..., : step + 1]
+    if return_convergence_time:
+        return times, states, convergence_time
+    else:
+        return times, states
+
+
+def num_clusters(status, tol=1e-3):
+    """The number of opinion clusters.
+
+    Parameters
+    ----------
+    status : numpy array
+        node statuses.
+    tol : float, default: 1e-3
+        for numerical statuses, the largest gap between sorted
+        opinions that belong to the same cluster.
+
+    Returns
+    -------
+    int
+        the number of clusters. For non-numerical statuses, this is
+        the number of distinct opinions.
+    """
+    status = np.asarray(status)
+    if not np.issubdtype(status.dtype, np.number):
+        return len(np.unique(status))
+    if len(status) == 0:
+        return 0
+    return int(np.sum(np.diff(np.sort(status)) > tol)) + 1
+
+
+def mean_discordance(H, status):
+    """The average discordance of the hyperedges of size two or more.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        the hypergraph of interest
+    status : numpy array
+        opinions of the nodes
+
+    Returns
+    -------
+    float
+        the mean discordance (nan if there are no such hyperedges).
+    """
+    d = [discordance(e, status) for e in H.edges.members() if len(e) > 1]
+    return np.mean(d) if d else np.nan
+
+
+def opinion_ensemble(
+    H,
+    initial_states,
+    simulation=simulate_random_group_continuous_state_1D,
+    parameters=None,
+    realizations=1,
+    statistics=None,
+    processes=None,
+    seed=None,
+    **args
+):
+    """Run many realizations of an opinion model over a parameter grid.
+
+    The realizations are distributed over a process pool and each one
+    gets an independent random stream. Only the requested summary
+    statistics are sent back from the workers, never the state matrices.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        the hypergraph of interest
+    initial_states : numpy array or callable
+        initial node states. If callable, it is called with a
+        `numpy.random.Generator` for every realization and must return
+        the initial states. It must be picklable, e.g., a module-level
+        function, if `processes` is not 1.
+    simulation : simulation function,
+        default: simulate_random_group_continuous_state_1D
+        the opinion simulation function.
+    parameters : dict, default: None
+        keys are argument names of the simulation or its update function
+        and values are lists of values. Every combination is simulated.
+    realizations : int, default: 1
+        the number of realizations per parameter combination.
+    statistics : iterable, default: None
+        the summary statistics to compute. Each is either a string
+        ("num_clusters", "discordance", "convergence_time", or "final_time")
+        or a picklable callable of the form ``f(H, times, states)``.
+        "discordance" requires numerical opinions. If None,
+        ("num_clusters", "convergence_time") for
+        `simulate_random_node_and_group_discrete_state` and
+        ("num_clusters", "discordance", "convergence_time") otherwise.
+    processes : int, default: None
+        the number of worker processes. If 1, everything runs in this
+        process. If None, the number of CPUs is used.
+    seed : int, default: None
+        the root seed of the random streams.
+    **args :
+        other arguments passed to the simulation function, e.g., `tmax`
+        or `tol` to stop at convergence.
+
+    Returns
+    -------
+    list of dict, dict of numpy arrays
+        The parameter combinations and a dict where the keys are the names
+        of the statistics and the values are arrays with one row per
+        parameter combination and one column per realization.
+    """
+    if parameters is None:
+        parameters = dict()
+    names = list(parameters)
+    grid = [
+        dict(zip(names, values))
+        for values in itertools.product(*(parameters[n] for n in names))
+    ]
+    if statistics is None:
+        if simulation is simulate_random_node_and_group_discrete_state:
+            statistics = ["num_clusters", "convergence_time"]
+        else:
+            statistics = ["num_clusters", "discordance", "convergence_time"]
+    statistics = list(statistics)
+
+    for stat in statistics:
+        if not callable(stat) and stat not in _statistics:
+            raise HyperContagionError("Unknown statistic {}".format(stat))
+
+    # batch the realizations so that each worker gets a few large tasks.
+    workers = processes if processes is not None else os.cpu_count() or 1
+    batch_size = max(1, min(realizations, -(-len(grid) * realizations // workers)))
+
+    seeds = _spawn_seeds(seed, len(grid) * realizations)
+    tasks = []
+    for i, params in enumerate(grid):
+        for j in range(0, realizations, batch_size):
+            k = i * realizations + j
+            tasks.append(
+                (
+                    H,
+                    initial_states,
+                    simulation,
+                    {**args, **params},
+                    seeds[k : k + min(batch_size, realizations - j)],
+                    statistics,
+                )
+            )
+    output = list(
+        itertools.chain.from_iterable(_map(_run_opinion_realizations, tasks, processes))
+    )
+
+    results = dict()
+    for j, stat in enumerate(statistics):
+        name = stat if isinstance(stat, str) else stat.__name__
+        results[name] = np.array([r[j] for r in output]).reshape(
+            len(grid), realizations
+        )
+    return grid, results
+
+
+def _run_opinion_realizations(task):
+    """Worker for `opinion_ensemble`.
+
+    Parameters
+    ----------
+    task : tuple
+        H, initial states, simulation function, arguments, seed sequences,
+        and statistics.
+
+    Returns
+    -------
+    list of list
+        the statistics for each realization.
+    """
+    H, initial_states, simulation, args, seeds, statistics = task
+    output = []
+    # the state of `random` is restored when running in the caller's process
+    random_state = random.getstate()
+    try:
+        for seed_sequence in seeds:
+            _seed_python_random(seed_sequence)
+            if callable(initial_states):
+                states0 = initial_states(np.random.default_rng(seed_sequence))
+            else:
+                states0 = np.array(initial_states, copy=True)
+            times, states, convergence_time = simulation(
+                H, states0, return_convergence_time=True, **args
+            )
+
+            values = []
+            for stat in statistics:
+                if callable(stat):
+                    values.append(stat(H, times, states))
+                else:
+                    values.append(_statistics[stat](H, times, states, convergence_time))
+            output.append(values)
+    finally:
+        random.setstate(random_state)
+    return output
+
+
+_statistics = {
+    "num_clusters": lambda H, times, states, tc: num_clusters(states[:, -1]),
+    "discordance": lambda H, times, states, tc: _numerical_discordance(
+        H, states[:, -1]
+    ),
+    "convergence_time": lambda H, times, states, tc: tc,
+    "final_time": lambda H, times, states, tc: times[-1],
+}
+
+
+def _numerical_discordance(H, status):
+    """The mean discordance of numerical opinions for `opinion_ensemble`."""
+    if not np.issubdtype(np.asarray(status).dtype, np.number):
+        raise HyperContagionError("the discordance requires numerical opinions")
+    return mean_discordance(H, status)
+
+
+def _edge_discordances(status, edges, edge_ptr, edge_nodes):
+    """The discordance of several hyperedges at once.
+
+    Parameters
+    ----------
+    status : numpy array
+        opinions of the nodes
+    edges : numpy array
+        the indices of the hyperedges
+    edge_ptr : numpy array
+        the CSR index pointer of the edge-node incidence.
+    edge_nodes : numpy array
+        the CSR indices of the edge-node incidence.
+
+    Returns
+    -------
+    numpy array
+        the discordance of each hyperedge, infinite for singletons
+        (as in `discordance`).
+    """
+    sizes = edge_ptr[edges + 1] - edge_ptr[edges]
+    disc = np.full(len(edges), np.inf)
+    nonempty = sizes > 0
+    edges, sizes = edges[nonempty], sizes[nonempty]
+    if len(edges) == 0:
+        return disc
+
+    # the positions of the members of every edge, concatenated
+    offsets = np.cumsum(sizes) - sizes
+    positions = np.arange(sizes.sum()) - np.repeat(offsets - edge_ptr[edges], sizes)
+    values = status[edge_nodes[positions]]
+    mean = np.add.reduceat(values, offsets) / sizes
+    squares = np.add.reduceat((values - np.repeat(mean, sizes)) ** 2, offsets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        disc[nonempty] = np.where(sizes > 1, squares / (sizes - 1), np.inf)
+    return disc
+
+
+def _get_argument(function, name, args, default=None):
+    """Get the value of an argument that will be passed to a function.
+
+    Parameters
+    ----------
+    function : callable
+        the function that will be called with `args`.
+    name : str
+        the name of the argument.
+    args : dict
+        the keyword arguments passed to `function`.
+    default : object, default: None
+        the value if the argument is neither in `args` nor
+        has a default in the signature of `function`.
+
+    Returns
+    -------
+    object
+        the value of the argument.
+    """
+    if name in args:
+        return args[name]
+    try:
+        parameter = inspect.signature(function).parameters[name]
+    except (KeyError, TypeError, ValueError):
+        return default
+    if parameter.default is inspect.Parameter.empty:
+        return default
+    return parameter.default
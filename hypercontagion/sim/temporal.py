@@ -0,0 +1,340 @@
+"""
+Contagion processes on temporal hypergraphs.
+"""
+
+import heapq
+import random
+from collections import defaultdict
+
+import numpy as np
+
+from ..exception import HyperContagionError
+from ..utils import SamplingDict
+from .functions import threshold
+
+__all__ = ["temporal_Gillespie_SIR", "temporal_Gillespie_SIS"]
+
+
+def temporal_Gillespie_SIR(
+    T,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    initial_recovereds=None,
+    rho=None,
+    tmin=0,
+    tmax=float("Inf"),
+    return_event_data=False,
+    seed=None,
+    **args
+):
+    """Simulates the SIR model on a temporal hypergraph.
+
+    The activations and deactivations of the hyperedges are interleaved
+    with the epidemic events in a priority queue. Between two changes of
+    the structure, the rates are constant and the Gillespie algorithm is
+    exact, and because the epidemic events are memoryless, the next one
+    is simply drawn again after every change. Only the active hyperedges
+    are indexed.
+
+    Parameters
+    ----------
+    T : TemporalHypergraph
+        The temporal hypergraph on which to simulate the SIR contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    initial_recovereds : iterable, default: None
+        Initially recovered node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: float("Inf")
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    return_event_data : bool, default: False
+        Whether to track each individual transition event that occurs.
+    seed : integer, random_state, or None (default)
+        Indicator of random number generation state.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, R, or the list of events if `return_event_data` is True.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    return _temporal_Gillespie(
+        T,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        initial_recovereds,
+        rho,
+        tmin,
+        tmax,
+        return_event_data,
+        seed,
+        "R",
+        **args
+    )
+
+
+def temporal_Gillespie_SIS(
+    T,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    initial_infecteds=None,
+    rho=None,
+    tmin=0,
+    tmax=float("Inf"),
+    return_event_data=False,
+    seed=None,
+    **args
+):
+    """Simulates the SIS model on a temporal hypergraph.
+
+    The activations and deactivations of the hyperedges are interleaved
+    with the epidemic events in a priority queue. Between two changes of
+    the structure, the rates are constant and the Gillespie algorithm is
+    exact, and because the epidemic events are memoryless, the next one
+    is simply drawn again after every change. Only the active hyperedges
+    are indexed.
+
+    Parameters
+    ----------
+    T : TemporalHypergraph
+        The temporal hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is possible.
+    initial_infecteds : iterable, default: None
+        Initially infected node IDs.
+    rho : float, default: None
+        Fraction initially infected. Cannot be specified if
+        `initial_infecteds` is defined.
+    tmin : float, default: 0
+        Time at which the simulation starts.
+    tmax : float, default: float("Inf")
+        Time at which the simulation terminates if there are still
+        infected nodes.
+    return_event_data : bool, default: False
+        Whether to track each individual transition event that occurs.
+    seed : integer, random_state, or None (default)
+        Indicator of random number generation state.
+
+    Returns
+    -------
+    tuple of np.arrays
+        t, S, I, or the list of events if `return_event_data` is True.
+
+    Raises
+    ------
+    HyperContagionError
+        If the user specifies both rho and initial_infecteds.
+    """
+    return _temporal_Gillespie(
+        T,
+        tau,
+        gamma,
+        transmission_function,
+        initial_infecteds,
+        None,
+        rho,
+        tmin,
+        tmax,
+        return_event_data,
+        seed,
+        "S",
+        **args
+    )
+
+
+def _temporal_Gillespie(
+    T,
+    tau,
+    gamma,
+    transmission_function,
+    initial_infecteds,
+    initial_recovereds,
+    rho,
+    tmin,
+    tmax,
+    return_event_data,
+    seed,
+    recovered_state,
+    **args
+):
+    """The temporal Gillespie algorithm, where infected nodes recover to
+    `recovered_state`."""
+    if seed is not None:
+        random.seed(seed)
+
+    if rho is not None and initial_infecteds is not None:
+        raise HyperContagionError("cannot define both initial_infecteds and rho")
+
+    if initial_infecteds is None:
+        if rho is None:
+            initial_number = 1
+        else:
+            initial_number = int(round(T.num_nodes * rho))
+        initial_infecteds = random.sample(T.nodes, initial_number)
+
+    if initial_recovereds is None:
+        initial_recovereds = []
+
+    status = defaultdict(lambda: "S")
+    for node in initial_infecteds:
+        status[node] = "I"
+    for node in initial_recovereds:
+        status[node] = "R"
+
+    events = list()
+    if return_event_data:
+        initial_transitions = {"S": (None, "S"), "I": ("S", "I"), "R": ("I", "R")}
+        for node in T.nodes:
+            old_state, new_state = initial_transitions[status[node]]
+            events.append(
+                {
+                    "time": tmin,
+                    "source": None,
+                    "target": node,
+                    "old_state": old_state,
+                    "new_state": new_state,
+                }
+            )
+
+    I = [len(initial_infecteds)]
+    R = [len(initial_recovereds)]
+    S = [T.num_nodes - I[0] - R[0]]
+    times = [tmin]
+
+    infecteds = SamplingDict()
+    for node in initial_infecteds:
+        infecteds.update(node)
+
+    sizes = sorted({len(edge) for edge in T.members})
+    IS_links = {size: SamplingDict() for size in sizes}
+    # the active hyperedges of each node
+    active = defaultdict(set)
+
+    def update_links(edge_id):
+        edge = T.members[edge_id]
+        links = IS_links[len(edge)]
+        for nbr in edge:
+            if (
+                status[nbr] == "S"
+                and transmission_function(nbr, status, edge, **args) != 0
+            ):
+                links.update((edge_id, nbr))
+            elif (edge_id, nbr) in links:
+                links.remove((edge_id, nbr))
+
+    def change_status(node):
+        for edge_id in active[node]:
+            update_links(edge_id)
+
+    # the changes of the structure: (time, 0, edge) for deactivations and
+    # (time, 1, edge) for activations, so that an edge that ends when
+    # another starts is removed first. Activations are queued one at a
+    # time since the hyperedges are sorted by activation time.
+    Q = []
+    if T.num_edges > 0:
+        heapq.heappush(Q, (T.starts[0], 1, 0))
+
+    t = tmin
+    while infecteds and t < tmax:
+        total_rates = [gamma * len(infecteds)]
+        total_rates.extend(tau[size] * len(IS_links[size]) for size in sizes)
+        total_rate = sum(total_rates)
+        delay = random.expovariate(total_rate) if total_rate > 0 else float("Inf")
+
+        if Q and (Q[0][0] <= t or t + delay >= Q[0][0]):
+            # the structure changes before the next epidemic event
+            t_change, activation, edge_id = heapq.heappop(Q)
+            if t_change >= tmax:
+                break
+            t = max(t, t_change)
+            edge = T.members[edge_id]
+            if activation:
+                if T.ends[edge_id] > t:
+                    heapq.heappush(Q, (T.ends[edge_id], 0, edge_id))
+                    for node in edge:
+                        active[node].add(edge_id)
+                    update_links(edge_id)
+                if edge_id + 1 < T.num_edges:
+                    heapq.heappush(Q, (T.starts[edge_id + 1], 1, edge_id + 1))
+            else:
+                for node in edge:
+                    active[node].discard(edge_id)
+                    if (edge_id, node) in IS_links[len(edge)]:
+                        IS_links[len(edge)].remove((edge_id, node))
+            continue
+
+        t += delay
+        if t >= tmax:
+            break
+
+        choice = random.random() * total_rate
+        if choice < total_rates[0]:
+            node = infecteds.random_removal()
+            source = None
+            old_state, new_state = "I", recovered_state
+        else:
+            choice -= total_rates[0]
+            for size, rate in zip(sizes, total_rates[1:]):
+                if choice < rate:
+                    break
+                choice -= rate
+            source, node = IS_links[size].choose_random()
+            infecteds.update(node)
+            old_state, new_state = "S", "I"
+
+        status[node] = new_state
+        change_status(node)
+
+        if return_event_data:
+            events.append(
+                {
+                    "time": t,
+                    "source": source,
+                    "target": node,
+                    "old_state": old_state,
+                    "new_state": new_state,
+                }
+            )
+        times.append(t)
+        if new_state == "I":
+            S.append(S[-1] - 1)
+            I.append(I[-1] + 1)
+            R.append(R[-1])
+        elif new_state == "S":
+            S.append(S[-1] + 1)
+            I.append(I[-1] - 1)
+            R.append(R[-1])
+        else:
+            S.append(S[-1])
+            I.append(I[-1] - 1)
+            R.append(R[-1] + 1)
+
+    if return_event_data:
+        return events
+    if recovered_state == "S":
+        return np.array(times), np.array(S), np.array(I)
+    return np.array(times), np.array(S), np.array(I), np.array(R)
@@ -0,0 +1,303 @@
+"""
+Estimation of epidemic thresholds from ensembles of simulations.
+"""
+
+import os
+import random
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from ..exception import HyperContagionError
+from ..utils import Observer
+from ..utils.utilities import _map, _seed_python_random
+from .epidemics import Gillespie_SIS
+from .functions import threshold
+
+__all__ = ["epidemic_threshold"]
+
+
+def epidemic_threshold(
+    H,
+    tau,
+    gamma,
+    transmission_function=threshold,
+    simulation=Gillespie_SIS,
+    lower=0,
+    upper=None,
+    rho=0.5,
+    tmax=100,
+    tol=0.01,
+    survival=0.5,
+    confidence=0.95,
+    min_realizations=16,
+    max_realizations=256,
+    processes=None,
+    seed=None,
+    **args
+):
+    """Estimate the epidemic threshold of the SIS model by bisection.
+
+    The transmission rates `tau` are multiplied by a common factor, which
+    is bisected. At each factor, realizations are added in batches until
+    the Wilson confidence interval of the probability that the epidemic
+    survives until `tmax` lies entirely above or below `survival`. The
+    realizations near the threshold start from the final states of the
+    surviving realizations at the closest supercritical factor, i.e.,
+    from quasi-stationary states, which shortens the transient.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which to simulate the SIS contagion process
+    tau : dict
+        Keys are edge sizes and values are transmission rates, which
+        set the relative rates of the edge sizes.
+    gamma : float
+        Healing rate
+    transmission_function : lambda function, default: threshold
+        The contagion function that determines whether transmission is
+        possible. It must be picklable if `processes` is not 1.
+    simulation : SIS simulation function, default: Gillespie_SIS
+        The engine, which must accept `observers`.
+    lower : float, default: 0
+        A factor below the threshold, which is checked if positive.
+    upper : float, default: None
+        A factor above the threshold. If None, it is found by doubling
+        the larger of 1 and twice `lower`, which remains the lowest factor
+        of the bracket.
+    rho : float, default: 0.5
+        The fraction initially infected when there are no
+        quasi-stationary states to start from.
+    tmax : float, default: 100
+        The time until which the epidemic must survive.
+    tol : float, default: 0.01
+        The bisection stops when the bracket is narrower than `tol`.
+    survival : float, default: 0.5
+        The survival probability that defines the threshold.
+    confidence : float, default: 0.95
+        The confidence level of the intervals of the survival probability.
+    min_realizations : int, default: 16
+        The number of realizations in each batch.
+    max_realizations : int, default: 256
+        The largest number of realizations at a single factor. If the
+        interval still contains `survival`, the factor is returned as the
+        threshold because it cannot be resolved further.
+    processes : int, default: None
+        the number of worker processes. If 1, everything runs in this
+        process. If None, the number of CPUs is used.
+    seed : int, default: None
+        the root seed of the random streams.
+    **args :
+        other arguments passed to the simulation function.
+
+    Returns
+    -------
+    float, dict
+        The factor of `tau` at the threshold and a report with the keys
+        "tau" (the transmission rates at the threshold), "bracket" (the
+        final lower and upper factors), "evaluations" (a list of dicts
+        with the factor, number of realizations, survival fraction, and
+        confidence interval of each step), and the budget spent:
+        "realizations", "events" (the total number of recorded events),
+        and "wall_time" in seconds.
+
+    Raises
+    ------
+    HyperContagionError
+        If `lower` is supercritical or no supercritical factor is found.
+    """
+    start_time = time.perf_counter()
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    seed_sequence = np.random.SeedSequence(seed)
+    workers = processes if processes is not None else os.cpu_count() or 1
+    report = {"evaluations": [], "realizations": 0, "events": 0}
+
+    def evaluate(scale, initial_states):
+        """Whether the factor is supercritical, or None if unresolved."""
+        scaled = {size: scale * rate for size, rate in tau.items()}
+        outcomes = []
+        while True:
+            seeds = seed_sequence.spawn(min_realizations)
+            batch_size = -(-min_realizations // workers)
+            tasks = [
+                (
+                    H,
+                    scaled,
+                    gamma,
+                    transmission_function,
+                    simulation,
+                    initial_states,
+                    rho,
+                    tmax,
+                    args,
+                    seeds[i : i + batch_size],
+                )
+                for i in range(0, min_realizations, batch_size)
+            ]
+            for output in _map(_run_threshold_realizations, tasks, processes, executor):
+                outcomes.extend(output)
+
+            survived = sum(final is not None for final, _ in outcomes)
+            low, high = _wilson_interval(survived, len(outcomes), z)
+            if low > survival or high < survival or len(outcomes) >= max_realizations:
+                break
+
+        report["realizations"] += len(outcomes)
+        report["events"] += sum(events for _, events in outcomes)
+        report["evaluations"].append(
+            {
+                "scale": scale,
+                "realizations": len(outcomes),
+                "survival": survived / len(outcomes),
+                "interval": (low, high),
+            }
+        )
+        states = [final for final, _ in outcomes if final is not None]
+        if low > survival:
+            return True, states
+        if high < survival:
+            return False, states
+        return None, states
+
+    # a single pool of workers for the whole search
+    executor = None
+    if processes != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=processes)
+
+    try:
+        # the quasi-stationary states of the closest supercritical factor
+        states = None
+        if lower > 0:
+            supercritical, _ = evaluate(lower, None)
+            if supercritical:
+                raise HyperContagionError("the lower factor is above the threshold")
+            if supercritical is None:
+                return _threshold_output(lower, tau, lower, lower, report, start_time)
+
+        if upper is None:
+            upper = max(2 * lower, 1)
+            for _ in range(32):
+                supercritical, states = evaluate(upper, None)
+                if supercritical is not False:
+                    break
+                lower, upper = upper, 2 * upper
+            else:
+                raise HyperContagionError(
+                    "no supercritical transmission rate was found"
+                )
+            if supercritical is None:
+                return _threshold_output(upper, tau, lower, upper, report, start_time)
+
+        while upper - lower > tol:
+            middle = (lower + upper) / 2
+            supercritical, new_states = evaluate(middle, states or None)
+            if supercritical is None:
+                return _threshold_output(middle, tau, lower, upper, report, start_time)
+            if supercritical:
+                upper, states = middle, new_states
+            else:
+                lower = middle
+
+        scale = (lower + upper) / 2
+        return _threshold_output(scale, tau, lower, upper, report, start_time)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _threshold_output(scale, tau, lower, upper, report, start_time):
+    """Complete the report of `epidemic_threshold`."""
+    report["tau"] = {size: scale * rate for size, rate in tau.items()}
+    report["bracket"] = (lower, upper)
+    report["wall_time"] = time.perf_counter() - start_time
+    return scale, report
+
+
+def _wilson_interval(successes, trials, z):
+    """The Wilson score interval of a binomial proportion."""
+    p = successes / trials
+    denominator = 1 + z**2 / trials
+    center = (p + z**2 / (2 * trials)) / denominator
+    half_width = (
+        z * np.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / denominator
+    )
+    return max(0.0, float(center - half_width)), min(1.0, float(center + half_width))
+
+
+class _InfectedSet(Observer):
+    """The set of infected nodes, which is never recorded."""
+
+    def __init__(self):
+        super().__init__("infected_set")
+
+    def initialize(self, H, status):
+        super().initialize(H, status)
+        self.infected = {n for n in H.nodes if status[n] == "I"}
+
+    def update(self, node, old_state, new_state, source):
+        if new_state == "I":
+            self.infected.add(node)
+        else:
+            self.infected.discard(node)
+
+    def record(self):
+        pass
+
+
+def _run_threshold_realizations(task):
+    """Worker for `epidemic_threshold`.
+
+    Parameters
+    ----------
+    task : tuple
+        H, tau, gamma, transmission function, simulation function, initial
+        states, rho, tmax, arguments, and seed sequences.
+
+    Returns
+    -------
+    list of tuples
+        for each realization, the final infected nodes if the epidemic
+        survived and None otherwise, and the number of recorded events.
+    """
+    (
+        H,
+        tau,
+        gamma,
+        transmission_function,
+        simulation,
+        initial_states,
+        rho,
+        tmax,
+        args,
+        seeds,
+    ) = task
+    output = []
+    # the state of `random` is restored when running in the caller's process
+    random_state = random.getstate()
+    try:
+        for seed_sequence in seeds:
+            _seed_python_random(seed_sequence)
+            if initial_states:
+                initial = {"initial_infecteds": random.choice(initial_states)}
+            else:
+                initial = {"rho": rho}
+            observer = _InfectedSet()
+            t = simulation(
+                H,
+                tau,
+                gamma,
+                transmission_function,
+                tmax=tmax,
+                observers=[observer],
+                **initial,
+                **args,
+            )[0]
+            final = list(observer.infected) if observer.infected else None
+            output.append((final, len(t) - 1))
+    finally:
+        random.setstate(random_state)
+    return output
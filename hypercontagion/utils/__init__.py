@@ -1,2 +1,4 @@
-from . import utilities
+from . import observers, temporal, utilities
+from .observers import *
+from .temporal import *
 from .utilities import *
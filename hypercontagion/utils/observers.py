@@ -0,0 +1,259 @@
+"""
+Observers that compute observables incrementally during a simulation.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from ..exception import HyperContagionError
+
+__all__ = [
+    "Observer",
+    "StateCounter",
+    "EdgeSizeStateCounter",
+    "ActiveEdgeCounter",
+]
+
+
+class Observer:
+    """
+    Base class for observables that are updated at every transition.
+
+    The engines call `initialize` once with the initial statuses, `update`
+    for every transition, and `record` every time they append a time to
+    their output, so that the recorded values are on the same time grid.
+    Subclasses implement `initialize`, `update`, and `value`.
+
+    Parameters
+    ==========
+    name : str
+        the key of the observable in the output of the engines.
+
+    Attributes
+    ==========
+    name : str
+        the key of the observable in the output of the engines.
+    values : list
+        the recorded values.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.values = []
+
+    def initialize(self, H, status):
+        """Set up the observable from the initial statuses.
+
+        Parameters
+        ----------
+        H : xgi.Hypergraph
+            The hypergraph on which the simulation occurs
+        status : dict
+            keys are node IDs and values are their statuses.
+        """
+        self.values = []
+
+    def update(self, node, old_state, new_state, source):
+        """Update the observable after a transition.
+
+        Parameters
+        ----------
+        node : hashable
+            the node ID
+        old_state : str
+            the state before the transition
+        new_state : str
+            the state after the transition
+        source : hashable
+            the ID of the edge that caused the transition, if any.
+        """
+        raise NotImplementedError
+
+    def value(self):
+        """The current value of the observable."""
+        raise NotImplementedError
+
+    def record(self):
+        """Record the current value."""
+        self.values.append(self.value())
+
+    def result(self):
+        """The recorded values as an array with one row per recorded time."""
+        return np.array(self.values)
+
+
+class StateCounter(Observer):
+    """
+    The number of nodes in a given state in each group of nodes,
+    e.g., the prevalence in every community.
+
+    Parameters
+    ==========
+    groups : dict or hashable
+        Either a dict with node IDs as keys and group labels as values or
+        the name of a node attribute that holds the group label.
+    state : str, default: "I"
+        the state to count.
+    name : str, default: "state_counter"
+        the key of the observable in the output of the engines.
+
+    Attributes
+    ==========
+    labels : list
+        the group labels, in the order of the columns of the result.
+    """
+
+    def __init__(self, groups, state="I", name="state_counter"):
+        super().__init__(name)
+        self.groups = groups
+        self.state = state
+
+    def initialize(self, H, status):
+        super().initialize(H, status)
+        if isinstance(self.groups, dict):
+            group = {n: self.groups[n] for n in H.nodes}
+        else:
+            group = {n: H.nodes[n][self.groups] for n in H.nodes}
+        self.labels = sorted(set(group.values()), key=str)
+        index = {g: i for i, g in enumerate(self.labels)}
+        self._index = {n: index[g] for n, g in group.items()}
+        self._counts = np.zeros(len(self.labels), dtype=int)
+        for n in H.nodes:
+            if status[n] == self.state:
+                self._counts[self._index[n]] += 1
+
+    def update(self, node, old_state, new_state, source):
+        if new_state == self.state:
+            self._counts[self._index[node]] += 1
+        elif old_state == self.state:
+            self._counts[self._index[node]] -= 1
+
+    def value(self):
+        return self._counts.copy()
+
+
+class EdgeSizeStateCounter(Observer):
+    """
+    The number of memberships of nodes in a given state in the
+    hyperedges of each size, e.g., the prevalence per edge size.
+
+    Parameters
+    ==========
+    state : str, default: "I"
+        the state to count.
+    name : str, default: "edge_size_state_counter"
+        the key of the observable in the output of the engines.
+
+    Attributes
+    ==========
+    sizes : list
+        the edge sizes, in the order of the columns of the result.
+    """
+
+    def __init__(self, state="I", name="edge_size_state_counter"):
+        super().__init__(name)
+        self.state = state
+
+    def initialize(self, H, status):
+        super().initialize(H, status)
+        members = H.edges.members(dtype=dict)
+        self.sizes = sorted({len(e) for e in members.values()})
+        index = {s: i for i, s in enumerate(self.sizes)}
+        # the number of memberships of every node in edges of each size
+        self._memberships = dict()
+        for n, edge_ids in H.nodes.memberships().items():
+            c = Counter(index[len(members[e])] for e in edge_ids)
+            self._memberships[n] = (np.array(list(c)), np.array(list(c.values())))
+        self._counts = np.zeros(len(self.sizes), dtype=int)
+        for n in H.nodes:
+            if status[n] == self.state:
+                self._counts[self._memberships[n][0]] += self._memberships[n][1]
+
+    def update(self, node, old_state, new_state, source):
+        if new_state == self.state:
+            self._counts[self._memberships[node][0]] += self._memberships[node][1]
+        elif old_state == self.state:
+            self._counts[self._memberships[node][0]] -= self._memberships[node][1]
+
+    def value(self):
+        return self._counts.copy()
+
+
+class ActiveEdgeCounter(Observer):
+    """
+    The number of hyperedges with at least one member in a given state.
+
+    Parameters
+    ==========
+    state : str, default: "I"
+        the state of the members.
+    name : str, default: "active_edges"
+        the key of the observable in the output of the engines.
+    """
+
+    def __init__(self, state="I", name="active_edges"):
+        super().__init__(name)
+        self.state = state
+
+    def initialize(self, H, status):
+        super().initialize(H, status)
+        self._memberships = H.nodes.memberships()
+        self._edge_counts = Counter()
+        for n in H.nodes:
+            if status[n] == self.state:
+                for e in self._memberships[n]:
+                    self._edge_counts[e] += 1
+        self._active = len(self._edge_counts)
+
+    def update(self, node, old_state, new_state, source):
+        if new_state == self.state:
+            for e in self._memberships[node]:
+                self._edge_counts[e] += 1
+                if self._edge_counts[e] == 1:
+                    self._active += 1
+        elif old_state == self.state:
+            for e in self._memberships[node]:
+                self._edge_counts[e] -= 1
+                if self._edge_counts[e] == 0:
+                    del self._edge_counts[e]
+                    self._active -= 1
+
+    def value(self):
+        return self._active
+
+
+def _initialize_observers(observers, H, status):
+    """Initialize the observers and record their initial values."""
+    if observers is None:
+        return None
+    names = [o.name for o in observers]
+    if len(set(names)) != len(names):
+        raise HyperContagionError("observers must have unique names")
+    for o in observers:
+        o.initialize(H, status)
+        o.record()
+    return observers
+
+
+def _update_observers(observers, node, old_state, new_state, source, record=True):
+    """Update the observers after a transition and record their values."""
+    if observers:
+        for o in observers:
+            o.update(node, old_state, new_state, source)
+            if record:
+                o.record()
+
+
+def _record_observers(observers):
+    """Record the values of the observers."""
+    if observers:
+        for o in observers:
+            o.record()
+
+
+def _observer_output(observers, start=0):
+    """The recorded values of the observers, keyed by name."""
+    if observers is None:
+        return None
+    return {o.name: o.result()[start:] for o in observers}
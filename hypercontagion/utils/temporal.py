@@ -0,0 +1,155 @@
+"""
+Temporal hypergraphs, whose hyperedges are only active during time intervals.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+from ..exception import HyperContagionError
+
+__all__ = ["TemporalHypergraph"]
+
+
+class TemporalHypergraph:
+    """
+    A hypergraph whose hyperedges are active during time intervals.
+
+    Each interval is stored as its own hyperedge and the hyperedges are
+    sorted by their activation times, so that the simulation engines can
+    activate them in order without ever building static snapshots.
+
+    Parameters
+    ==========
+    intervals : iterable of tuples, default: None
+        (members, start, end) tuples, where `members` is an iterable of
+        node IDs and the hyperedge is active from `start` (included) to
+        `end` (excluded).
+    nodes : iterable, default: None
+        node IDs, including those that are never in an active hyperedge.
+
+    Attributes
+    ==========
+    nodes : list
+        the node IDs.
+    members : list of tuples
+        the members of each hyperedge, in order of activation time.
+    starts : numpy array
+        the sorted activation times.
+    ends : numpy array
+        the deactivation times, in the same order.
+
+    Raises
+    ======
+    HyperContagionError
+        If an interval does not end after it starts.
+    """
+
+    def __init__(self, intervals=None, nodes=None):
+        members = []
+        starts = []
+        ends = []
+        for edge, start, end in intervals if intervals is not None else []:
+            if not end > start:
+                raise HyperContagionError("intervals must end after they start")
+            members.append(tuple(edge))
+            starts.append(start)
+            ends.append(end)
+
+        order = np.argsort(starts, kind="stable")
+        self.members = [members[i] for i in order]
+        self.starts = np.array(starts, dtype=float)[order]
+        self.ends = np.array(ends, dtype=float)[order]
+
+        self.nodes = list(dict.fromkeys(nodes if nodes is not None else []))
+        seen = set(self.nodes)
+        for edge in self.members:
+            for n in edge:
+                if n not in seen:
+                    seen.add(n)
+                    self.nodes.append(n)
+
+    @classmethod
+    def from_contacts(cls, contacts, duration=1, nodes=None):
+        """Create a temporal hypergraph from timestamped group interactions.
+
+        Each contact is active for `duration` and the contacts of the same
+        group that overlap or touch are merged into a single interval.
+
+        Parameters
+        ----------
+        contacts : iterable of tuples
+            (time, members) tuples.
+        duration : float, default: 1
+            the duration of each contact.
+        nodes : iterable, default: None
+            node IDs, including those that are never in a contact.
+
+        Returns
+        -------
+        TemporalHypergraph
+            the temporal hypergraph.
+        """
+        times = defaultdict(list)
+        for t, edge in contacts:
+            times[tuple(sorted(edge))].append(t)
+
+        intervals = []
+        for edge, edge_times in times.items():
+            edge_times.sort()
+            start = edge_times[0]
+            end = start + duration
+            for t in edge_times[1:]:
+                if t > end:
+                    intervals.append((edge, start, end))
+                    start = t
+                end = t + duration
+            intervals.append((edge, start, end))
+        return cls(intervals, nodes)
+
+    @property
+    def num_nodes(self):
+        """The number of nodes."""
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        """The number of hyperedges, i.e., of activation intervals."""
+        return len(self.members)
+
+    def edges_at(self, t):
+        """The IDs of the hyperedges active at a given time.
+
+        Parameters
+        ----------
+        t : float
+            the time.
+
+        Returns
+        -------
+        numpy array
+            the indices of the active hyperedges in `members`.
+        """
+        started = np.searchsorted(self.starts, t, side="right")
+        return np.flatnonzero(self.ends[:started] > t)
+
+    def snapshot(self, t):
+        """The static hypergraph of the hyperedges active at a given time.
+
+        Parameters
+        ----------
+        t : float
+            the time.
+
+        Returns
+        -------
+        xgi.Hypergraph
+            the hypergraph with all the nodes and the active hyperedges,
+            whose IDs are their indices in `members`.
+        """
+        import xgi
+
+        H = xgi.Hypergraph()
+        H.add_nodes_from(self.nodes)
+        H.add_edges_from({int(e): self.members[e] for e in self.edges_at(t)})
+        return H
@@ -2,16 +2,28 @@
 Contains useful classes and functions for use in the hypercontagion library.
 """
 
+import functools
 import heapq
+import math
+import os
+import pickle
 import random
+import time
 from collections import Counter, defaultdict
 
 import numpy as np
 
+from ..exception import HyperContagionError
+from .observers import _update_observers
+
+_CHECKPOINT_VERSION = 1
+
 __all__ = [
     "EventQueue",
     "MockSamplableSet",
     "SamplingDict",
+    "SimulationStats",
+    "node_edge_incidence",
     "_process_trans_SIR_",
     "_process_rec_SIR_",
     "_process_trans_SIS_",
@@ -60,6 +72,16 @@ class EventQueue:
             heapq.heappush(self._Q_, (time, self.counter, function, args))
             self.counter += 1
 
+    def next_time(self):
+        """The time of the next event in the queue
+
+        Returns
+        -------
+        float
+            the time of the next event, or infinity if the queue is empty.
+        """
+        return self._Q_[0][0] if self._Q_ else float("Inf")
+
     def pop_and_run(self):
         """Pops the next event off the queue and performs the function"""
         t, counter, function, args = heapq.heappop(self._Q_)
@@ -91,11 +113,15 @@ class SamplingDict:
     This will allow selecting a random element uniformly, and then use
     rejection sampling to make sure it's been selected with the appropriate
     weight.
+
+    If a `SimulationStats` object is given, the number of insertions,
+    removals, and rejection-sampling attempts are counted in it.
     """
 
-    def __init__(self, weighted=False):
+    def __init__(self, weighted=False, stats=None):
         self.item_to_position = {}
         self.items = []
+        self.stats = stats
 
         self.weighted = weighted
         if self.weighted:
@@ -196,6 +222,8 @@ class SamplingDict:
 
         if item in self:  # we've already got it, do nothing else
             return
+        if self.stats is not None:
+            self.stats.is_link_inserts += 1
         self.items.append(item)
         self.item_to_position[item] = len(self.items) - 1
 
@@ -210,6 +238,8 @@ class SamplingDict:
         position = self.item_to_position.pop(
             choice
         )  # why don't we pop off the last item and put it in the choice index?
+        if self.stats is not None:
+            self.stats.is_link_removes += 1
         last_item = self.items.pop()
         if position != len(self.items):
             self.items[position] = last_item
@@ -232,12 +262,16 @@ class SamplingDict:
         sampling to choose a random node until it succeeds"""
         if self.weighted:
             while True:
+                if self.stats is not None:
+                    self.stats.rejection_attempts += 1
                 choice = random.choice(self.items)
                 if random.random() < self.weight[choice] / self.max_weight:
                     break
             return choice
 
         else:
+            if self.stats is not None:
+                self.stats.rejection_attempts += 1
             return random.choice(self.items)
 
     def random_removal(self):
@@ -257,6 +291,140 @@ class SamplingDict:
         """Update the sum of weights."""
         self._total_weight = sum(self.weight[item] for item in self.items)
 
+    def to_data(self):
+        """The contents of the dict as plain data, e.g., for checkpoints.
+
+        Returns
+        -------
+        dict
+            the items in sampling order and, if weighted, their weights.
+        """
+        data = {"weighted": self.weighted, "items": list(self.items)}
+        if self.weighted:
+            data["weight"] = dict(self.weight)
+            data["max_weight"] = self.max_weight
+            data["max_weight_count"] = self.max_weight_count
+            data["total_weight"] = self._total_weight
+        return data
+
+    @classmethod
+    def from_data(cls, data, stats=None):
+        """Create a sampling dict from the output of `to_data`.
+
+        Parameters
+        ----------
+        data : dict
+            the output of `to_data`.
+        stats : SimulationStats, default: None
+            counters to update.
+
+        Returns
+        -------
+        SamplingDict
+            a sampling dict that samples exactly like the original one.
+        """
+        sampling_dict = cls(weighted=data["weighted"], stats=stats)
+        sampling_dict.items = list(data["items"])
+        sampling_dict.item_to_position = {
+            item: i for i, item in enumerate(sampling_dict.items)
+        }
+        if sampling_dict.weighted:
+            sampling_dict.weight.update(data["weight"])
+            sampling_dict.max_weight = data["max_weight"]
+            sampling_dict.max_weight_count = data["max_weight_count"]
+            sampling_dict._total_weight = data["total_weight"]
+        return sampling_dict
+
+
+class SimulationStats:
+    """
+    Counters describing the work done by a simulation engine.
+
+    The engines only update these counters when asked to with
+    `return_stats=True`, so there is no cost otherwise.
+
+    Attributes
+    ==========
+    events : collections.Counter
+        number of events keyed by (event type, edge size), where the event
+        type is "infection" or "recovery" and the edge size is that of the
+        edge that caused the infection (None for recoveries).
+    rejection_attempts : int
+        number of draws in the rejection sampling of `SamplingDict.choose_random`
+        for the IS links.
+    channel_attempts : int
+        number of draws in the rejection sampling of the event type
+        in the Gillespie algorithm.
+    transmission_calls : int
+        number of calls to the transmission function.
+    transmission_time : float
+        cumulative time in seconds spent in the transmission function.
+    is_link_inserts : int
+        number of IS links inserted.
+    is_link_removes : int
+        number of IS links removed.
+    max_queue_length : int
+        the largest number of entries in the event queue.
+    queue_pops : int
+        the number of entries popped from the event queue.
+    dead_events : int
+        the number of popped entries that did not cause a transition,
+        e.g., transmissions to nodes that were already infected.
+    """
+
+    def __init__(self):
+        self.events = Counter()
+        self.rejection_attempts = 0
+        self.channel_attempts = 0
+        self.transmission_calls = 0
+        self.transmission_time = 0.0
+        self.is_link_inserts = 0
+        self.is_link_removes = 0
+        self.max_queue_length = 0
+        self.queue_pops = 0
+        self.dead_events = 0
+
+    @property
+    def dead_event_ratio(self):
+        """The fraction of the popped queue entries that were dead."""
+        return self.dead_events / self.queue_pops if self.queue_pops else 0.0
+
+    def timed(self, function):
+        """Wrap a transmission function to count its calls and time.
+
+        Parameters
+        ----------
+        function : callable
+            the transmission function
+
+        Returns
+        -------
+        callable
+            the wrapped function, with the attributes of `function`
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.transmission_calls += 1
+                self.transmission_time += time.perf_counter() - start
+
+        return wrapper
+
+    def to_dict(self):
+        """The counters as a dict."""
+        d = dict(vars(self))
+        d["events"] = dict(self.events)
+        d["dead_event_ratio"] = self.dead_event_ratio
+        return d
+
+    def __repr__(self):
+        counters = ", ".join(f"{k}={v}" for k, v in self.to_dict().items())
+        return f"SimulationStats({counters})"
+
 
 def choice(arr, p):
     """
@@ -411,6 +579,212 @@ class MockSamplableSet:
         pass
 
 
+def node_edge_incidence(H, nodes=None, edges=None):
+    """The node-edge incidence matrix of a hypergraph in CSR format.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph of interest
+    nodes : iterable, default: None
+        The node IDs corresponding to the rows. If None,
+        the order of `H.nodes` is used.
+    edges : iterable, default: None
+        The edge IDs corresponding to the columns. If None,
+        the order of `H.edges` is used.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        N x E matrix where entry (i, j) is 1 if the ith node
+        is a member of the jth edge and 0 otherwise.
+    """
+    from scipy.sparse import csr_matrix
+
+    if nodes is None:
+        nodes = H.nodes
+    if edges is None:
+        edges = H.edges
+    node_index = {n: i for i, n in enumerate(nodes)}
+    edges = list(edges)
+    members = H.edges.members(dtype=dict)
+
+    rows = []
+    cols = []
+    for j, edge_id in enumerate(edges):
+        for n in members[edge_id]:
+            rows.append(node_index[n])
+            cols.append(j)
+    return csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(node_index), len(edges))
+    )
+
+
+def _weights(view, attribute):
+    """The weights of the nodes or edges from one of their attributes.
+
+    Parameters
+    ----------
+    view : xgi.NodeView or xgi.EdgeView
+        `H.nodes` or `H.edges`.
+    attribute : hashable or None
+        The attribute that holds the weights. If None, all the weights are 1.
+
+    Returns
+    -------
+    numpy.ndarray
+        the weights in the order of `view`, where the nodes or edges
+        without the attribute have weight 1.
+
+    Raises
+    ------
+    HyperContagionError
+        If a weight is not a finite, non-negative number.
+    """
+    if attribute is None:
+        return np.ones(len(view))
+    values = view.attrs(attribute, missing=1).asdict()
+    try:
+        weights = np.array([values[i] for i in view], dtype=float)
+    except (TypeError, ValueError):
+        raise HyperContagionError(f"the weights in {attribute!r} must be numbers")
+    if not np.all(np.isfinite(weights)) or np.any(weights < 0):
+        raise HyperContagionError(
+            f"the weights in {attribute!r} must be finite and non-negative"
+        )
+    return weights
+
+
+def _recovery_rates(H, gamma, recovery_weight=None):
+    """The recovery rate of every node, i.e., `gamma` times its weight.
+
+    Returns
+    -------
+    dict
+        keys are node IDs and values are recovery rates.
+    """
+    weights = _weights(H.nodes, recovery_weight)
+    return dict(zip(H.nodes, (gamma * weights).tolist()))
+
+
+def _transmission_rates(H, tau, transmission_weight=None):
+    """The transmission rate of every edge, i.e., the rate of its size times its weight.
+
+    Returns
+    -------
+    dict
+        keys are edge IDs and values are transmission rates.
+
+    Raises
+    ------
+    HyperContagionError
+        If `tau` has no rate for the size of an edge.
+    """
+    members = H.edges.members(dtype=dict)
+    weights = _weights(H.edges, transmission_weight).tolist()
+    rates = dict()
+    for edge_id, weight in zip(H.edges, weights):
+        size = len(members[edge_id])
+        if size not in tau:
+            raise HyperContagionError(f"tau has no rate for edges of size {size}")
+        rates[edge_id] = tau[size] * weight
+    return rates
+
+
+def _IS_link_groups(transmission_rates, weighted, stats=None):
+    """Group the IS links of the Gillespie engines by transmission rate.
+
+    Without weights, there is an unweighted group per rate, e.g., per edge
+    size. Otherwise, the links are weighted by their rates and grouped by
+    the binary exponent of the rate, so that the rates in a group differ by
+    less than a factor of 2 and the rejection sampling within a group
+    accepts at least half of the draws. Edges with rate 0 have no group.
+
+    Parameters
+    ----------
+    transmission_rates : dict
+        the output of `_transmission_rates`.
+    weighted : bool
+        whether the rates of the edges of the same size can differ.
+    stats : SimulationStats, default: None
+        the counters of the sampling dicts.
+
+    Returns
+    -------
+    groups : dict
+        the group of every edge with a positive rate.
+    IS_links : dict
+        an empty SamplingDict for every group, in sorted order.
+    scales : dict
+        the factor of the total weight of every group in its total rate.
+    """
+    positive = {e: rate for e, rate in transmission_rates.items() if rate > 0}
+    if weighted:
+        groups = {e: math.frexp(rate)[1] for e, rate in positive.items()}
+    else:
+        groups = positive
+    keys = sorted(set(groups.values()))
+    IS_links = {key: SamplingDict(weighted=weighted, stats=stats) for key in keys}
+    scales = {key: 1 if weighted else key for key in keys}
+    return groups, IS_links, scales
+
+
+def _spawn_seeds(seed, n):
+    """Independent random streams for parallel realizations.
+
+    Parameters
+    ----------
+    seed : int or None
+        The root seed. If None, fresh entropy is used.
+    n : int
+        The number of streams.
+
+    Returns
+    -------
+    list of numpy.random.SeedSequence
+        statistically independent seed sequences.
+    """
+    return np.random.SeedSequence(seed).spawn(n)
+
+
+def _seed_python_random(seed_sequence):
+    """Seed the `random` module from a numpy seed sequence."""
+    random.seed(int.from_bytes(seed_sequence.generate_state(4).tobytes(), "little"))
+
+
+def _map(function, tasks, processes=None, executor=None):
+    """Apply a function to each task, possibly in a process pool.
+
+    Parameters
+    ----------
+    function : callable
+        a module-level (picklable) function of a single argument.
+    tasks : iterable
+        the arguments.
+    processes : int, default: None
+        The number of worker processes. If 1, the tasks are run
+        serially in this process. If None, the number of CPUs is used.
+    executor : concurrent.futures.Executor, default: None
+        A pool that is reused across calls, in which case `processes`
+        is ignored. If None, a pool is created for this call.
+
+    Returns
+    -------
+    list
+        the results in the order of the tasks.
+    """
+    if executor is not None:
+        return list(executor.map(function, tasks))
+
+    if processes == 1:
+        return [function(task) for task in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(function, tasks))
+
+
 def _process_trans_SIR_(
     t,
     times,
@@ -428,6 +802,9 @@ def _process_trans_SIR_(
     rec_time,
     pred_inf_time,
     events,
+    observers=None,
+    recovery_rates=None,
+    transmission_rates=None,
 ):
 
     if status[target] == "S":  # nothing happens if already infected.
@@ -445,20 +822,28 @@ def _process_trans_SIR_(
         S.append(S[-1] - 1)  # one less susceptible
         I.append(I[-1] + 1)  # one more infected
         R.append(R[-1])  # no change to recovered
+        _update_observers(observers, target, "S", "I", source)
 
-        rec_time[target] = t + rec_delay(gamma)
+        if recovery_rates is not None:
+            rec_time[target] = t + rec_delay(recovery_rates[target])
+        else:
+            rec_time[target] = t + rec_delay(gamma)
         if rec_time[target] < Q.tmax:
             Q.add(
                 rec_time[target],
                 _process_rec_SIR_,
-                args=(times, S, I, R, status, target, events),
+                args=(times, S, I, R, status, target, events, observers),
             )
 
         for edge_id in H.nodes.memberships(target):
             edge = H.edges.members(edge_id)
+            if transmission_rates is not None:
+                rate = transmission_rates[edge_id]
+            else:
+                rate = tau[len(edge)]
             for nbr in edge:
                 if status[nbr] == "S":
-                    inf_time = t + trans_delay(tau, edge)
+                    inf_time = t + trans_delay(rate)
 
                     # create statuses at the time requested
                     temp_status = defaultdict(lambda: "R")
@@ -489,12 +874,15 @@ def _process_trans_SIR_(
                                     rec_time,
                                     pred_inf_time,
                                     events,
+                                    observers,
+                                    recovery_rates,
+                                    transmission_rates,
                                 ),
                             )
                             pred_inf_time[nbr] = inf_time
 
 
-def _process_rec_SIR_(t, times, S, I, R, status, node, events):
+def _process_rec_SIR_(t, times, S, I, R, status, node, events, observers=None):
     times.append(t)
     events.append(
         {"time": t, "source": None, "target": node, "old_state": "I", "new_state": "R"}
@@ -503,6 +891,7 @@ def _process_rec_SIR_(t, times, S, I, R, status, node, events):
     I.append(I[-1] - 1)  # one less infected
     R.append(R[-1] + 1)  # one more recovered
     status[node] = "R"
+    _update_observers(observers, node, "I", "R", None)
 
 
 def _process_trans_SIS_(
@@ -521,6 +910,9 @@ def _process_trans_SIS_(
     rec_time,
     pred_inf_time,
     events,
+    observers=None,
+    recovery_rates=None,
+    transmission_rates=None,
 ):
 
     if status[target] == "S":
@@ -537,21 +929,29 @@ def _process_trans_SIS_(
         I.append(I[-1] + 1)  # one more infected
         S.append(S[-1] - 1)  # one less susceptible
         times.append(t)
+        _update_observers(observers, target, "S", "I", source)
 
-        rec_time[target] = t + rec_delay(gamma)
+        if recovery_rates is not None:
+            rec_time[target] = t + rec_delay(recovery_rates[target])
+        else:
+            rec_time[target] = t + rec_delay(gamma)
 
         if rec_time[target] < Q.tmax:
             Q.add(
                 rec_time[target],
                 _process_rec_SIS_,
-                args=(times, S, I, status, target, events),
+                args=(times, S, I, status, target, events, observers),
             )
 
         for edge_id in H.nodes.memberships(target):
             edge = H.edges.members(edge_id)
+            if transmission_rates is not None:
+                rate = transmission_rates[edge_id]
+            else:
+                rate = tau[len(edge)]
             for nbr in edge:
                 if status[nbr] == "S":
-                    inf_time = t + trans_delay(tau, edge)
+                    inf_time = t + trans_delay(rate)
 
                     # create statuses at the time requested
                     temp_status = defaultdict(lambda: "S")
@@ -579,12 +979,15 @@ def _process_trans_SIS_(
                                     rec_time,
                                     pred_inf_time,
                                     events,
+                                    observers,
+                                    recovery_rates,
+                                    transmission_rates,
                                 ),
                             )
                             pred_inf_time[nbr] = inf_time
 
 
-def _process_rec_SIS_(t, times, S, I, status, node, events):
+def _process_rec_SIS_(t, times, S, I, status, node, events, observers=None):
     times.append(t)
     events.append(
         {"time": t, "source": None, "target": node, "old_state": "I", "new_state": "S"}
@@ -592,17 +995,111 @@ def _process_rec_SIS_(t, times, S, I, status, node, events):
     S.append(S[-1] + 1)  # one more susceptible
     I.append(I[-1] - 1)  # one less infected
     status[node] = "S"
+    _update_observers(observers, node, "I", "S", None)
+
+
+def _queue_to_data_SIS_(Q):
+    """The pending events of an event-driven SIS simulation as plain data.
+
+    Each event is stored as ``(t, counter, kind, source, target)`` where
+    `kind` is "trans" or "rec" so that the queue can be rebuilt with
+    `_queue_from_data_SIS_`.
+    """
+    entries = []
+    for t, counter, function, args in Q._Q_:
+        if function is _process_trans_SIS_:
+            entries.append((t, counter, "trans", args[9], args[10]))
+        else:
+            entries.append((t, counter, "rec", None, args[4]))
+    return {"entries": entries, "counter": Q.counter}
+
+
+def _queue_from_data_SIS_(
+    data,
+    Q,
+    times,
+    S,
+    I,
+    H,
+    status,
+    transmission_function,
+    gamma,
+    tau,
+    rec_time,
+    pred_inf_time,
+    events,
+    observers=None,
+    recovery_rates=None,
+    transmission_rates=None,
+):
+    """Add the events stored by `_queue_to_data_SIS_` to an event queue."""
+    for t, counter, kind, source, target in data["entries"]:
+        if t >= Q.tmax:
+            continue
+        if kind == "trans":
+            function = _process_trans_SIS_
+            args = (
+                times,
+                S,
+                I,
+                Q,
+                H,
+                status,
+                transmission_function,
+                gamma,
+                tau,
+                source,
+                target,
+                rec_time,
+                pred_inf_time,
+                events,
+                observers,
+                recovery_rates,
+                transmission_rates,
+            )
+        else:
+            function = _process_rec_SIS_
+            args = (times, S, I, status, target, events, observers)
+        # keep the original tie-breakers so that the order is unchanged
+        heapq.heappush(Q._Q_, (t, counter, function, args))
+    Q.counter = data["counter"]
+
+
+def _save_checkpoint(path, engine, state):
+    """Write the state of a simulation to a binary checkpoint file.
+
+    The file is replaced atomically so that a crash while writing
+    never corrupts an existing checkpoint.
+    """
+    state = dict(state, engine=engine, version=_CHECKPOINT_VERSION)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, path)
+
+
+def _load_checkpoint(path, engine):
+    """Read the state of a simulation from a checkpoint file.
+
+    Raises
+    ------
+    HyperContagionError
+        If the checkpoint was written by another engine or version.
+    """
+    with open(path, "rb") as file:
+        state = pickle.load(file)
+    if state.get("engine") != engine:
+        raise HyperContagionError(
+            f"the checkpoint was written by {state.get('engine')}, not {engine}"
+        )
+    if state.get("version") != _CHECKPOINT_VERSION:
+        raise HyperContagionError("the checkpoint version is not supported")
+    return state
 
 
 def rec_delay(rate):
-    try:
-        return random.expovariate(rate)
-    except:
-        return float("Inf")
+    return random.expovariate(rate) if rate > 0 else float("Inf")
 
 
-def trans_delay(tau, edge):
-    try:
-        return random.expovariate(tau[len(edge)])
-    except ZeroDivisionError:
-        return np.inf
+def trans_delay(rate):
+    return random.expovariate(rate) if rate > 0 else float("Inf")
@@ -1,10 +1,29 @@
-from collections import defaultdict
+import io
+import itertools
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
 import matplotlib.pyplot as plt
+import numpy as np
 import xgi
 from celluloid import Camera
+from matplotlib.animation import FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
 
-__all__ = ["contagion_animation"]
+from ..exception import HyperContagionError
+
+__all__ = [
+    "contagion_animation",
+    "stream_contagion_animation",
+    "get_event_columns",
+    "get_events_in_equal_time_intervals",
+    "get_states_in_equal_time_intervals",
+    "render_frames",
+]
 
 
 def contagion_animation(
@@ -39,33 +58,28 @@ def contagion_animation(
         The resulting animation
     """
 
-    node_state = defaultdict(lambda: "S")
-
     camera = Camera(fig)
 
-    event_interval_list = get_events_in_equal_time_intervals(transition_events, dt)
-    for interval_time in event_interval_list:
-        events = event_interval_list[interval_time]
-
-        edge_state = defaultdict(lambda: "OFF")
-
-        # update edge and node states
-        for event in events:
-            status = event["new_state"]
-            source = event["source"]
-            target = event["target"]
-            if source is not None:
-                edge_state[source] = status
-            # update node states
-            node_state[target] = status
-
-        node_fc = {n: node_colors[node_state[n]] for n in H.nodes}
-        dyad_color = {
-            e: edge_colors[edge_state[e]] for e in H.edges.filterby("size", 2)
-        }
-        edge_fc = {
-            e: edge_colors[edge_state[e]] for e in H.edges.filterby("size", 2, "geq")
-        }
+    nodes = list(H.nodes)
+    edges = list(H.edges)
+    dyads = list(H.edges.filterby("size", 2))
+    hyperedges = list(H.edges.filterby("size", 2, "geq"))
+    edge_index = {e: i for i, e in enumerate(edges)}
+    dyads = (dyads, [edge_index[e] for e in dyads])
+    hyperedges = (hyperedges, [edge_index[e] for e in hyperedges])
+
+    _, node_states, edge_states, labels = get_states_in_equal_time_intervals(
+        H, transition_events, dt
+    )
+    node_palette = np.array(_colors_by_label(labels, node_colors), dtype=object)
+    edge_palette = np.array(_colors_by_label(labels, edge_colors), dtype=object)
+
+    for frame in range(len(node_states)):
+        node_fc = dict(zip(nodes, node_palette[node_states[frame]]))
+        dyad_color = dict(zip(dyads[0], edge_palette[edge_states[frame, dyads[1]]]))
+        edge_fc = dict(
+            zip(hyperedges[0], edge_palette[edge_states[frame, hyperedges[1]]])
+        )
 
         # draw hypergraph
         xgi.draw(
@@ -77,13 +91,410 @@ def contagion_animation(
     return camera.animate(interval=1000 / fps)
 
 
+def stream_contagion_animation(
+    fig,
+    H,
+    transition_events,
+    pos,
+    node_colors,
+    edge_colors,
+    dt=1,
+    fps=1,
+    filename=None,
+    writer=None,
+    skip_unchanged=True,
+    node_size=50,
+    node_ec="black",
+    dyad_lw=1.5,
+    edge_alpha=0.4,
+):
+    """Generate an animation of a contagion process by updating artist colors.
+
+    Unlike `contagion_animation`, the hypergraph is drawn only once into
+    matplotlib collections and every frame only updates their color arrays,
+    so the memory does not grow with the number of frames. When a filename
+    is given, the frames are streamed to the writer as they are rendered.
+
+    Parameters
+    ----------
+    fig : figure handle
+        The figure to plot onto
+    H : xgi.Hypergraph
+        The hypergraph on which the simulation occurs
+    transition_events : list of dict or dict of arrays
+        The output of the epidemic simulation functions with
+        `return_event_data=True` or the corresponding columnar event log.
+    pos : dict of list
+        a dict with node IDs as keys and [x, y] coordinates as values
+    node_colors : dict of str or tuple
+        a dict with state values as keys and colors as values.
+    edge_colors : dict of str or tuple
+        a dict with state values as keys and colors as values.
+        It must include the "OFF" state.
+    dt : float > 0, default: 1
+        the timestep at which to take snapshots of the system states
+    fps : int, default: 1
+        frames per second in the animation.
+    filename : str, default: None
+        If not None, the animation is saved to this file.
+    writer : matplotlib.animation.MovieWriter or str, default: None
+        The writer used to save the animation. If None, the
+        default matplotlib writer is used.
+    skip_unchanged : bool, default: True
+        Whether to skip the frames in which no state changes.
+    node_size : float, default: 50
+        the marker size of the nodes in points^2.
+    node_ec : str or tuple, default: "black"
+        the color of the node borders.
+    dyad_lw : float, default: 1.5
+        the width of the dyads.
+    edge_alpha : float, default: 0.4
+        the transparency of the hyperedges.
+
+    Returns
+    -------
+    matplotlib.animation.FuncAnimation
+        The resulting animation
+    """
+    _, node_states, edge_states, labels = get_states_in_equal_time_intervals(
+        H, transition_events, dt
+    )
+    frames = np.arange(len(node_states))
+    if skip_unchanged and len(frames) > 1:
+        changed = np.any(node_states[1:] != node_states[:-1], axis=1) | np.any(
+            edge_states[1:] != edge_states[:-1], axis=1
+        )
+        frames = np.concatenate([[0], frames[1:][changed]])
+
+    ax = fig.gca()
+    artists = _draw_collections(ax, H, pos, node_size, node_ec, dyad_lw, edge_alpha)
+    palettes = (
+        _get_palette(labels, node_colors),
+        _get_palette(labels, edge_colors),
+        _get_palette(labels, edge_colors, edge_alpha),
+    )
+
+    def update(frame):
+        return _update_collections(
+            artists, palettes, node_states[frame], edge_states[frame]
+        )
+
+    animation = FuncAnimation(
+        fig,
+        update,
+        frames=frames,
+        interval=1000 / fps,
+        cache_frame_data=False,
+    )
+    if filename is not None:
+        animation.save(filename, writer=writer, fps=fps)
+    return animation
+
+
+def render_frames(
+    H,
+    node_states,
+    edge_states,
+    labels,
+    pos,
+    node_colors,
+    edge_colors,
+    directory=None,
+    filename=None,
+    fps=1,
+    processes=None,
+    figsize=(6.4, 4.8),
+    dpi=100,
+    node_size=50,
+    node_ec="black",
+    dyad_lw=1.5,
+    edge_alpha=0.4,
+    encoder="ffmpeg",
+    encoder_args=("-pix_fmt", "yuv420p"),
+):
+    """Render animation frames offline in a process pool.
+
+    Each worker draws the hypergraph once on its own Agg canvas and then
+    renders the frames it is given by updating the colors. The frames are
+    either written as numbered PNG files or piped, in order, to a video
+    encoder.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which the simulation occurs
+    node_states : numpy array
+        T x N array of node state codes, e.g., from
+        `get_states_in_equal_time_intervals`.
+    edge_states : numpy array
+        T x E array of edge state codes.
+    labels : numpy array
+        the state label of each code.
+    pos : dict of list
+        a dict with node IDs as keys and [x, y] coordinates as values
+    node_colors : dict of str or tuple
+        a dict with state values as keys and colors as values.
+    edge_colors : dict of str or tuple
+        a dict with state values as keys and colors as values.
+    directory : str, default: None
+        If not None, the frames are saved as "frame_000000.png",
+        "frame_000001.png", etc. in this directory.
+    filename : str, default: None
+        If not None, the frames are piped to the encoder, which
+        writes the video to this file.
+    fps : int, default: 1
+        frames per second in the video.
+    processes : int, default: None
+        The number of worker processes. If 1, the frames are rendered
+        in this process. If None, the number of CPUs is used.
+    figsize : tuple, default: (6.4, 4.8)
+        the figure size in inches.
+    dpi : int, default: 100
+        the resolution of the frames.
+    node_size : float, default: 50
+        the marker size of the nodes in points^2.
+    node_ec : str or tuple, default: "black"
+        the color of the node borders.
+    dyad_lw : float, default: 1.5
+        the width of the dyads.
+    edge_alpha : float, default: 0.4
+        the transparency of the hyperedges.
+    encoder : str, default: "ffmpeg"
+        the encoder executable, which must accept a PNG stream
+        with ``-f image2pipe``.
+    encoder_args : tuple of str, default: ("-pix_fmt", "yuv420p")
+        additional output arguments for the encoder.
+
+    Returns
+    -------
+    list of str
+        the paths of the PNG files, empty if `directory` is None.
+
+    Raises
+    ------
+    HyperContagionError
+        If neither a directory nor a filename is specified, or if
+        the encoder is not found, stops reading the frames, or fails.
+    """
+    if directory is None and filename is None:
+        raise HyperContagionError("Either a directory or a filename must be specified.")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    palettes = (
+        _get_palette(labels, node_colors),
+        _get_palette(labels, edge_colors),
+        _get_palette(labels, edge_colors, edge_alpha),
+    )
+    setup = (H, pos, palettes, figsize, dpi, node_size, node_ec, dyad_lw, edge_alpha)
+    paths = [
+        None if directory is None else os.path.join(directory, f"frame_{i:06d}.png")
+        for i in range(len(node_states))
+    ]
+    pipe = filename is not None
+    tasks = zip(paths, itertools.repeat(pipe), node_states, edge_states)
+
+    process = None
+    if pipe:
+        try:
+            process = subprocess.Popen(
+                [encoder, "-y", "-f", "image2pipe", "-framerate", str(fps), "-i", "-"]
+                + list(encoder_args)
+                + [filename],
+                stdin=subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise HyperContagionError(f"The encoder {encoder!r} was not found.")
+
+    failed = True
+    try:
+        if processes == 1:
+            _init_renderer(*setup)
+            frames = map(_render_frame, tasks)
+            _write_frames(frames, process)
+        else:
+            workers = processes if processes is not None else os.cpu_count() or 1
+            chunksize = max(1, len(paths) // (4 * workers))
+            with ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_renderer, initargs=setup
+            ) as executor:
+                frames = executor.map(_render_frame, tasks, chunksize=chunksize)
+                _write_frames(frames, process)
+        failed = False
+    except BrokenPipeError:
+        raise HyperContagionError(
+            "The encoder exited before all the frames were written."
+        )
+    finally:
+        if process is not None:
+            _close_encoder(process, failed)
+
+    if process is not None and process.returncode != 0:
+        raise HyperContagionError(f"The encoder exited with code {process.returncode}.")
+
+    return [] if directory is None else paths
+
+
+_renderer = None
+
+
+def _init_renderer(
+    H, pos, palettes, figsize, dpi, node_size, node_ec, dyad_lw, edge_alpha
+):
+    """Draw the hypergraph on a new Agg canvas for this process."""
+    global _renderer
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    artists = _draw_collections(ax, H, pos, node_size, node_ec, dyad_lw, edge_alpha)
+    fig.tight_layout()
+    _renderer = (canvas, artists, palettes)
+
+
+def _render_frame(task):
+    """Render a single frame with this process's canvas.
+
+    Returns
+    -------
+    bytes or None
+        the PNG data if it is piped to an encoder.
+    """
+    path, pipe, node_states, edge_states = task
+    canvas, artists, palettes = _renderer
+    _update_collections(artists, palettes, node_states, edge_states)
+    buffer = io.BytesIO()
+    canvas.print_png(buffer)
+    if path is not None:
+        with open(path, "wb") as file:
+            file.write(buffer.getvalue())
+    return buffer.getvalue() if pipe else None
+
+
+def _write_frames(frames, process):
+    """Consume the rendered frames in order, piping them to the encoder."""
+    for frame in frames:
+        if process is not None:
+            process.stdin.write(frame)
+
+
+def _close_encoder(process, kill):
+    """Close the input of the encoder and wait for it to exit, after
+    killing it if the frames could not all be written."""
+    if kill:
+        process.kill()
+    try:
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    process.wait()
+
+
+def _draw_collections(ax, H, pos, node_size, node_ec, dyad_lw, edge_alpha):
+    """Draw the hypergraph once as matplotlib collections.
+
+    Returns
+    -------
+    tuple
+        the node, dyad, and hyperedge collections and the indices of the
+        dyads and hyperedges in the order of `H.edges`.
+    """
+    members = H.edges.members()
+    xy = np.array([pos[n] for n in H.nodes], dtype=float).reshape(-1, 2)
+    node_index = {n: i for i, n in enumerate(H.nodes)}
+
+    dyads = [i for i, e in enumerate(members) if len(e) == 2]
+    hyperedges = [i for i, e in enumerate(members) if len(e) > 2]
+
+    polygons = []
+    for i in hyperedges:
+        points = xy[[node_index[n] for n in members[i]]]
+        # order the members by angle around the centroid
+        centroid = points.mean(axis=0)
+        angles = np.arctan2(*(points - centroid).T[::-1])
+        polygons.append(points[np.argsort(angles)])
+    edge_collection = PolyCollection(polygons, linewidths=0, zorder=1)
+    ax.add_collection(edge_collection)
+
+    segments = [xy[[node_index[n] for n in members[i]]] for i in dyads]
+    dyad_collection = LineCollection(segments, linewidths=dyad_lw, zorder=2)
+    ax.add_collection(dyad_collection)
+
+    node_collection = ax.scatter(
+        xy[:, 0], xy[:, 1], s=node_size, edgecolors=node_ec, zorder=3
+    )
+    ax.set_aspect("equal")
+    ax.axis("off")
+    ax.autoscale_view()
+    return node_collection, dyad_collection, edge_collection, dyads, hyperedges
+
+
+def _update_collections(artists, palettes, node_states, edge_states):
+    """Update the colors of the collections from state codes."""
+    node_collection, dyad_collection, edge_collection, dyads, hyperedges = artists
+    node_palette, dyad_palette, edge_palette = palettes
+    node_collection.set_facecolors(node_palette[node_states])
+    dyad_collection.set_colors(dyad_palette[edge_states[dyads]])
+    edge_collection.set_facecolors(edge_palette[edge_states[hyperedges]])
+    return node_collection, dyad_collection, edge_collection
+
+
+def _colors_by_label(labels, colors):
+    """The color of every state label, None if it has no color.
+
+    The labels are strings, so the states in `colors` are compared as
+    strings too.
+    """
+    colors = {str(state): color for state, color in colors.items()}
+    return [colors.get(label) for label in labels]
+
+
+def _get_palette(labels, colors, alpha=None):
+    """An RGBA array with a color for every state label."""
+    palette = np.zeros((len(labels), 4))
+    for i, color in enumerate(_colors_by_label(labels, colors)):
+        if color is not None:
+            palette[i] = to_rgba_array(color, alpha)[0]
+    return palette
+
+
+def get_event_columns(transition_events):
+    """Converts an event stream into a columnar event log.
+
+    Parameters
+    ----------
+    transition_events : list of dict or dict of arrays
+        output of epidemic simulations with `return_event_data=True`.
+        If it is already columnar, the columns are converted to arrays.
+
+    Returns
+    -------
+    dict of numpy arrays
+        The keys are "time", "source", "target", "old_state", and
+        "new_state" and each value is an array with one entry per event.
+    """
+    keys = ["time", "source", "target", "old_state", "new_state"]
+    if isinstance(transition_events, dict):
+        columns = {
+            k: np.asarray(transition_events[k]) for k in keys if k in transition_events
+        }
+    else:
+        columns = dict()
+        for k in keys:
+            column = np.empty(len(transition_events), dtype=object)
+            column[:] = [event[k] for event in transition_events]
+            columns[k] = column
+    columns["time"] = columns["time"].astype(float)
+    return columns
+
+
 def get_events_in_equal_time_intervals(transition_events, dt):
     """Converts an event stream into events per time interval.
 
     Parameters
     ----------
-    transition_events : list of dict
-        output of epidemic simulations with `return_event_data=True`
+    transition_events : list of dict or dict of arrays
+        output of epidemic simulations with `return_event_data=True`,
+        or the corresponding columnar event log (see `get_event_columns`).
     dt : float > 0
         the time interval over which to aggregate events.
 
@@ -93,16 +504,126 @@ def get_events_in_equal_time_intervals(transition_events, dt):
         the key is the start time of the time interval and
         the values are the list of events
     """
-    tmin = transition_events[0]["time"]
-
-    new_events = defaultdict(list)
+    if isinstance(transition_events, dict):
+        times = np.asarray(transition_events["time"], dtype=float)
+    else:
+        times = np.array([event["time"] for event in transition_events], dtype=float)
+    tmin, boundaries = _get_intervals(times, dt)
+    start = np.searchsorted(times, boundaries, side="left")
 
-    t = tmin
-    for event in transition_events:
-        if event["time"] < t + dt:
-            new_events[t].append(event)
+    new_events = dict()
+    for k in range(len(boundaries) - 1):
+        if isinstance(transition_events, dict):
+            new_events[float(tmin + k * dt)] = [
+                {key: value[i] for key, value in transition_events.items()}
+                for i in range(start[k], start[k + 1])
+            ]
         else:
-            t += dt
-            new_events[t].append(event)
+            new_events[float(tmin + k * dt)] = transition_events[
+                start[k] : start[k + 1]
+            ]
 
     return new_events
+
+
+def get_states_in_equal_time_intervals(H, transition_events, dt, default_state="S"):
+    """Get the node and edge states at the end of every time interval.
+
+    The events are binned with a binary search over the (sorted) time column,
+    the last state of every node in each interval is kept, and these states
+    are forward-filled over the intervals.
+
+    Parameters
+    ----------
+    H : xgi.Hypergraph
+        The hypergraph on which the simulation occurs
+    transition_events : list of dict or dict of arrays
+        output of epidemic simulations with `return_event_data=True`,
+        or the corresponding columnar event log (see `get_event_columns`).
+    dt : float > 0
+        the time interval over which to aggregate events.
+    default_state : hashable, default: "S"
+        the state of nodes before their first event.
+
+    Returns
+    -------
+    numpy array, numpy array, numpy array, numpy array
+        The start time of each interval; an array of size T x N of the node
+        states, where the columns are in the order of `H.nodes`; an array
+        of size T x E of the edge states, where the columns are in the order of
+        `H.edges`; and the state labels. The states are integer indices into
+        the labels. The state of an edge in an interval is that of the last
+        transition it caused in the interval and "OFF" if there is none.
+    """
+    columns = get_event_columns(transition_events)
+    times = columns["time"]
+    tmin, boundaries = _get_intervals(times, dt)
+    num_frames = len(boundaries) - 1
+    frame = np.searchsorted(boundaries, times, side="right") - 1
+
+    labels, codes = np.unique(
+        np.concatenate([columns["new_state"], [default_state, "OFF"]]).astype(str),
+        return_inverse=True,
+    )
+    default_code, off_code = codes[-2:]
+    codes = codes[:-2]
+
+    node_index = _get_index(columns["target"], list(H.nodes))
+    node_states = _last_per_frame(frame, node_index, codes, num_frames, H.num_nodes)
+    # forward-fill the node states
+    filled = node_states >= 0
+    last = np.where(filled, np.arange(num_frames)[:, np.newaxis], 0)
+    last = np.maximum.accumulate(last, axis=0)
+    node_states = node_states[last, np.arange(H.num_nodes)]
+    node_states[node_states < 0] = default_code
+
+    has_source = np.array([s is not None for s in columns["source"]], dtype=bool)
+    edge_index = _get_index(columns["source"][has_source], list(H.edges))
+    edge_states = _last_per_frame(
+        frame[has_source],
+        edge_index,
+        codes[has_source],
+        num_frames,
+        H.num_edges,
+    )
+    edge_states[edge_states < 0] = off_code
+
+    return tmin + dt * np.arange(num_frames), node_states, edge_states, labels
+
+
+def _get_intervals(times, dt):
+    """The boundaries of equal time intervals covering sorted times."""
+    if len(times) == 0:
+        return 0, np.zeros(1)
+    tmin = float(times[0])
+    num_frames = int((times[-1] - tmin) // dt) + 1
+    return tmin, tmin + dt * np.arange(num_frames + 1)
+
+
+def _get_index(values, keys):
+    """The position of each value in a list of unique keys."""
+    keys_array = np.asarray(keys)
+    if keys_array.dtype.kind in "iuf" and len(values):
+        try:
+            values_array = np.asarray(values).astype(keys_array.dtype)
+        except (TypeError, ValueError):
+            pass
+        else:
+            sorter = np.argsort(keys_array)
+            pos = np.searchsorted(keys_array, values_array, sorter=sorter)
+            index = sorter[np.minimum(pos, len(keys_array) - 1)]
+            if np.array_equal(keys_array[index], values_array):
+                return index
+    index = {k: i for i, k in enumerate(keys)}
+    return np.fromiter((index[v] for v in values), dtype=int, count=len(values))
+
+
+def _last_per_frame(frame, index, codes, num_frames, num_items):
+    """The last code of every item in every frame, -1 if there is none."""
+    states = np.full((num_frames, num_items), -1, dtype=int)
+    key = frame * num_items + index
+    # the first occurrence in reversed order is the last event
+    _, last = np.unique(key[::-1], return_index=True)
+    last = len(key) - 1 - last
+    states[frame[last], index[last]] = codes[last]
+    return states
@@ -0,0 +1,33 @@
+import numpy as np
+import xgi
+
+import hypercontagion as hc
+
+
+def test_adaptive_Gillespie_SIS(edgelist1):
+    # the susceptible node leaves the infected node and joins the other edge
+    H = xgi.Hypergraph([[0, 1], [2, 3]])
+    t, S, I, W, edges = hc.adaptive_Gillespie_SIS(
+        H, {2: 0}, 0, 1, initial_infecteds=[0], return_edges=True, seed=0
+    )
+    assert edges == {0: {0}, 1: {1, 2, 3}}
+    assert np.array_equal(W, [0, 1])
+    assert np.array_equal(I, [1, 1])
+
+    H = xgi.Hypergraph(edgelist1)
+    t, S, I, W, edges = hc.adaptive_Gillespie_SIS(
+        H,
+        {1: 1, 2: 1, 3: 1},
+        1,
+        0.5,
+        hc.individual_contagion,
+        rho=0.5,
+        tmax=10,
+        return_edges=True,
+        seed=0,
+    )
+    assert np.all(S + I == H.num_nodes)
+    assert np.all(np.diff(W) >= 0) and W[-1] > 0
+    assert sum(len(e) for e in edges.values()) <= sum(len(e) for e in H.edges.members())
+    # the input is not modified
+    assert H.edges.members() == xgi.Hypergraph(edgelist1).edges.members()
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import xgi
+
+import hypercontagion as hc
+from hypercontagion.exception import HyperContagionError
+from hypercontagion.sim.functions import _probe_counts
+
+
+def test_probe_counts():
+    table = _probe_counts(hc.collective_contagion, [2, 3])
+    assert np.array_equal(table[2], [0, 1, 0])
+    assert np.array_equal(table[3], [0, 0, 1, 0])
+
+    table = _probe_counts(hc.threshold, [4], threshold=0.6)
+    assert np.array_equal(table[4], [0, 0, 1, 1, 0])
+
+    # ties are replaced by their expectation
+    table = _probe_counts(hc.majority_vote, [3])
+    assert np.array_equal(table[3], [0, 0.5, 1, 0])
+
+
+def test_mean_field(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 0, 2: 2, 3: 2}
+
+    t, S, I = hc.mean_field_SIS(H, tau, 1, hc.individual_contagion, rho=0.5, tmax=10)
+    assert np.allclose(t, np.arange(0, 10.05, 0.1))
+    assert np.allclose(S + I, H.num_nodes)
+    assert I[0] == H.num_nodes / 2
+
+    t, S, I, R = hc.mean_field_SIR(H, tau, 1, initial_infecteds=[3, 4], tmax=50)
+    assert np.allclose(S + I + R, H.num_nodes)
+    assert I[0] == 2 and R[0] == 0
+    assert np.all(np.diff(S) <= 1e-9)
+    assert I[-1] < 1e-3
+
+    with pytest.raises(HyperContagionError):
+        hc.mean_field_SIS(H, tau, 1, rho=0.1, initial_infecteds=[1])
+
+
+def test_pair_approximation():
+    H = xgi.Hypergraph([[0, 1, 2], [1, 2, 3], [3, 4, 5], [4, 5, 6], [0, 6, 7]])
+    tau = {3: 2}
+
+    t, S, I = hc.pair_approximation_SIS(H, tau, 1, initial_infecteds=[1, 2], tmax=5)
+    assert np.allclose(S + I, H.num_nodes)
+    assert np.isclose(I[0], 2)
+
+    # collective contagion dies out from a small seed
+    t, S, I = hc.pair_approximation_SIS(
+        H, tau, 1, hc.collective_contagion, rho=0.1, tmax=20
+    )
+    assert I[-1] < 1e-3
+
+    t, S, I, R = hc.pair_approximation_SIR(
+        H, tau, 1, initial_infecteds=[0], initial_recovereds=[7], tmax=30
+    )
+    assert np.allclose(S + I + R, H.num_nodes)
+    assert np.isclose(R[0], 1)
+    assert np.all(np.diff(R) >= -1e-9)
+
+
+def test_microscopic_markov():
+    # a single infected node that never recovers
+    H = xgi.Hypergraph([[0, 1], [0, 2, 3]])
+    t, S, I, p = hc.microscopic_markov_SIS(
+        H,
+        {2: 0.5, 3: 0.5},
+        0,
+        hc.individual_contagion,
+        initial_infecteds=[0],
+        tmax=2,
+        return_node_probabilities=True,
+    )
+    assert np.allclose(t, [0, 1, 2])
+    assert np.allclose(p["I"][:, 0], 1)
+    assert np.allclose(p["I"][:, 1], [0, 0.5, 0.75])
+    assert np.allclose(I, p["I"].sum(axis=1))
+
+    # collective contagion needs all the other members to be infected
+    t, S, I, R, p = hc.microscopic_markov_SIR(
+        H,
+        {2: 1, 3: 1},
+        0.5,
+        hc.collective_contagion,
+        initial_infecteds=[0, 2],
+        tmax=1,
+        return_node_probabilities=True,
+    )
+    assert np.allclose(p["I"][1], [0.5, 1, 0.5, 1])
+    assert np.allclose(p["R"][1], [0.5, 0, 0.5, 0])
+    assert np.allclose(S + I + R, H.num_nodes)
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+import xgi
+
+import hypercontagion as hc
+from hypercontagion.exception import HyperContagionError
+
+
+def test_batch_discrete_SIR(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 1, 2: 1, 3: 1}
+
+    # the infection advances by one node per step in every realization
+    chain = xgi.Hypergraph([[1, 2], [2, 3], [3, 4]])
+    t, S, I, R = hc.batch_discrete_SIR(
+        chain, {2: 1}, 0, hc.individual_contagion, 5, initial_infecteds=[1], tmax=3
+    )
+    assert np.array_equal(I, np.repeat([[1], [2], [3], [4], [4]], 5, axis=1))
+
+    t, S, I, R = hc.batch_discrete_SIR(H, tau, 0.5, realizations=20, rho=0.25, seed=0)
+    assert S.shape == I.shape == R.shape == (len(t), 20)
+    assert np.all(S + I + R == H.num_nodes)
+    assert np.all(I[0] == 2)
+    assert np.all(I[-1] == 0)
+    assert np.all(np.diff(R, axis=0) >= 0)
+
+    output = hc.batch_discrete_SIR(H, tau, 0.5, realizations=20, rho=0.25, seed=0)
+    assert np.array_equal(output[3], R)
+
+    with pytest.raises(HyperContagionError):
+        hc.batch_discrete_SIR(H, tau, 0.5, initial_infecteds=[1], rho=0.5)
+
+
+def test_batch_discrete_SIS(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 1, 2: 1, 3: 1}
+
+    t, S, I = hc.batch_discrete_SIS(
+        H, tau, 1, realizations=10, initial_infecteds=[4], tmax=10, seed=0
+    )
+    # every node recovers and the singleton edge cannot reinfect it
+    assert np.array_equal(I, [[1] * 10, [0] * 10])
+
+    t, S, I = hc.batch_discrete_SIS(
+        H, tau, 0, hc.individual_contagion, 10, initial_infecteds=[6], tmax=5
+    )
+    assert np.all(S + I == H.num_nodes)
+    assert np.all(I[-1] == 4)
+
+    # the average agrees with independent runs of discrete_SIS
+    H = xgi.Hypergraph([[i, (i + 1) % 30, (i + 7) % 30] for i in range(30)])
+    tau = {3: 0.3}
+    t, S, I = hc.batch_discrete_SIS(
+        H, tau, 0.2, hc.individual_contagion, 400, rho=0.3, tmax=20, seed=0
+    )
+    final = [
+        hc.discrete_SIS(H, tau, 0.2, hc.individual_contagion, rho=0.3, tmax=20, seed=s)[
+            2
+        ][-1]
+        for s in range(100)
+    ]
+    assert abs(I[-1].mean() - np.mean(final)) < 2
+
+
+def test_packed_discrete(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 1, 2: 1, 3: 1}
+
+    # the realizations that do not fill a word are not mixed with the padding
+    chain = xgi.Hypergraph([[1, 2], [2, 3], [3, 4]])
+    t, S, I, R = hc.packed_discrete_SIR(
+        chain, {2: 1}, 0, hc.individual_contagion, 70, initial_infecteds=[1], tmax=3
+    )
+    assert np.array_equal(I, np.repeat([[1], [2], [3], [4], [4]], 70, axis=1))
+
+    t, S, I, R = hc.packed_discrete_SIR(H, tau, 0.5, realizations=100, rho=0.25, seed=0)
+    assert S.shape == I.shape == R.shape == (len(t), 100)
+    assert np.all(S + I + R == H.num_nodes)
+    assert np.all(I[0] == 2)
+    assert np.all(I[-1] == 0)
+
+    t, S, I = hc.packed_discrete_SIS(
+        H, tau, 1, realizations=10, initial_infecteds=[4], tmax=10, seed=0
+    )
+    assert np.array_equal(I, [[1] * 10, [0] * 10])
+
+    # the averages agree with the batched engine
+    H = xgi.Hypergraph([[i, (i + 1) % 30, (i + 7) % 30] for i in range(30)])
+    tau = {3: 0.3}
+    for batch, packed in [
+        (hc.batch_discrete_SIS, hc.packed_discrete_SIS),
+        (hc.batch_discrete_SIR, hc.packed_discrete_SIR),
+    ]:
+        expected = batch(H, tau, 0.2, hc.individual_contagion, 512, rho=0.3, seed=0)
+        output = packed(H, tau, 0.2, hc.individual_contagion, 512, rho=0.3, seed=0)
+        assert abs(output[2][-1].mean() - expected[2][-1].mean()) < 1
+        assert abs(output[1][-1].mean() - expected[1][-1].mean()) < 1
+
+
+def test_random_bits():
+    from hypercontagion.sim.batch import _random_bits
+
+    rng = np.random.default_rng(0)
+    words = _random_bits(rng, np.array([0, 0.3, 0.5, 1]), (4, 1000))
+    fractions = np.unpackbits(words.view(np.uint8), axis=1).mean(axis=1)
+    assert fractions[0] == 0 and fractions[3] == 1
+    assert np.allclose(fractions[1:3], [0.3, 0.5], atol=0.01)
@@ -1,7 +1,9 @@
 import numpy as np
+import pytest
 import xgi
 
 import hypercontagion as hc
+from hypercontagion.exception import HyperContagionError
 from hypercontagion.sim.functions import threshold
 
 
@@ -81,6 +83,42 @@ def test_discrete_SIS(edgelist1):
     assert I[-1] == 4
 
 
+def test_discrete_frontier(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 1, 2: 1, 3: 1}
+
+    visited = set()
+
+    def recording_contagion(node, status, edge):
+        if any(status[n] == "I" for n in edge):
+            visited.add(node)
+        return hc.threshold(node, status, edge)
+
+    for engine in [hc.discrete_SIR, hc.discrete_SIS]:
+        visited.clear()
+        engine(H, tau, 0, recording_contagion, initial_infecteds=[6], tmax=5, seed=0)
+        # the nodes of the other components are never visited
+        assert visited <= {5, 7, 8}
+
+    # the singleton edge infects its node without infected neighbors
+    t, S, I, R = hc.discrete_SIR(
+        H, tau, 0, hc.collective_contagion, initial_infecteds=[1], tmax=1, seed=0
+    )
+    assert I[1] == 2
+
+
+def test_discrete_synchronous_update():
+    H = xgi.Hypergraph([[1, 2], [2, 3], [3, 4]])
+    tau = {2: 1}
+
+    for engine in [hc.discrete_SIR, hc.discrete_SIS]:
+        output = engine(
+            H, tau, 0, hc.individual_contagion, initial_infecteds=[1], tmax=3, seed=0
+        )
+        # the infection advances by one node per step
+        assert list(output[2]) == [1, 2, 3, 4, 4]
+
+
 def test_Gillespie_SIR(edgelist1):
     H = xgi.Hypergraph(edgelist1)
 
@@ -234,3 +272,188 @@ def test_event_driven_SIS(edgelist1):
     assert np.min(t) == tmin
     assert np.max(t) < tmax
     assert I[-1] == 4
+
+
+def test_weights(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    # node 6 never recovers and only the edge {5, 6} transmits
+    H.set_node_attributes({6: 0}, name="recovery")
+    H.set_edge_attributes({0: 0, 1: 0, 2: 1, 3: 0}, name="transmission")
+    tau = {1: 1, 2: 1, 3: 1}
+    weights = {"recovery_weight": "recovery", "transmission_weight": "transmission"}
+
+    for engine in [
+        hc.discrete_SIR,
+        hc.Gillespie_SIR,
+        hc.event_driven_SIR,
+        hc.discrete_SIS,
+        hc.Gillespie_SIS,
+        hc.event_driven_SIS,
+    ]:
+        output = engine(
+            H,
+            tau,
+            1,
+            hc.individual_contagion,
+            initial_infecteds=[6],
+            tmax=20,
+            seed=0,
+            **weights,
+        )
+        t, S, I = output[:3]
+        assert I[-1] >= 1 and S[-1] >= 6
+        assert np.all(S + I <= H.num_nodes)
+
+    H.set_node_attributes({6: -1}, name="recovery")
+    with pytest.raises(HyperContagionError):
+        hc.event_driven_SIS(H, tau, 1, initial_infecteds=[6], **weights)
+
+
+def test_heterogeneous_rates():
+    H = xgi.Hypergraph([[i, (i + 1) % 50] for i in range(50)])
+    # rates spanning six orders of magnitude
+    H.set_edge_attributes({e: 10 ** (e % 7 - 3) for e in H.edges}, name="weight")
+
+    t, S, I, R, stats = hc.Gillespie_SIR(
+        H,
+        {2: 1},
+        0.1,
+        hc.individual_contagion,
+        rho=0.1,
+        transmission_weight="weight",
+        seed=0,
+        return_stats=True,
+    )
+    infections = sum(v for (e, _), v in stats.events.items() if e == "infection")
+    assert infections > 0
+    # the rejection sampling accepts at least half of the draws on average
+    assert stats.rejection_attempts < 3 * infections
+
+    with pytest.raises(HyperContagionError):
+        hc.discrete_SIR(H, {3: 1}, 0.1, rho=0.1)
+
+
+def test_simulation_stats(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 10, 2: 10, 3: 10}
+
+    for engine in [hc.discrete_SIR, hc.Gillespie_SIR, hc.event_driven_SIR]:
+        t, S, I, R, stats = engine(
+            H, tau, 1, initial_infecteds=[6], tmax=20, seed=0, return_stats=True
+        )
+        assert isinstance(stats, hc.SimulationStats)
+        assert stats.events["recovery", None] == R[-1]
+        infections = sum(v for (e, _), v in stats.events.items() if e == "infection")
+        assert infections == R[-1] + I[-1] - 1
+        assert stats.transmission_calls > 0
+        assert stats.transmission_time > 0
+
+    t, S, I, stats = hc.Gillespie_SIS(
+        H, tau, 1, initial_infecteds=[6], tmax=5, seed=0, return_stats=True
+    )
+    assert stats.channel_attempts >= len(t) - 1
+    assert stats.rejection_attempts == sum(
+        v for (e, _), v in stats.events.items() if e == "infection"
+    )
+    assert stats.is_link_inserts >= stats.is_link_removes
+
+    events, stats = hc.event_driven_SIS(
+        H,
+        tau,
+        1,
+        initial_infecteds=[6],
+        tmax=5,
+        seed=0,
+        return_event_data=True,
+        return_stats=True,
+    )
+    assert stats.queue_pops == len(events) + stats.dead_events
+    assert stats.max_queue_length > 0
+    assert 0 <= stats.dead_event_ratio <= 1
+
+    # the output is unchanged when the stats are not requested
+    t1, S1, I1 = hc.Gillespie_SIS(H, tau, 1, initial_infecteds=[6], tmax=5, seed=0)
+    t2, S2, I2, _ = hc.Gillespie_SIS(
+        H, tau, 1, initial_infecteds=[6], tmax=5, seed=0, return_stats=True
+    )
+    assert np.array_equal(t1, t2) and np.array_equal(I1, I2)
+
+
+def test_observers(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 10, 2: 10, 3: 10}
+    groups = {n: n % 2 for n in H.nodes}
+
+    for engine in [
+        hc.discrete_SIS,
+        hc.Gillespie_SIS,
+        hc.event_driven_SIS,
+        hc.discrete_SIR,
+        hc.Gillespie_SIR,
+        hc.event_driven_SIR,
+    ]:
+        observers = [
+            hc.StateCounter(groups),
+            hc.EdgeSizeStateCounter(),
+            hc.ActiveEdgeCounter(),
+        ]
+        output = engine(
+            H, tau, 1, initial_infecteds=[6], tmax=5, seed=0, observers=observers
+        )
+        t, I, observed = output[0], output[2], output[-1]
+        counts = observed["state_counter"]
+        assert observers[0].labels == [0, 1]
+        assert counts.shape == (len(t), 2)
+        assert np.array_equal(counts.sum(axis=1), I)
+
+        sizes = observed["edge_size_state_counter"]
+        assert sizes.shape == (len(t), 3)
+        assert np.all(sizes.sum(axis=1) >= I)
+
+        active = observed["active_edges"]
+        assert active.shape == t.shape
+        assert np.array_equal(active > 0, I > 0)
+
+    # the output is unchanged when observers are given
+    t1, S1, I1 = hc.Gillespie_SIS(H, tau, 1, initial_infecteds=[6], tmax=5, seed=0)
+    t2, S2, I2, _ = hc.Gillespie_SIS(
+        H,
+        tau,
+        1,
+        initial_infecteds=[6],
+        tmax=5,
+        seed=0,
+        observers=[hc.ActiveEdgeCounter()],
+    )
+    assert np.array_equal(t1, t2) and np.array_equal(I1, I2)
+
+
+def test_checkpoint_and_resume(edgelist1, tmp_path):
+    H = xgi.Hypergraph(edgelist1)
+    tau = {1: 1, 2: 1, 3: 1}
+    path = tmp_path / "checkpoint.pkl"
+
+    for engine in [hc.Gillespie_SIS, hc.event_driven_SIS]:
+        events = engine(
+            H, tau, 0.5, initial_infecteds=[6], tmax=10, seed=0, return_event_data=True
+        )
+
+        engine(
+            H,
+            tau,
+            0.5,
+            initial_infecteds=[6],
+            tmax=4,
+            seed=0,
+            return_event_data=True,
+            checkpoint=path,
+            checkpoint_interval=1,
+        )
+        resumed = engine(H, tau, 0.5, tmax=10, resume=path, return_event_data=True)
+        assert resumed == events
+
+    with pytest.raises(HyperContagionError):
+        hc.Gillespie_SIS(H, tau, 0.5, tmax=10, resume=path)
+
+    with pytest.raises(HyperContagionError):
+        hc.Gillespie_SIS(H, tau, 0.5, checkpoint_interval=1)
@@ -1,10 +1,21 @@
+import numpy as np
+import pytest
+import xgi
+
+import hypercontagion as hc
 from hypercontagion import (
     collective_contagion,
+    count_based,
     individual_contagion,
+    is_count_based,
     majority_vote,
     size_dependent,
     threshold,
+    vectorize,
+    vectorized_majority_vote,
 )
+from hypercontagion.exception import HyperContagionError
+from hypercontagion.sim.functions import _count_table
 
 
 def test_collective_contagion(
@@ -163,3 +174,118 @@ def test_size_dependent(
         size_dependent(func_args_5["node"], func_args_5["status"], func_args_5["edge"])
         == 4
     )
+
+
+def test_count_based(edgelist1):
+    H = xgi.Hypergraph(edgelist1)
+    for function in [
+        collective_contagion,
+        individual_contagion,
+        threshold,
+        size_dependent,
+    ]:
+        assert function.count_based
+        assert is_count_based(function, H, seed=0)
+    assert is_count_based(threshold, H, seed=0, threshold=0.3)
+    assert not hasattr(majority_vote, "count_based")
+
+    def first_member(node, status, edge):
+        return status[min(edge)] == "I"
+
+    def broken(node, status, edge):
+        raise ValueError
+
+    assert not is_count_based(first_member, H, seed=0)
+    assert not is_count_based(broken, H)
+
+    table = _count_table(threshold, H.edges.members(dtype=dict), {"threshold": 0.3})
+    assert table[3] == [0, 1, 1, 0]
+    assert _count_table(majority_vote, H.edges.members(dtype=dict), {}) is None
+    with pytest.raises(HyperContagionError):
+        _count_table(count_based(first_member), H.edges.members(dtype=dict), {})
+
+    # the tables give the same simulations as the calls
+    tau = {1: 0.5, 2: 0.5, 3: 0.5}
+    for engine in [
+        hc.discrete_SIR,
+        hc.discrete_SIS,
+        hc.Gillespie_SIR,
+        hc.Gillespie_SIS,
+    ]:
+        expected = engine(
+            H, tau, 0.5, lambda *a: threshold(*a), rho=0.5, tmax=10, seed=1
+        )
+        output = engine(H, tau, 0.5, threshold, rho=0.5, tmax=10, seed=1)
+        for x, y in zip(output, expected):
+            assert np.array_equal(x, y)
+
+
+def test_vectorize(edgelist1):
+    sizes = np.array([size for size in range(1, 6) for k in range(size)])
+    num_infected = np.array([k for size in range(1, 6) for k in range(size)])
+    edge_ids = np.arange(len(sizes))
+
+    for function, args in [
+        (collective_contagion, {}),
+        (individual_contagion, {}),
+        (threshold, {}),
+        (threshold, {"threshold": 0.3}),
+        (size_dependent, {}),
+    ]:
+        expected = [
+            function(
+                0,
+                {n: "I" if 1 <= n <= k else "S" for n in range(size)},
+                list(range(size)),
+                **args
+            )
+            for size, k in zip(sizes, num_infected)
+        ]
+        vectorized = vectorize(function)
+        assert vectorized is function.vectorized
+        assert np.array_equal(
+            vectorized(edge_ids, sizes, num_infected, "S", **args), expected
+        )
+        adapter = vectorize(lambda *a, **kw: function(*a, **kw))
+        assert np.array_equal(
+            adapter(edge_ids, sizes, num_infected, "S", **args), expected
+        )
+
+    # functions that depend on more than the counts are not tabulated
+    def first_member(node, status, edge):
+        return status[min(edge)] == "I"
+
+    with pytest.raises(HyperContagionError):
+        vectorize(first_member)(edge_ids, sizes, num_infected, "S")
+    with pytest.raises(HyperContagionError):
+        hc.batch_discrete_SIS(
+            xgi.Hypergraph(edgelist1), {1: 1, 2: 1, 3: 1}, 1, first_member, 4
+        )
+
+    # the ties of the majority vote are replaced by their expectation
+    assert np.array_equal(
+        vectorized_majority_vote(None, [1, 3, 3, 3, 4], [0, 0, 1, 2, 1], "S"),
+        [0, 0, 0.5, 1, 0],
+    )
+
+    # the batched engines use the vectorized version
+    H = xgi.Hypergraph(edgelist1)
+
+    def only_first_edge(node, status, edge):
+        return 0
+
+    only_first_edge.vectorized = lambda edge_ids, sizes, num_infected, states: (
+        (edge_ids == 0) & (num_infected > 0)
+    ).astype(float)
+
+    for engine in [hc.batch_discrete_SIR, hc.packed_discrete_SIR]:
+        t, S, I, R = engine(
+            H,
+            {1: 1, 2: 1, 3: 1},
+            0,
+            only_first_edge,
+            8,
+            initial_infecteds=[1, 6],
+            tmax=5,
+        )
+        assert np.all(I[-1] == 4)
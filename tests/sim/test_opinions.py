@@ -1,6 +1,11 @@
+import random
+
 import numpy as np
+import pytest
+import xgi
 
 import hypercontagion as hc
+from hypercontagion.exception import HyperContagionError
 
 
 def test_discordance():
@@ -26,3 +31,200 @@ def test_simulate_random_node_and_group_discrete_state():
 
 def test_synchronous_update_continuous_state_1D():
     assert 0 == 0
+
+
+def test_random_group_convergence():
+    H = xgi.Hypergraph([[0, 1, 2], [1, 2, 3], [3, 4]])
+    initial_states = np.array([0.1, 0.2, 0.3, 0.4, 0.5])
+
+    t, states = hc.simulate_random_group_continuous_state_1D(
+        H, initial_states, tmax=10000, epsilon=10, tol=1e-8
+    )
+    assert t[-1] < 10000
+    assert states.shape == (H.num_nodes, len(t))
+    assert np.max(states[:, -1]) - np.min(states[:, -1]) < 1e-3
+
+    # opinions too far apart to interact freeze immediately
+    initial_states = np.array([0, 1, 2, 3, 4])
+    t, states, tc = hc.simulate_random_group_continuous_state_1D(
+        H, initial_states, epsilon=0.1, tol=1e-8, return_convergence_time=True
+    )
+    assert tc == 0
+    assert len(t) == 1
+
+    t, states, tc = hc.simulate_random_group_continuous_state_1D(
+        H, initial_states, tmax=10, return_convergence_time=True
+    )
+    assert tc == float("Inf")
+    assert len(t) == 12
+
+
+def test_discrete_state_consensus():
+    H = xgi.Hypergraph([[0, 1], [1, 2], [2, 0]])
+    initial_states = np.array(["A", "A", "B"], dtype=object)
+
+    t, states, tc = hc.simulate_random_node_and_group_discrete_state(
+        H,
+        initial_states,
+        tmax=100000,
+        stop_at_consensus=True,
+        return_convergence_time=True,
+    )
+    assert tc == t[-1]
+    assert len(set(states[:, -1])) == 1
+
+
+def test_synchronous_convergence():
+    H = xgi.Hypergraph([[0, 1, 2], [1, 2, 3], [2, 3, 4]])
+    initial_states = np.array([0.1, 0.2, 0.3, 0.4, 0.5])
+
+    t, states, tc = hc.synchronous_update_continuous_state_1D(
+        H, initial_states, tmax=1000, epsilon=1, tol=1e-10, return_convergence_time=True
+    )
+    assert tc == t[-1]
+    assert tc < 1000
+    assert np.max(np.abs(states[:, -1] - states[:, -2])) <= 1e-10
+
+
+def test_voter_model():
+    status = np.array([0, 1, 1, 1])
+    status = hc.voter_model(0, np.array([0, 1, 2]), status)
+    assert status[0] == 1
+
+    status = np.array([0, 1, 2, 1])
+    status = hc.voter_model(0, [0, 1, 2], status)
+    assert status[0] == 0
+
+    # singleton edges leave the node unchanged
+    status = hc.voter_model(0, [0], status)
+    assert status[0] == 0
+
+
+def test_discrete_state_multiple_opinions():
+    H = xgi.Hypergraph([[0, 1, 2], [2, 3], [3, 4, 5], [5, 0], [6]])
+    initial_states = np.array(["A", "B", "C", "A", "B", "C", "D"], dtype=object)
+
+    t, states = hc.simulate_random_node_and_group_discrete_state(
+        H, initial_states, tmax=100
+    )
+    assert states.shape == (H.num_nodes, len(t))
+    assert np.all(states[:, 0] == initial_states)
+    assert set(states.ravel()) <= {"A", "B", "C", "D"}
+    # the isolated node never changes its opinion
+    assert np.all(states[6] == "D")
+
+
+def test_num_clusters():
+    assert hc.num_clusters(np.array([0.1, 0.1001, 0.5, 0.9, 0.9])) == 3
+    assert hc.num_clusters(np.array([0.1, 0.5, 0.9]), tol=0.5) == 1
+    assert hc.num_clusters(np.array(["A", "B", "A"], dtype=object)) == 2
+
+
+def _uniform_states(rng):
+    return rng.random(6)
+
+
+def test_opinion_ensemble():
+    H = xgi.Hypergraph([[0, 1, 2], [1, 2, 3], [3, 4], [4, 5, 0]])
+
+    grid, results = hc.opinion_ensemble(
+        H,
+        _uniform_states,
+        parameters={"epsilon": [0.001, 10]},
+        realizations=3,
+        processes=1,
+        seed=0,
+        tmax=10000,
+        tol=1e-8,
+    )
+    assert grid == [{"epsilon": 0.001}, {"epsilon": 10}]
+    assert set(results) == {"num_clusters", "discordance", "convergence_time"}
+    for r in results.values():
+        assert r.shape == (2, 3)
+    # no interactions at all for a tiny confidence bound
+    assert np.all(results["num_clusters"][0] == 6)
+    assert np.all(results["convergence_time"][0] == 0)
+    # consensus for a large one
+    assert np.all(results["num_clusters"][1] == 1)
+    assert np.all(results["convergence_time"][1] < 10000)
+
+    # the random state of the caller is left untouched
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    hc.opinion_ensemble(H, _uniform_states, processes=1, seed=0, tmax=10)
+    assert random.random() == expected
+
+    # the results do not depend on the number of processes
+    _, results2 = hc.opinion_ensemble(
+        H,
+        _uniform_states,
+        parameters={"epsilon": [0.001, 10]},
+        realizations=3,
+        processes=2,
+        seed=0,
+        tmax=10000,
+        tol=1e-8,
+    )
+    for stat in results:
+        assert np.allclose(results[stat], results2[stat], equal_nan=True)
+
+    _, results = hc.opinion_ensemble(
+        H,
+        np.linspace(0, 1, 6),
+        simulation=hc.synchronous_update_continuous_state_1D,
+        statistics=["final_time"],
+        realizations=2,
+        processes=1,
+        tmax=10,
+    )
+    assert np.all(results["final_time"] == 11)
+
+    # the default statistics of the discrete driver skip the discordance
+    _, results = hc.opinion_ensemble(
+        H,
+        np.array(["a", "b", "a", "b", "a", "b"]),
+        simulation=hc.simulate_random_node_and_group_discrete_state,
+        realizations=2,
+        processes=1,
+        tmax=10,
+    )
+    assert set(results) == {"num_clusters", "convergence_time"}
+    with pytest.raises(HyperContagionError):
+        hc.opinion_ensemble(
+            H,
+            np.array(["a", "b", "a", "b", "a", "b"]),
+            simulation=hc.simulate_random_node_and_group_discrete_state,
+            statistics=["discordance"],
+            processes=1,
+            tmax=10,
+        )
+
+
+def test_synchronous_hegselmann_krause():
+    H = xgi.Hypergraph([[0, 1, 2], [1, 2, 3], [2, 3, 4], [4, 5], [6]])
+    rng = np.random.default_rng(0)
+    initial_states = rng.random(H.num_nodes)
+
+    for epsilon in [0.001, 0.05, 1]:
+        t1, states1 = hc.synchronous_update_continuous_state_1D(
+            H, initial_states, tmax=20, epsilon=epsilon
+        )
+        t2, states2 = hc.synchronous_hegselmann_krause(
+            H, initial_states, tmax=20, epsilon=epsilon
+        )
+        assert np.allclose(t1, t2)
+        assert np.allclose(states1, states2)
+
+    # many realizations at once
+    initial_states = rng.random((H.num_nodes, 4))
+    t, states, tc = hc.synchronous_hegselmann_krause(
+        H, initial_states, epsilon=1, tmax=1000, tol=1e-10, return_convergence_time=True
+    )
+    assert states.shape == (H.num_nodes, 4, len(t))
+    assert tc == t[-1]
+    for b in range(4):
+        _, states_b = hc.synchronous_hegselmann_krause(
+            H, initial_states[:, b], epsilon=1, tmax=t[-1] - 1
+        )
+        assert np.allclose(states[:, b, :], states_b)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import hypercontagion as hc
+from hypercontagion.exception import HyperContagionError
+
+
+def test_temporal_hypergraph():
+    contacts = [(0, [1, 2]), (1, [2, 1]), (3, [1, 2]), (2, [2, 3, 4])]
+    T = hc.TemporalHypergraph.from_contacts(contacts, duration=1, nodes=[5])
+    assert T.members == [(1, 2), (2, 3, 4), (1, 2)]
+    assert np.array_equal(T.starts, [0, 2, 3])
+    assert np.array_equal(T.ends, [2, 3, 4])
+    assert T.nodes == [5, 1, 2, 3, 4]
+    assert T.num_nodes == 5 and T.num_edges == 3
+    assert np.array_equal(T.edges_at(1.5), [0])
+    assert np.array_equal(T.edges_at(2), [1])
+    assert T.snapshot(3.5).edges.members() == [{1, 2}]
+
+    with pytest.raises(HyperContagionError):
+        hc.TemporalHypergraph([([1, 2], 1, 1)])
+
+
+def test_temporal_Gillespie():
+    # the edge is only active from 1 to 2 and transmission is fast
+    T = hc.TemporalHypergraph([([0, 1], 1, 2), ([1, 2], 3, 4)])
+    events = hc.temporal_Gillespie_SIR(
+        T,
+        {2: 100},
+        0,
+        hc.individual_contagion,
+        initial_infecteds=[0],
+        tmax=10,
+        return_event_data=True,
+        seed=0,
+    )
+    infections = [e for e in events if e["source"] is not None]
+    assert [e["target"] for e in infections] == [1, 2]
+    assert 1 <= infections[0]["time"] < 2
+    assert 3 <= infections[1]["time"] < 4
+    assert infections[0]["source"] == 0 and infections[1]["source"] == 1
+
+    # nothing happens while no edge is active
+    T = hc.TemporalHypergraph([([0, 1], 5, 6)])
+    t, S, I = hc.temporal_Gillespie_SIS(
+        T, {2: 100}, 0, initial_infecteds=[0], tmax=4, seed=0
+    )
+    assert np.array_equal(t, [0]) and np.array_equal(I, [1])
+
+    t, S, I, R = hc.temporal_Gillespie_SIR(T, {2: 1}, 1, initial_infecteds=[0], seed=0)
+    assert np.all(S + I + R == 2)
+    assert I[-1] == 0
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+import xgi
+
+import hypercontagion as hc
+from hypercontagion.exception import HyperContagionError
+from hypercontagion.sim.thresholds import _wilson_interval
+
+
+def test_wilson_interval():
+    low, high = _wilson_interval(5, 10, 1.96)
+    assert 0.23 < low < 0.24 and 0.76 < high < 0.77
+    low, high = _wilson_interval(0, 10, 1.96)
+    assert low == 0 and 0 < high < 0.5
+
+
+def test_epidemic_threshold():
+    H = xgi.Hypergraph([[i, (i + 1) % 20] for i in range(20)])
+    H.add_edges_from([[i, (i + 2) % 20, (i + 5) % 20] for i in range(20)])
+    tau = {2: 1, 3: 1}
+
+    scale, report = hc.epidemic_threshold(
+        H,
+        tau,
+        1,
+        hc.individual_contagion,
+        tmax=10,
+        tol=0.1,
+        min_realizations=8,
+        max_realizations=32,
+        processes=1,
+        seed=0,
+    )
+    lower, upper = report["bracket"]
+    assert lower <= scale <= upper
+    assert 0.1 < scale < 0.3
+    assert report["tau"] == {2: scale, 3: scale}
+    assert report["realizations"] == sum(
+        e["realizations"] for e in report["evaluations"]
+    )
+    assert report["events"] > 0
+    assert report["wall_time"] > 0
+    for e in report["evaluations"]:
+        low, high = e["interval"]
+        assert low <= e["survival"] <= high
+
+    # a supercritical lower factor is an error
+    with pytest.raises(HyperContagionError):
+        hc.epidemic_threshold(
+            H,
+            tau,
+            1,
+            hc.individual_contagion,
+            lower=2,
+            tmax=10,
+            tol=0.1,
+            min_realizations=8,
+            max_realizations=32,
+            processes=1,
+            seed=0,
+        )
+
+    # the random state of the caller is left untouched
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    hc.epidemic_threshold(
+        H,
+        tau,
+        1,
+        hc.individual_contagion,
+        tmax=10,
+        tol=0.5,
+        min_realizations=8,
+        max_realizations=8,
+        processes=1,
+        seed=0,
+    )
+    assert random.random() == expected
@@ -0,0 +1,193 @@
+import sys
+
+import numpy as np
+import pytest
+import xgi
+
+from hypercontagion.exception import HyperContagionError
+from hypercontagion.visualization.animation import (
+    get_event_columns,
+    get_events_in_equal_time_intervals,
+    get_states_in_equal_time_intervals,
+)
+
+
+def _event(time, source, target, old_state, new_state):
+    return {
+        "time": time,
+        "source": source,
+        "target": target,
+        "old_state": old_state,
+        "new_state": new_state,
+    }
+
+
+def test_get_events_in_equal_time_intervals():
+    events = [
+        _event(0, None, 1, "S", "I"),
+        _event(0.5, 0, 2, "S", "I"),
+        _event(2.2, None, 1, "I", "R"),
+    ]
+    intervals = get_events_in_equal_time_intervals(events, 1)
+    assert list(intervals) == [0, 1, 2]
+    assert intervals[0] == events[:2]
+    assert intervals[1] == []
+    assert intervals[2] == events[2:]
+
+    intervals = get_events_in_equal_time_intervals(get_event_columns(events), 1)
+    assert intervals[0] == events[:2]
+    assert intervals[2] == events[2:]
+
+
+def test_get_states_in_equal_time_intervals():
+    H = xgi.Hypergraph([[1, 2], [2, 3, 4]])
+    events = [
+        _event(0, None, 1, "S", "I"),
+        _event(0.5, 0, 2, "S", "I"),
+        _event(0.7, None, 1, "I", "R"),
+        _event(2.5, 1, 3, "S", "I"),
+    ]
+    t, node_states, edge_states, labels = get_states_in_equal_time_intervals(
+        H, events, 1
+    )
+    assert np.allclose(t, [0, 1, 2])
+    assert node_states.shape == (3, 4)
+    assert edge_states.shape == (3, 2)
+
+    node_states = labels[node_states]
+    assert node_states[0].tolist() == ["R", "I", "S", "S"]
+    assert node_states[1].tolist() == ["R", "I", "S", "S"]
+    assert node_states[2].tolist() == ["R", "I", "I", "S"]
+
+    edge_states = labels[edge_states]
+    assert edge_states[0].tolist() == ["I", "OFF"]
+    assert edge_states[1].tolist() == ["OFF", "OFF"]
+    assert edge_states[2].tolist() == ["OFF", "I"]
+
+
+def test_get_palette():
+    from hypercontagion.visualization.animation import _get_palette
+
+    # the states of the colors are compared with the labels as strings
+    palette = _get_palette(np.array(["0", "1", "OFF"]), {0: "white", 1: "red"})
+    assert np.allclose(palette, [[1, 1, 1, 1], [1, 0, 0, 1], [0, 0, 0, 0]])
+
+
+def test_stream_contagion_animation():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from hypercontagion.visualization.animation import (
+        _draw_collections,
+        _get_palette,
+        _update_collections,
+        stream_contagion_animation,
+    )
+
+    H = xgi.Hypergraph([[1, 2], [2, 3, 4]])
+    events = [
+        _event(0, None, 1, "S", "I"),
+        _event(0.5, 0, 2, "S", "I"),
+        _event(2.5, 1, 3, "S", "I"),
+    ]
+    pos = {1: [0, 0], 2: [1, 0], 3: [1, 1], 4: [2, 0]}
+    node_colors = {"S": "white", "I": "red"}
+    edge_colors = {"OFF": "gray", "I": "red", "S": "blue"}
+
+    fig = plt.figure()
+    animation = stream_contagion_animation(
+        fig, H, events, pos, node_colors, edge_colors, dt=1
+    )
+    assert list(animation.new_frame_seq()) == [0, 1, 2]
+
+    animation = stream_contagion_animation(
+        fig, H, events, pos, node_colors, edge_colors, dt=0.5
+    )
+    # the frames without state changes are skipped
+    assert list(animation.new_frame_seq()) == [0, 1, 2, 5]
+    plt.close(fig)
+
+    # the collections take the colors of the states of a frame
+    fig = plt.figure()
+    _, node_states, edge_states, labels = get_states_in_equal_time_intervals(
+        H, events, 0.5
+    )
+    artists = _draw_collections(fig.gca(), H, pos, 50, "black", 1.5, 0.4)
+    palettes = (
+        _get_palette(labels, node_colors),
+        _get_palette(labels, edge_colors),
+        _get_palette(labels, edge_colors, 0.4),
+    )
+    nodes, dyads, edges = _update_collections(
+        artists, palettes, node_states[5], edge_states[5]
+    )
+    assert np.allclose(nodes.get_facecolors()[2], [1, 0, 0, 1])
+    assert np.allclose(edges.get_facecolors()[0], [1, 0, 0, 0.4])
+    plt.close(fig)
+
+
+def test_render_frames(tmp_path):
+    from hypercontagion.visualization.animation import render_frames
+
+    H = xgi.Hypergraph([[1, 2], [2, 3, 4]])
+    events = [
+        _event(0, None, 1, "S", "I"),
+        _event(0.5, 0, 2, "S", "I"),
+        _event(2.5, 1, 3, "S", "I"),
+    ]
+    pos = {1: [0, 0], 2: [1, 0], 3: [1, 1], 4: [2, 0]}
+    node_colors = {"S": "white", "I": "red"}
+    edge_colors = {"OFF": "gray", "I": "red", "S": "blue"}
+    _, node_states, edge_states, labels = get_states_in_equal_time_intervals(
+        H, events, 1
+    )
+
+    paths1 = render_frames(
+        H,
+        node_states,
+        edge_states,
+        labels,
+        pos,
+        node_colors,
+        edge_colors,
+        directory=tmp_path / "serial",
+        processes=1,
+        dpi=20,
+    )
+    paths2 = render_frames(
+        H,
+        node_states,
+        edge_states,
+        labels,
+        pos,
+        node_colors,
+        edge_colors,
+        directory=tmp_path / "parallel",
+        processes=2,
+        dpi=20,
+    )
+    assert len(paths1) == len(paths2) == 3
+    for p1, p2 in zip(paths1, paths2):
+        with open(p1, "rb") as f1, open(p2, "rb") as f2:
+            data = f1.read()
+            assert data[:8] == b"\x89PNG\r\n\x1a\n"
+            assert data == f2.read()
+
+    # the errors of the encoder
+    for encoder in ["hypercontagion-missing-encoder", sys.executable]:
+        with pytest.raises(HyperContagionError):
+            render_frames(
+                H,
+                node_states,
+                edge_states,
+                labels,
+                pos,
+                node_colors,
+                edge_colors,
+                filename=str(tmp_path / "video.mp4"),
+                processes=1,
+                dpi=20,
+                encoder=encoder,
+            )